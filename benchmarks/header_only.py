@@ -0,0 +1,73 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of header only parsing for routing.
+
+Times full parsing against parsing only the header of ISE style RFC 3164
+lines and RFC 5424 lines with structured data, both with bodies of about
+2 KB, as text and as bytes.
+
+    python benchmarks/header_only.py [count]
+"""
+import sys
+import time
+from typing import Callable
+
+from simple_syslog.parser import SyslogParser
+from simple_syslog.specification import SyslogSpecification
+
+ISE = (
+    "<181>2018-09-14T00:54:09+00:00 lzpqrst-admin.in.mycompany.com.lg"
+    " CISE_RADIUS_Accounting 0018032501 1 0 2018-09-14 10:54:09.095 +10:00"
+    " 0221114759 3002 NOTICE Radius-Accounting: RADIUS Accounting watchdog update,"
+    + " ConfigVersionId=73, Device IP Address=00.00.000.0, RequestLatency=2," * 30
+)
+RFC_5424 = (
+    "<14>1 2014-06-20T09:14:07.12345+00:00 loggregator"
+    " d0602076-b14a-4c55-852a-981e7afeed38 DEA MSG-01"
+    ' [exampleSDID@32473 iut="3" eventSource="Application" eventID="1011"] '
+    + "Removing instance, " * 110
+)
+
+
+def rate(count: int, parse: Callable[[], object]) -> float:
+    """Call parse count times, return the calls/s."""
+    start = time.perf_counter()
+    for _ in range(count):
+        parse()
+    return count / (time.perf_counter() - start)
+
+
+def main(count: int) -> None:
+    """Compare full and header only parsing."""
+    for name, spec, text in (
+        ("RFC 3164 ISE", SyslogSpecification.RFC_3164, ISE),
+        ("RFC 5424", SyslogSpecification.RFC_5424, RFC_5424),
+    ):
+        parser = SyslogParser(specification=spec)
+        data = text.encode()
+        print(f"{name}, {len(text)} characters")
+        full = rate(count, lambda: parser.parse(text))
+        print(f"  parse:                      {full:10.0f} messages/s")
+        header = rate(count, lambda: parser.parse_header(text))
+        print(f"  parse_header:               {header:10.0f} messages/s")
+        sd = rate(count, lambda: parser.parse_header(text, structured_data=True))
+        print(f"  parse_header with SD:       {sd:10.0f} messages/s")
+        full = rate(count, lambda: parser.parse_bytes(data))
+        print(f"  parse_bytes:                {full:10.0f} messages/s")
+        header = rate(count, lambda: parser.parse_header_bytes(data))
+        print(f"  parse_header_bytes:         {header:10.0f} messages/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
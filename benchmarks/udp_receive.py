@@ -0,0 +1,101 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Localhost benchmark of batched UDP receiving.
+
+Each round sends a burst of syslog datagrams to 127.0.0.1, then times
+draining them, once with SyslogDatagramReceiver reading in batches into its
+ring, and once with a plain socket reading one datagram per recvfrom call.
+Both are timed with and without parsing the messages.
+
+    python benchmarks/udp_receive.py [rounds] [burst]
+"""
+import socket
+import sys
+import time
+from typing import Callable, Tuple
+
+from simple_syslog.decoder import SyslogStreamDecoder
+from simple_syslog.receiver import SyslogDatagramReceiver
+
+MESSAGE = (
+    b"<14>1 2014-06-20T09:14:07.12345+00:00 loggregator"
+    b" d0602076-b14a-4c55-852a-981e7afeed38 DEA MSG-01"
+    b' [exampleSDID@32473 iut="3" eventSource="Application" eventID="1011"]'
+    b" Removing instance"
+)
+BUFFER_SIZE = 4 * 1024 * 1024
+
+
+def measure(
+    address: Tuple[str, int], rounds: int, burst: int, drain: Callable[[], int]
+) -> float:
+    """Send bursts and drain them, return the datagrams/s of draining."""
+    elapsed = 0.0
+    received = 0
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+        for _ in range(rounds):
+            for _ in range(burst):
+                sender.sendto(MESSAGE, address)
+            start = time.perf_counter()
+            while True:
+                count = drain()
+                if not count:
+                    break
+                received += count
+            elapsed += time.perf_counter() - start
+    if received < rounds * burst:
+        print(f"  {rounds * burst - received} datagrams lost, lower the burst")
+    return received / elapsed
+
+
+def main(rounds: int, burst: int) -> None:
+    """Compare batched and per datagram receiving."""
+    with SyslogDatagramReceiver(port=0, receive_buffer_size=BUFFER_SIZE) as rx:
+        rate = measure(rx.address, rounds, burst, lambda: len(rx.receive(0)))
+        print(f"batched receive:            {rate:10.0f} datagrams/s")
+        rate = measure(rx.address, rounds, burst, lambda: len(rx.receive_batch(0)))
+        print(f"batched receive and parse:  {rate:10.0f} datagrams/s")
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, BUFFER_SIZE)
+        sock.bind(("127.0.0.1", 0))
+        sock.setblocking(False)
+        decoder = SyslogStreamDecoder()
+
+        def receive() -> int:
+            try:
+                sock.recvfrom(65507)
+            except BlockingIOError:
+                return 0
+            return 1
+
+        def receive_and_parse() -> int:
+            try:
+                data = sock.recvfrom(65507)[0]
+            except BlockingIOError:
+                return 0
+            return len(list(decoder.decode(data)))
+
+        address = sock.getsockname()
+        rate = measure(address, rounds, burst, receive)
+        print(f"recvfrom:                   {rate:10.0f} datagrams/s")
+        rate = measure(address, rounds, burst, receive_and_parse)
+        print(f"recvfrom and parse:         {rate:10.0f} datagrams/s")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+    )
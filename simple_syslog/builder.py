@@ -13,16 +13,55 @@
 # limitations under the License.
 
 
+import dataclasses
 from abc import ABC, abstractmethod
-from typing import Dict, Generic, List, Optional, TypeVar
-
-from simple_syslog.data import SyslogDataSet
-from simple_syslog.exceptions import DeviationError
-from simple_syslog.keys import DefaultKeyProvider, KeyProvider, SyslogFieldKey
+from datetime import tzinfo
+from typing import (
+    AbstractSet,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    TypeVar,
+    Union,
+)
+
+from simple_syslog.data import RECORD_FIELDS, FieldValue, SyslogDataSet, SyslogRecord
+from simple_syslog.exceptions import DeviationError, FilteredError
+from simple_syslog.interning import InternTable
+from simple_syslog.keys import (
+    DefaultKeyProvider,
+    KeyProvider,
+    SyslogFieldKey,
+    compile_key_names,
+)
 from simple_syslog.policy import DASH, AllowableDeviation, NilPolicy
-from simple_syslog.specification import SyslogSpecification
+from simple_syslog.priority import decode_priority, decode_version
+from simple_syslog.specification import SPECIFICATIONS_3164, SyslogSpecification
+from simple_syslog.structured import parse_structured
+from simple_syslog.timestamps import BsdTimestampDecoder, TimestampDecoder
 
 T = TypeVar("T")
+_DECODED_TIMESTAMP = frozenset(
+    (SyslogFieldKey.HEADER_TIMESTAMP_NANOS, SyslogFieldKey.HEADER_TIMESTAMP_OFFSET)
+)
+# the low cardinality fields an InternTable is used for
+_INTERNED = frozenset(
+    (
+        SyslogFieldKey.HEADER_HOSTNAME,
+        SyslogFieldKey.HEADER_APPNAME,
+        SyslogFieldKey.HEADER_PROCID,
+        SyslogFieldKey.HEADER_MSGID,
+    )
+)
+# the slots of the values of a SyslogRecord
+_RECORD_INDEXES = {field_key: index for index, field_key in enumerate(RECORD_FIELDS)}
+# called with the value of a field, None for a nil value, False rejects
+FieldFilter = Callable[[Optional[FieldValue]], bool]
 
 
 class DataProducer(ABC, Generic[T]):
@@ -53,8 +92,45 @@ class MessageConsumer:
     They are also called for Syslog Structured Data
     """
 
+    @property
+    def fields(self) -> Optional[AbstractSet[SyslogFieldKey]]:
+        """The fields the MessageConsumer wants, None for all of them.
+
+        Parsers skip the work for other fields, the set must not change
+        after the parser is created. HEADER_PRI and HEADER_VERSION are
+        passed in any case, to check for AllowableDeviations.
+
+        Returns:
+            the SyslogFieldKeys, STRUCTURED_BASE stands for the structured data
+        """
+        return None
+
+    def wants(self, field_key: SyslogFieldKey) -> bool:
+        """Whether the MessageConsumer wants the values of a field.
+
+        Args:
+            field_key: The key
+
+        Returns:
+            True if field_key is in fields
+        """
+        fields = self.fields
+        return fields is None or field_key in fields
+
+    @property
+    def structured_text(self) -> bool:
+        """Whether the MessageConsumer takes structured data as text.
+
+        Parsers that check the structured data without collecting it then
+        pass it to consume_structured_text instead of consume_structured.
+
+        Returns:
+            True for consume_structured_text
+        """
+        return False
+
     @abstractmethod
-    def consume_value(self, field_key: SyslogFieldKey, value: str) -> None:
+    def consume_value(self, field_key: SyslogFieldKey, value: FieldValue) -> None:
         """Consume the value of a SyslogFieldKey.
 
         Args:
@@ -66,6 +142,40 @@ class MessageConsumer:
         """
         pass
 
+    def consume_priority(self, priority: FieldValue) -> None:
+        """Consume the PRI of a message.
+
+        The default passes the PRI to consume_value, followed by the severity
+        and facility it holds if they are wanted.
+
+        Args:
+            priority: the PRI, without the angle brackets
+
+        """
+        self.consume_value(SyslogFieldKey.HEADER_PRI, priority)
+        decoded = decode_priority(priority)
+        if decoded is None:
+            return
+        if self.wants(SyslogFieldKey.HEADER_PRI_SEVERITY):
+            self.consume_value(
+                SyslogFieldKey.HEADER_PRI_SEVERITY, decoded.severity_text
+            )
+        if self.wants(SyslogFieldKey.HEADER_PRI_FACILITY):
+            self.consume_value(
+                SyslogFieldKey.HEADER_PRI_FACILITY, decoded.facility_text
+            )
+
+    def consume_timestamp(self, timestamp: FieldValue) -> None:
+        """Consume the TIMESTAMP of a message.
+
+        The default passes it to consume_value.
+
+        Args:
+            timestamp: the TIMESTAMP, as written in the message
+
+        """
+        self.consume_value(SyslogFieldKey.HEADER_TIMESTAMP, timestamp)
+
     @abstractmethod
     def consume_structured(
         self, identifier: str, raw_parameters: Dict[str, str]
@@ -79,6 +189,19 @@ class MessageConsumer:
         """
         pass
 
+    def consume_structured_text(self, text: str) -> None:
+        """Consume the structured data of a message as text.
+
+        Only called if structured_text is True, the default passes each
+        element to consume_structured.
+
+        Args:
+            text: the structured data, as written in the message
+
+        """
+        for identifier, parameters in parse_structured(text).items():
+            self.consume_structured(identifier, parameters)
+
     @abstractmethod
     def handle_nil(self, field_key: SyslogFieldKey) -> None:
         """Handle a nil value for the given key.
@@ -105,8 +228,150 @@ class MessageConsumer:
         pass
 
 
-class DefaultBuilder(MessageConsumer, DataProducer[SyslogDataSet]):
-    """MessageBuilder that products a SyslogDataSet."""
+class Projection:
+    """Which fields a MessageConsumer wants, looked up once by a parser."""
+
+    __slots__ = (
+        "timestamp",
+        "hostname",
+        "app_name",
+        "procid",
+        "msgid",
+        "structured_data",
+        "structured_text",
+        "message",
+    )
+
+    def __init__(self, consumer: MessageConsumer) -> None:
+        """Create new Projection.
+
+        Args:
+            consumer: the MessageConsumer
+        """
+        self.timestamp = consumer.wants(SyslogFieldKey.HEADER_TIMESTAMP)
+        self.hostname = consumer.wants(SyslogFieldKey.HEADER_HOSTNAME)
+        self.app_name = consumer.wants(SyslogFieldKey.HEADER_APPNAME)
+        self.procid = consumer.wants(SyslogFieldKey.HEADER_PROCID)
+        self.msgid = consumer.wants(SyslogFieldKey.HEADER_MSGID)
+        self.structured_data = consumer.wants(SyslogFieldKey.STRUCTURED_BASE)
+        self.structured_text = self.structured_data and consumer.structured_text
+        self.message = consumer.wants(SyslogFieldKey.MESSAGE)
+
+
+class _Builder(MessageConsumer):
+    """The configuration shared by DefaultBuilder and RecordBuilder."""
+
+    def __init__(
+        self,
+        specification: Optional[SyslogSpecification],
+        nil_policy: Optional[NilPolicy],
+        allowed_deviations: Optional[List[AllowableDeviation]],
+        fields: Optional[Iterable[SyslogFieldKey]],
+        filters: Optional[Mapping[SyslogFieldKey, FieldFilter]],
+        lazy_structured_data: bool,
+        interner: Optional[InternTable],
+    ) -> None:
+        self._specification: SyslogSpecification = SyslogSpecification.RFC_5424
+        if specification:
+            self._specification = specification
+
+        if not nil_policy:
+            self._nil_policy = NilPolicy.OMIT
+        else:
+            self._nil_policy = nil_policy
+
+        if not allowed_deviations:
+            self._allowable_deviations = list()
+        else:
+            self._allowable_deviations = allowed_deviations
+
+        self._fields = None if fields is None else frozenset(fields)
+        self._filters = dict(filters) if filters else None
+        # what the parsers are asked for, the kept and the filtered fields
+        self._wanted = self._fields
+        if self._fields is not None and self._filters:
+            self._wanted = self._fields | self._filters.keys()
+        # the fields left out of the message, only kept when projecting
+        self._skipped: Set[SyslogFieldKey] = set()
+        self._lazy_structured_data = lazy_structured_data
+        self._interner = interner
+
+    @property
+    def fields(self) -> Optional[AbstractSet[SyslogFieldKey]]:
+        """The fields the builder keeps or filters, None for all of them.
+
+        Returns:
+            the SyslogFieldKeys
+        """
+        return self._wanted
+
+    @property
+    def structured_text(self) -> bool:
+        """Whether the builder takes structured data as text.
+
+        Returns:
+            True if lazy_structured_data is set
+        """
+        return self._lazy_structured_data
+
+    def _keeps(self, field_key: SyslogFieldKey) -> bool:
+        return self._fields is None or field_key in self._fields
+
+    def _filter(self, field_key: SyslogFieldKey, value: Optional[FieldValue]) -> None:
+        accept = self._filters.get(field_key)  # type: ignore
+        if accept is not None and not accept(value):
+            raise FilteredError(f"{field_key.name} rejected")
+
+    def _check_deviations(self, priority: bool, version: bool) -> None:
+        if (
+            not priority
+            and SyslogFieldKey.HEADER_PRI not in self._skipped
+            and AllowableDeviation.PRIORITY not in self._allowable_deviations
+        ):
+            raise DeviationError("Priority missing")
+        elif (
+            self._specification
+            in [
+                SyslogSpecification.RFC_5424,
+                SyslogSpecification.RFC_6587_5424,
+                SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN,
+            ]
+            and not version
+            and SyslogFieldKey.HEADER_VERSION not in self._skipped
+            and AllowableDeviation.VERSION not in self._allowable_deviations
+        ):
+            raise DeviationError("Version missing")
+
+
+class DefaultBuilder(_Builder, DataProducer[SyslogDataSet]):
+    """MessageBuilder that products a SyslogDataSet.
+
+    The KeyProvider is asked for the name of every SyslogFieldKey once, when
+    the builder is created. With fields set only those fields are kept.
+
+    With filters set each value of a filtered field is checked as soon as
+    it is consumed, and a FilteredError is raised if it is rejected. The
+    parsers pass the header before the structured data and the message, so
+    a rejected message is not parsed any further.
+
+    With typed_values set the PRI, severity, facility and VERSION are kept
+    as ints, with priority_names set the keywords of the severity and
+    facility, such as err and local7, are kept as HEADER_PRI_SEVERITY_NAME
+    and HEADER_PRI_FACILITY_NAME. Both come from a table of every PRI,
+    decoded once. Filters are called with the text of the values either way.
+
+    With decode_timestamps set timestamps are decoded as well, into
+    nanoseconds since the epoch, HEADER_TIMESTAMP_NANOS, and the offset from
+    UTC in seconds, HEADER_TIMESTAMP_OFFSET. With an RFC 3164 specification
+    the BSD timestamps are decoded by produce, once the HOSTNAME is known,
+    in the zone of their host from host_timezones, or else default_timezone,
+    and the year closest to the current time. Timestamps that can not be
+    decoded are only kept as text.
+
+    With an InternTable the HOSTNAME, APP-NAME, PROCID and MSGID of every
+    message are taken from it, so messages from the same host share one
+    string for each.
+    """
 
     def __init__(
         self,
@@ -114,6 +379,15 @@ class DefaultBuilder(MessageConsumer, DataProducer[SyslogDataSet]):
         key_provider: Optional[KeyProvider] = None,
         nil_policy: Optional[NilPolicy] = None,
         allowed_deviations: Optional[List[AllowableDeviation]] = None,
+        fields: Optional[Iterable[SyslogFieldKey]] = None,
+        filters: Optional[Mapping[SyslogFieldKey, FieldFilter]] = None,
+        lazy_structured_data: bool = False,
+        typed_values: bool = False,
+        priority_names: bool = False,
+        decode_timestamps: bool = False,
+        default_timezone: Optional[tzinfo] = None,
+        host_timezones: Optional[Mapping[str, tzinfo]] = None,
+        interner: Optional[InternTable] = None,
     ) -> None:
         """Create new DefaultBuilder.
 
@@ -125,28 +399,64 @@ class DefaultBuilder(MessageConsumer, DataProducer[SyslogDataSet]):
             nil_policy: Policy for handling missing or nil values or None.
                 If none then NilPolicy.OMIT will be used
             allowed_deviations: List of AllowableDeviation or None.
+            fields: the SyslogFieldKeys to keep or None for all of them,
+                STRUCTURED_BASE keeps the structured data
+            filters: predicates for the values of fields, called with
+                None for nil values. Filtered fields are parsed whether or
+                not they are kept.
+            lazy_structured_data: keep the structured data as text where
+                the parser allows it, parsed on first access to
+                SyslogDataSet.structured_data
+            typed_values: keep the PRI, severity, facility and VERSION as ints
+            priority_names: keep the names of the severity and facility too
+            decode_timestamps: keep the TIMESTAMP decoded too
+            default_timezone: the zone of RFC 3164 timestamps or None for UTC
+            host_timezones: the zones of RFC 3164 timestamps, by HOSTNAME
+            interner: the InternTable for the HOSTNAME, APP-NAME, PROCID and
+                MSGID, or None to keep every value as parsed
         """
-        self._specification: SyslogSpecification = SyslogSpecification.RFC_5424
+        super().__init__(
+            specification,
+            nil_policy,
+            allowed_deviations,
+            fields,
+            filters,
+            lazy_structured_data,
+            interner,
+        )
         self._key_provider: KeyProvider = DefaultKeyProvider()
-
         if key_provider:
             self._key_provider = key_provider
-        if specification:
-            self._specification = specification
-
-        if not nil_policy:
-            self._nil_policy = NilPolicy.OMIT
-        else:
-            self._nil_policy = nil_policy
-
-        if not allowed_deviations:
-            self._allowable_deviations = list()
-        else:
-            self._allowable_deviations = allowed_deviations
-
+        # the names of the fields by SyslogFieldKey value, and those produce
+        # checks, looked up once rather than for every value
+        self._names = compile_key_names(self._key_provider, self._fields)
+        self._priority_name = self._key_provider.get_header_priority()
+        self._version_name = self._key_provider.get_header_version()
+        self._typed_values = typed_values
+        self._priority_names = priority_names
+        self._timestamps: Optional[TimestampDecoder] = None
+        self._bsd_timestamps: Optional[BsdTimestampDecoder] = None
+        bsd = decode_timestamps and self._specification in SPECIFICATIONS_3164
+        self._host_timezones = host_timezones if bsd else None
+        # the RFC 3164 timestamp waiting for the HOSTNAME, and the HOSTNAME
+        self._bsd_timestamp: Optional[FieldValue] = None
+        self._hostname: Optional[str] = None
+        if decode_timestamps:
+            self._timestamps = TimestampDecoder()
+            if bsd:
+                self._bsd_timestamps = BsdTimestampDecoder(
+                    default_timezone, host_timezones
+                )
+            # the decoded fields are taken from the TIMESTAMP and HOSTNAME
+            if self._wanted is not None and not self._wanted.isdisjoint(
+                _DECODED_TIMESTAMP
+            ):
+                self._wanted = self._wanted | {SyslogFieldKey.HEADER_TIMESTAMP}
+                if self._host_timezones:
+                    self._wanted = self._wanted | {SyslogFieldKey.HEADER_HOSTNAME}
         self._data: SyslogDataSet = SyslogDataSet(dict(), dict())
 
-    def consume_value(self, field_key: SyslogFieldKey, value: str) -> None:
+    def consume_value(self, field_key: SyslogFieldKey, value: FieldValue) -> None:
         """Consume the value of a SyslogFieldKey.
 
         Args:
@@ -155,8 +465,98 @@ class DefaultBuilder(MessageConsumer, DataProducer[SyslogDataSet]):
 
         Returns: None
 
+        Raises:
+            FilteredError: if a filter rejects the value.
+
         """
-        self._data.data[self._key_provider.get(field_key)] = value
+        if self._filters is not None:
+            self._filter(field_key, value)
+        if self._interner is not None and field_key in _INTERNED:
+            value = self._interner.intern(value)
+        if self._typed_values and field_key == SyslogFieldKey.HEADER_VERSION:
+            self._put(field_key, decode_version(value))
+        else:
+            self._put(field_key, value)
+        if self._host_timezones and field_key == SyslogFieldKey.HEADER_HOSTNAME:
+            # host_timezones is keyed by text, not by spans of the input
+            self._hostname = (
+                value if isinstance(value, str) else str(value, "utf-8", "replace")
+            )
+
+    def consume_priority(self, priority: FieldValue) -> None:
+        """Consume the PRI of a message.
+
+        The severity and facility are looked up rather than computed.
+
+        Args:
+            priority: the PRI, without the angle brackets
+
+        Raises:
+            FilteredError: if a filter rejects the PRI, severity or facility.
+
+        """
+        decoded = decode_priority(priority)
+        if decoded is None:
+            self.consume_value(SyslogFieldKey.HEADER_PRI, priority)
+            return
+        if self._filters is not None:
+            self._filter(SyslogFieldKey.HEADER_PRI, priority)
+            self._filter(SyslogFieldKey.HEADER_PRI_SEVERITY, decoded.severity_text)
+            self._filter(SyslogFieldKey.HEADER_PRI_FACILITY, decoded.facility_text)
+        if self._typed_values:
+            self._put(SyslogFieldKey.HEADER_PRI, decoded.value)
+            self._put(SyslogFieldKey.HEADER_PRI_SEVERITY, decoded.severity)
+            self._put(SyslogFieldKey.HEADER_PRI_FACILITY, decoded.facility)
+        else:
+            self._put(SyslogFieldKey.HEADER_PRI, priority)
+            self._put(SyslogFieldKey.HEADER_PRI_SEVERITY, decoded.severity_text)
+            self._put(SyslogFieldKey.HEADER_PRI_FACILITY, decoded.facility_text)
+        if self._priority_names:
+            self._put(SyslogFieldKey.HEADER_PRI_SEVERITY_NAME, decoded.severity_name)
+            if decoded.facility_name is not None:
+                self._put(
+                    SyslogFieldKey.HEADER_PRI_FACILITY_NAME, decoded.facility_name
+                )
+
+    def consume_timestamp(self, timestamp: FieldValue) -> None:
+        """Consume the TIMESTAMP of a message.
+
+        Args:
+            timestamp: the TIMESTAMP, as written in the message
+
+        Raises:
+            FilteredError: if a filter rejects the TIMESTAMP.
+
+        """
+        self.consume_value(SyslogFieldKey.HEADER_TIMESTAMP, timestamp)
+        if self._timestamps is None:
+            return
+        decoded = self._timestamps.decode(timestamp)
+        if decoded is None:
+            if self._bsd_timestamps is not None:
+                # RFC 3164, its zone may depend on the HOSTNAME that follows
+                self._bsd_timestamp = timestamp
+            return
+        self._put(SyslogFieldKey.HEADER_TIMESTAMP_NANOS, decoded.nanos)
+        self._put(SyslogFieldKey.HEADER_TIMESTAMP_OFFSET, decoded.offset)
+
+    def _decode_bsd_timestamp(self) -> None:
+        decoded = self._bsd_timestamps.decode(  # type: ignore
+            self._bsd_timestamp, self._hostname  # type: ignore
+        )
+        self._bsd_timestamp = self._hostname = None
+        if decoded is not None:
+            self._put(SyslogFieldKey.HEADER_TIMESTAMP_NANOS, decoded.nanos)
+            self._put(SyslogFieldKey.HEADER_TIMESTAMP_OFFSET, decoded.offset)
+
+    def _put(
+        self, field_key: SyslogFieldKey, value: Union[FieldValue, int, None]
+    ) -> None:
+        if self._fields is not None and field_key not in self._fields:
+            self._skipped.add(field_key)
+            return
+        # _value_ rather than value, which is a property
+        self._data.data[self._names[field_key._value_]] = value
 
     def consume_structured(
         self, identifier: str, raw_parameters: Dict[str, str]
@@ -170,11 +570,26 @@ class DefaultBuilder(MessageConsumer, DataProducer[SyslogDataSet]):
         Returns: None
 
         """
+        if not self._keeps(SyslogFieldKey.STRUCTURED_BASE):
+            return
         if identifier not in self._data.structured_data:
             self._data.structured_data[identifier] = dict()
         # add the dict for identifier
         self._data.structured_data[identifier] = raw_parameters
 
+    def consume_structured_text(self, text: str) -> None:
+        """Consume the structured data of a message as text.
+
+        The text is kept in the SyslogDataSet and parsed on first access.
+
+        Args:
+            text: the structured data, as written in the message
+
+        """
+        if not self._keeps(SyslogFieldKey.STRUCTURED_BASE):
+            return
+        self._data.structured_text = text
+
     def handle_nil(self, field_key: SyslogFieldKey) -> None:
         """Handle a nil value for the given key.
 
@@ -183,23 +598,33 @@ class DefaultBuilder(MessageConsumer, DataProducer[SyslogDataSet]):
 
         Returns: None
 
+        Raises:
+            FilteredError: if a filter rejects the nil value.
+
         """
+        if self._filters is not None:
+            self._filter(field_key, None)
         if (
             self._nil_policy == NilPolicy.OMIT
             or field_key == SyslogFieldKey.STRUCTURED_BASE
+            or not self._keeps(field_key)
         ):
             return
 
         if self._nil_policy == NilPolicy.DASH:
-            self._data.data[self._key_provider.get(field_key)] = DASH
+            self._data.data[self._names[field_key._value_]] = DASH
         elif self._nil_policy == NilPolicy.NULL:
-            self._data.data[self._key_provider.get(field_key)] = None
+            self._data.data[self._names[field_key._value_]] = None
 
     def start(self) -> None:
         """Called before the start of a message."""
         self._data.data.clear()
+        self._data.structured_text = None
         if self._data.structured_data:
             self._data.structured_data.clear()
+        if self._skipped:
+            self._skipped.clear()
+        self._bsd_timestamp = self._hostname = None
 
     def complete(self) -> None:
         """Called when a message is complete."""
@@ -208,8 +633,12 @@ class DefaultBuilder(MessageConsumer, DataProducer[SyslogDataSet]):
     def reset(self) -> None:
         """Called to request the MessageConsumer resets data."""
         self._data.data.clear()
+        self._data.structured_text = None
         if self._data.structured_data:
             self._data.structured_data.clear()
+        if self._skipped:
+            self._skipped.clear()
+        self._bsd_timestamp = self._hostname = None
 
     def produce(self) -> SyslogDataSet:
         """Call to return data.
@@ -221,20 +650,266 @@ class DefaultBuilder(MessageConsumer, DataProducer[SyslogDataSet]):
             DeviationError: if data is missing without AllowedDeviation.
 
         """
+        if self._bsd_timestamp is not None:
+            self._decode_bsd_timestamp()
+        data = self._data.data
+        # a typed PRI of 0 is there, an empty one is not
+        self._check_deviations(
+            data.get(self._priority_name) not in (None, ""),
+            data.get(self._version_name) not in (None, ""),
+        )
+        return self._data
+
+    def release(self) -> SyslogDataSet:
+        """Call to return data that is handed over to the caller.
+
+        Unlike produce the returned SyslogDataSet is not reused, the
+        builder continues with new dicts instead of clearing it on the
+        next start.
+
+        Returns:
+            SyslogDataSet: returns a SyslogDataSet.
+
+        Raises:
+            DeviationError: if data is missing without AllowedDeviation.
+
+        """
+        data = self.produce()
+        self._data = SyslogDataSet(dict(), dict())
+        return data
+
+
+@dataclasses.dataclass(frozen=True)
+class BuilderOptions:
+    """The options of a DefaultBuilder, kept to create builders with.
+
+    Parsers, decoders, receivers and servers create their DefaultBuilders
+    from one BuilderOptions, each attribute is the DefaultBuilder argument
+    of the same name. parse_file_parallel sends it to its worker
+    processes, so it must then be picklable.
+    """
+
+    key_provider: Optional[KeyProvider] = None
+    nil_policy: Optional[NilPolicy] = None
+    allowed_deviations: Optional[List[AllowableDeviation]] = None
+    fields: Optional[Iterable[SyslogFieldKey]] = None
+    filters: Optional[Mapping[SyslogFieldKey, FieldFilter]] = None
+    lazy_structured_data: bool = False
+    typed_values: bool = False
+    priority_names: bool = False
+    decode_timestamps: bool = False
+    default_timezone: Optional[tzinfo] = None
+    host_timezones: Optional[Mapping[str, tzinfo]] = None
+    interner: Optional[InternTable] = None
+
+    def create(
+        self, specification: Optional[SyslogSpecification] = None
+    ) -> DefaultBuilder:
+        """Create a DefaultBuilder with these options.
+
+        Args:
+            specification: SyslogSpecification or None.
+                If none SyslogSpecification.RFC_5424 will be used
+
+        Returns:
+            DefaultBuilder: a new builder
+        """
+        return DefaultBuilder(
+            specification=specification,
+            key_provider=self.key_provider,
+            nil_policy=self.nil_policy,
+            allowed_deviations=self.allowed_deviations,
+            fields=self.fields,
+            filters=self.filters,
+            lazy_structured_data=self.lazy_structured_data,
+            typed_values=self.typed_values,
+            priority_names=self.priority_names,
+            decode_timestamps=self.decode_timestamps,
+            default_timezone=self.default_timezone,
+            host_timezones=self.host_timezones,
+            interner=self.interner,
+        )
+
+
+class RecordBuilder(_Builder, DataProducer[SyslogRecord]):
+    """MessageBuilder that produces SyslogRecords.
+
+    SyslogRecords hold the values in slots rather than in dicts keyed by
+    name, for keeping many messages in memory. Names are only looked up by
+    SyslogRecord.to_dict. With an InternTable records share the strings of
+    repeated header values as well. The parsed structured data outweighs
+    the slots, so most of the saving comes with lazy_structured_data and
+    an InternTable.
+
+    Values of fields a SyslogRecord has no slot for, such as the names of
+    the severity and facility, are ignored.
+
+    Every call to produce returns a new SyslogRecord, owned by the caller.
+    """
+
+    def __init__(
+        self,
+        specification: Optional[SyslogSpecification] = None,
+        nil_policy: Optional[NilPolicy] = None,
+        allowed_deviations: Optional[List[AllowableDeviation]] = None,
+        fields: Optional[Iterable[SyslogFieldKey]] = None,
+        filters: Optional[Mapping[SyslogFieldKey, FieldFilter]] = None,
+        lazy_structured_data: bool = False,
+        interner: Optional[InternTable] = None,
+    ) -> None:
+        """Create new RecordBuilder.
+
+        Args:
+            specification: SyslogSpecification or None.
+                If none SyslogSpecification.RFC_5424 will be used
+            nil_policy: Policy for handling missing or nil values or None.
+                Nil values are None unless it is NilPolicy.DASH
+            allowed_deviations: List of AllowableDeviation or None.
+            fields: the SyslogFieldKeys to keep or None for all of them,
+                STRUCTURED_BASE keeps the structured data
+            filters: predicates for the values of fields, see DefaultBuilder
+            lazy_structured_data: keep the structured data as text where
+                the parser allows it, parsed on first access to
+                SyslogRecord.structured_data
+            interner: the InternTable for the HOSTNAME, APP-NAME, PROCID and
+                MSGID, or None to keep every value as parsed
+        """
+        super().__init__(
+            specification,
+            nil_policy,
+            allowed_deviations,
+            fields,
+            filters,
+            lazy_structured_data,
+            interner,
+        )
+        self._values: List[Optional[FieldValue]] = [None] * len(RECORD_FIELDS)
+        self._structured: Optional[Dict[str, Dict[str, str]]] = None
+        self._structured_text: Optional[str] = None
+
+    def consume_value(self, field_key: SyslogFieldKey, value: FieldValue) -> None:
+        """Consume the value of a SyslogFieldKey.
+
+        Args:
+            field_key: Which field this value is for
+            value: the value
+
+        Raises:
+            FilteredError: if a filter rejects the value.
+
+        """
+        if self._filters is not None:
+            self._filter(field_key, value)
+        if self._fields is not None and field_key not in self._fields:
+            self._skipped.add(field_key)
+            return
+        index = _RECORD_INDEXES.get(field_key)
+        if index is None:
+            # a SyslogRecord holds no derived values
+            return
+        if self._interner is not None and field_key in _INTERNED:
+            value = self._interner.intern(value)
+        self._values[index] = value
+
+    def consume_structured(
+        self, identifier: str, raw_parameters: Dict[str, str]
+    ) -> None:
+        """Consume structured data.
+
+        Args:
+            identifier: The structured data ID
+            raw_parameters: The parameter name and values for this ID
+
+        """
+        if not self._keeps(SyslogFieldKey.STRUCTURED_BASE):
+            return
+        if self._structured is None:
+            self._structured = dict()
+        self._structured[identifier] = raw_parameters
+
+    def consume_structured_text(self, text: str) -> None:
+        """Consume the structured data of a message as text.
+
+        The text is kept in the SyslogRecord and parsed on first access.
+
+        Args:
+            text: the structured data, as written in the message
+
+        """
+        if self._keeps(SyslogFieldKey.STRUCTURED_BASE):
+            self._structured_text = text
+
+    def handle_nil(self, field_key: SyslogFieldKey) -> None:
+        """Handle a nil value for the given key.
+
+        Args:
+            field_key: The key
+
+        Raises:
+            FilteredError: if a filter rejects the nil value.
+
+        """
+        if self._filters is not None:
+            self._filter(field_key, None)
+        index = _RECORD_INDEXES.get(field_key)
         if (
-            not self._data.data.get(self._key_provider.get_header_priority())
-            and AllowableDeviation.PRIORITY not in self._allowable_deviations
+            self._nil_policy == NilPolicy.DASH
+            and index is not None
+            and self._keeps(field_key)
         ):
-            raise DeviationError("Priority missing")
-        elif (
-            self._specification
-            in [
-                SyslogSpecification.RFC_5424,
-                SyslogSpecification.RFC_6587_5424,
-                SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN,
-            ]
-            and not self._data.data.get(self._key_provider.get_header_version())
-            and AllowableDeviation.VERSION not in self._allowable_deviations
-        ):
-            raise DeviationError("Version missing")
-        return self._data
+            self._values[index] = DASH
+
+    def start(self) -> None:
+        """Called before the start of a message."""
+        self.reset()
+
+    def complete(self) -> None:
+        """Called when a message is complete."""
+        pass
+
+    def reset(self) -> None:
+        """Called to request the MessageConsumer resets data."""
+        self._values = [None] * len(RECORD_FIELDS)
+        self._structured = None
+        self._structured_text = None
+        if self._skipped:
+            self._skipped.clear()
+
+    def produce(self) -> SyslogRecord:
+        """Call to return data.
+
+        Returns:
+            SyslogRecord: a new SyslogRecord.
+
+        Raises:
+            DeviationError: if data is missing without AllowedDeviation.
+
+        """
+        # in the order of RECORD_FIELDS
+        (
+            message,
+            app_name,
+            host_name,
+            priority,
+            severity,
+            facility,
+            proc_id,
+            timestamp,
+            msg_id,
+            version,
+        ) = self._values
+        self._check_deviations(bool(priority), bool(version))
+        return SyslogRecord(
+            message=message,
+            app_name=app_name,
+            host_name=host_name,
+            priority=priority,
+            severity=severity,
+            facility=facility,
+            proc_id=proc_id,
+            timestamp=timestamp,
+            msg_id=msg_id,
+            version=version,
+            structured_data=self._structured,
+            structured_text=self._structured_text,
+        )
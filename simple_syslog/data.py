@@ -12,12 +12,237 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import dataclasses
-from typing import Dict, Union
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
 
+from simple_syslog.keys import DefaultKeyProvider, KeyProvider, SyslogFieldKey
+from simple_syslog.structured import StructuredData, parse_structured
 
-@dataclasses.dataclass
+# a value as parsed, a memoryview of the input for a BytesInputStream with
+# spans set
+FieldValue = Union[str, memoryview]
+
+
+@dataclasses.dataclass(init=False)
 class SyslogDataSet:
-    """Generic Syslog Data class."""
+    """Generic Syslog Data class.
+
+    The structured data may be kept as text, in structured_text, and is
+    then only parsed on first access to structured_data.
+    """
+
+    data: Dict[str, Union[FieldValue, int, None]]
+    _structured_data: StructuredData = dataclasses.field(compare=False, repr=False)
+    structured_text: Optional[str] = dataclasses.field(
+        default=None, compare=False, repr=False
+    )
+
+    def __init__(
+        self,
+        data: Dict[str, Union[FieldValue, int, None]],
+        structured_data: StructuredData,
+        structured_text: Optional[str] = None,
+    ) -> None:
+        """Create new SyslogDataSet.
+
+        Args:
+            data: the values by their names
+            structured_data: the parameters of each SD-ID
+            structured_text: the structured data as text, parsed on first
+                access to structured_data instead
+        """
+        self.data = data
+        self._structured_data = structured_data
+        self.structured_text = structured_text
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the values and the parsed structured data."""
+        if not isinstance(other, SyslogDataSet):
+            return NotImplemented
+        return self.data == other.data and self.structured_data == other.structured_data
+
+    def __repr__(self) -> str:
+        """Show the values and the parsed structured data."""
+        return (
+            f"SyslogDataSet(data={self.data!r}, "
+            f"structured_data={self.structured_data!r})"
+        )
+
+    @property
+    def structured_data(self) -> StructuredData:
+        """The parameters of each SD-ID.
+
+        Returns:
+            the structured data, parsed from structured_text if it is set
+        """
+        if self.structured_text is not None:
+            self._structured_data = parse_structured(self.structured_text)
+            self.structured_text = None
+        return self._structured_data
+
+    @structured_data.setter
+    def structured_data(self, structured_data: StructuredData) -> None:
+        self._structured_data = structured_data
+        self.structured_text = None
+
+
+# the fields of a SyslogRecord, in the order of their SyslogFieldKeys
+RECORD_FIELDS: Tuple[SyslogFieldKey, ...] = (
+    SyslogFieldKey.MESSAGE,
+    SyslogFieldKey.HEADER_APPNAME,
+    SyslogFieldKey.HEADER_HOSTNAME,
+    SyslogFieldKey.HEADER_PRI,
+    SyslogFieldKey.HEADER_PRI_SEVERITY,
+    SyslogFieldKey.HEADER_PRI_FACILITY,
+    SyslogFieldKey.HEADER_PROCID,
+    SyslogFieldKey.HEADER_TIMESTAMP,
+    SyslogFieldKey.HEADER_MSGID,
+    SyslogFieldKey.HEADER_VERSION,
+)
+_RECORD_SLOTS: Tuple[str, ...] = (
+    "message",
+    "app_name",
+    "host_name",
+    "priority",
+    "severity",
+    "facility",
+    "proc_id",
+    "timestamp",
+    "msg_id",
+    "version",
+)
+_SLOT_NAMES: Dict[SyslogFieldKey, str] = dict(zip(RECORD_FIELDS, _RECORD_SLOTS))
+_NO_STRUCTURED_DATA: Mapping[str, Dict[str, str]] = MappingProxyType({})
+_DEFAULT_KEY_PROVIDER = DefaultKeyProvider()
+
+
+class SyslogRecord:
+    """Compact alternative to SyslogDataSet, produced by RecordBuilder.
+
+    The values are held in slots, one per field, instead of a dict keyed by
+    the names of a KeyProvider. Missing values are None, and so are nil
+    values unless NilPolicy.DASH is used. Values can also be looked up by
+    their SyslogFieldKey.
+
+    As with SyslogDataSet, the structured data may be kept as text until
+    structured_data is accessed.
+    """
+
+    __slots__ = _RECORD_SLOTS + ("_structured_data", "structured_text")
+
+    def __init__(
+        self,
+        message: Optional[FieldValue] = None,
+        app_name: Optional[FieldValue] = None,
+        host_name: Optional[FieldValue] = None,
+        priority: Optional[FieldValue] = None,
+        severity: Optional[FieldValue] = None,
+        facility: Optional[FieldValue] = None,
+        proc_id: Optional[FieldValue] = None,
+        timestamp: Optional[FieldValue] = None,
+        msg_id: Optional[FieldValue] = None,
+        version: Optional[FieldValue] = None,
+        structured_data: Optional[StructuredData] = None,
+        structured_text: Optional[str] = None,
+    ) -> None:
+        """Create new SyslogRecord.
+
+        Args:
+            message: the MSG
+            app_name: the APP-NAME
+            host_name: the HOSTNAME
+            priority: the PRI
+            severity: the severity, from the PRI
+            facility: the facility, from the PRI
+            proc_id: the PROCID
+            timestamp: the TIMESTAMP
+            msg_id: the MSGID
+            version: the VERSION
+            structured_data: the parameters of each SD-ID, or None
+            structured_text: the structured data as text, parsed on first
+                access to structured_data instead
+        """
+        self.message = message
+        self.app_name = app_name
+        self.host_name = host_name
+        self.priority = priority
+        self.severity = severity
+        self.facility = facility
+        self.proc_id = proc_id
+        self.timestamp = timestamp
+        self.msg_id = msg_id
+        self.version = version
+        self._structured_data = structured_data
+        self.structured_text = structured_text
+
+    @property
+    def structured_data(self) -> Mapping[str, Dict[str, str]]:
+        """The parameters of each SD-ID.
+
+        Returns:
+            the structured data, empty if the message has none
+        """
+        if self.structured_text is not None:
+            self._structured_data = parse_structured(self.structured_text)
+            self.structured_text = None
+        if self._structured_data is None:
+            return _NO_STRUCTURED_DATA
+        return self._structured_data
+
+    def __getitem__(self, field_key: SyslogFieldKey) -> Optional[FieldValue]:
+        """The value of a field.
+
+        Args:
+            field_key: the field, one of RECORD_FIELDS
+
+        Returns:
+            the value or None
+
+        Raises:
+            KeyError: if the field is not held by a SyslogRecord.
+
+        """
+        return getattr(self, _SLOT_NAMES[field_key])  # type: ignore
+
+    def to_dict(
+        self, key_provider: Optional[KeyProvider] = None
+    ) -> Dict[str, FieldValue]:
+        """The values by their names, as in SyslogDataSet.data.
+
+        Args:
+            key_provider: the KeyProvider to use or None.
+                If none DefaultKeyProvider will be used
+
+        Returns:
+            the values that are not None
+        """
+        get = (key_provider or _DEFAULT_KEY_PROVIDER).get
+        data: Dict[str, FieldValue] = dict()
+        for field_key, name in zip(RECORD_FIELDS, _RECORD_SLOTS):
+            value = getattr(self, name)
+            if value is not None:
+                data[get(field_key)] = value
+        return data
+
+    def _values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in _RECORD_SLOTS)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the values and the structured data of two SyslogRecords."""
+        if not isinstance(other, SyslogRecord):
+            return NotImplemented
+        return (
+            self._values() == other._values()
+            and self.structured_data == other.structured_data
+        )
 
-    data: Dict[str, Union[str, None]]
-    structured_data: Dict[str, Dict[str, str]]
+    def __repr__(self) -> str:
+        """The values that are not None."""
+        parts = [
+            f"{name}={value!r}"
+            for name, value in zip(_RECORD_SLOTS, self._values())
+            if value is not None
+        ]
+        if self.structured_data:
+            parts.append(f"structured_data={dict(self.structured_data)!r}")
+        return f"SyslogRecord({', '.join(parts)})"
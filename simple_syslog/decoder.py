@@ -0,0 +1,169 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from simple_syslog.builder import BuilderOptions
+from simple_syslog.data import SyslogDataSet
+from simple_syslog.exceptions import DeviationError, FilteredError, ParseError
+from simple_syslog.framing import SyslogFramer
+from simple_syslog.reader import SPECIFICATIONS_OCTET_COUNTED, SyslogStreamReader
+from simple_syslog.specification import SyslogSpecification
+
+
+class SyslogStreamDecoder:
+    """Turns a byte stream into SyslogDataSets.
+
+    The decoder does no I/O, whatever is read from a socket or file is fed
+    to it as it arrives. It keeps incomplete frames between calls, so reads
+    do not need to line up with messages.
+
+    RFC 6587 and Heroku streams are octet counted, RFC 3164 and RFC 5424
+    streams are LF terminated.
+    """
+
+    def __init__(
+        self,
+        specification: Optional[SyslogSpecification] = None,
+        options: Optional[BuilderOptions] = None,
+        two_stage: bool = False,
+    ) -> None:
+        """Create new SyslogStreamDecoder.
+
+        Args:
+            specification: SyslogSpecification or None.
+                If none SyslogSpecification.RFC_5424 will be used
+            options: the options of the DefaultBuilder or None for its
+                defaults, messages its filters reject are skipped
+            two_stage: parse with SLL first and fall back to LL on errors.
+        """
+        if not specification:
+            specification = SyslogSpecification.RFC_5424
+        self._framer = SyslogFramer(
+            octet_counted=specification in SPECIFICATIONS_OCTET_COUNTED,
+            include_count=specification == SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN,
+        )
+        self._builder = (options or BuilderOptions()).create(specification)
+        self._reader = SyslogStreamReader(
+            self._builder, specification=specification, two_stage=two_stage
+        )
+        self._count = 0
+
+    @property
+    def count(self) -> int:
+        """Number of messages decoded, including the skipped ones.
+
+        Returns:
+            the number of messages
+        """
+        return self._count
+
+    def feed(
+        self,
+        data: Union[bytes, bytearray, memoryview],
+        errors: Optional[List[Tuple[int, Exception]]] = None,
+    ) -> Iterator[SyslogDataSet]:
+        """Decode the next piece of the stream.
+
+        The frames are split off right away, the messages are parsed while
+        iterating. The SyslogDataSets belong to the caller. Messages that
+        fail with a ParseError or DeviationError are skipped, as are those
+        rejected by a filter.
+
+        Args:
+            data: the next piece of the stream
+            errors: list receiving the index in the stream and error of
+                each skipped message
+
+        Returns:
+            Iterator[SyslogDataSet]: the messages completed by data
+
+        Raises:
+            ParseError: if an octet count is invalid.
+
+        """
+        return self._decode(self._framer.feed(data), errors)
+
+    def decode(
+        self,
+        message: Union[bytes, bytearray, memoryview],
+        errors: Optional[List[Tuple[int, Exception]]] = None,
+    ) -> Iterator[SyslogDataSet]:
+        """Decode a complete message, such as a UDP datagram, without framing.
+
+        Args:
+            message: the message
+            errors: list receiving the index in the stream and error of
+                each skipped message
+
+        Returns:
+            Iterator[SyslogDataSet]: the message, unless it was skipped
+
+        """
+        return self._decode([memoryview(message)], errors)
+
+    def decode_batch(
+        self,
+        messages: Iterable[Union[bytes, bytearray, memoryview]],
+        errors: Optional[List[Tuple[int, Exception]]] = None,
+    ) -> Iterator[SyslogDataSet]:
+        """Decode complete messages, such as the datagrams of one read.
+
+        Args:
+            messages: the messages
+            errors: list receiving the index in the stream and error of
+                each skipped message
+
+        Returns:
+            Iterator[SyslogDataSet]: the messages that were not skipped
+
+        """
+        return self._decode(messages, errors)
+
+    def close(
+        self, errors: Optional[List[Tuple[int, Exception]]] = None
+    ) -> Iterator[SyslogDataSet]:
+        """End the stream.
+
+        Args:
+            errors: list receiving the index in the stream and error of
+                each skipped message
+
+        Returns:
+            Iterator[SyslogDataSet]: the last message of a LF terminated
+            stream, if it was not terminated
+
+        Raises:
+            ParseError: if an octet counted message is incomplete.
+
+        """
+        return self._decode(self._framer.close(), errors)
+
+    def _decode(
+        self,
+        frames: Iterable[Union[bytes, bytearray, memoryview]],
+        errors: Optional[List[Tuple[int, Exception]]],
+    ) -> Iterator[SyslogDataSet]:
+        for frame in frames:
+            index = self._count
+            self._count += 1
+            try:
+                self._reader.read_bytes(frame)
+                data = self._builder.release()
+            except FilteredError:
+                continue
+            except (ParseError, DeviationError) as error:
+                if errors is not None:
+                    errors.append((index, error))
+                continue
+            yield data
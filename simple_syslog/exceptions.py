@@ -28,6 +28,27 @@ class ParseError(Exception):
     pass
 
 
+class FilteredError(Exception):
+    """Custom Error raised for messages rejected by a filter of the builder."""
+
+    pass
+
+
+def detached_error(error: Exception) -> Exception:
+    """Copies an error without the objects of the parser it holds.
+
+    A ParseError also holds the RecognitionException, and with it the parser,
+    which does not pickle. The copy has the type and message of the error.
+
+    Args:
+        error: a ParseError, DeviationError or FilteredError
+
+    Returns:
+        Exception: a new error of the same type with only the message
+    """
+    return type(error)(*error.args[:1])
+
+
 class SimpleErrorStrategy(DefaultErrorStrategy):
     """DefaultErrorStrategy raising a ParseError."""
 
@@ -0,0 +1,294 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import contextlib
+import mmap
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from simple_syslog.builder import BuilderOptions
+from simple_syslog.data import SyslogDataSet
+from simple_syslog.decoder import SyslogStreamDecoder
+from simple_syslog.exceptions import ParseError, detached_error
+from simple_syslog.framing import find_line, find_octet_count
+from simple_syslog.reader import SPECIFICATIONS_OCTET_COUNTED
+from simple_syslog.specification import SyslogSpecification
+
+Path = Union[str, "os.PathLike[str]"]
+ErrorList = List[Tuple[int, Exception]]
+# messages, errors by index in the shard, number of messages in the shard
+_ShardResult = Tuple[List[SyslogDataSet], ErrorList, int]
+Buffer = Union[mmap.mmap, bytes]
+
+MIN_SHARD_SIZE = 1 << 16
+MAX_SHARD_SIZE = 1 << 26
+# parse_file gives back the pages of every this many bytes parsed
+_RELEASE_SIZE = 1 << 24
+
+# the decoder and specification of a worker process, set by _init_worker
+_worker: Optional[Tuple[SyslogStreamDecoder, SyslogSpecification]] = None
+
+
+def parse_file(
+    path: Path,
+    specification: Optional[SyslogSpecification] = None,
+    options: Optional[BuilderOptions] = None,
+    errors: Optional[ErrorList] = None,
+    two_stage: bool = False,
+) -> Iterator[SyslogDataSet]:
+    """Parse the messages of a file.
+
+    The file is memory mapped instead of read. Frames are found in the
+    mapped bytes and only the message being parsed is copied and decoded.
+    Parsed pages are given back to the system as parsing goes on, so memory
+    use does not grow with the size of the file.
+
+    Args:
+        path: the file
+        specification: SyslogSpecification or None.
+            If none SyslogSpecification.RFC_5424 will be used
+        options: the options of the DefaultBuilder or None for its
+            defaults, messages its filters reject are skipped
+        errors: list receiving the index in the file and error of each
+            skipped message
+        two_stage: parse with SLL first and fall back to LL on errors.
+
+    Yields:
+        SyslogDataSet: the messages, messages that fail with a ParseError or
+        DeviationError are skipped
+
+    Raises:
+        ParseError: if an octet count is invalid, or the last octet counted
+            message is incomplete.
+    """
+    if not specification:
+        specification = SyslogSpecification.RFC_5424
+    decoder = SyslogStreamDecoder(
+        specification=specification, options=options, two_stage=two_stage
+    )
+    octet_counted = specification in SPECIFICATIONS_OCTET_COUNTED
+    with _mapped(path) as buffer:
+        for start, end in _shards(buffer, octet_counted, _RELEASE_SIZE):
+            frames = _frames(buffer, start, end, specification)
+            yield from decoder.decode_batch(frames, errors)
+            _release(buffer, start, end)
+
+
+def parse_file_parallel(
+    path: Path,
+    specification: Optional[SyslogSpecification] = None,
+    options: Optional[BuilderOptions] = None,
+    errors: Optional[ErrorList] = None,
+    two_stage: bool = False,
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    shard_size: Optional[int] = None,
+) -> Iterator[SyslogDataSet]:
+    """Parse the messages of a file in worker processes.
+
+    The file is split into shards at frame boundaries, LF for RFC 3164 and
+    RFC 5424 files and octet counts for RFC 6587 and Heroku files. Each
+    worker process parses whole shards with a parser it keeps for its
+    lifetime. Only a few shards per worker are parsed ahead of the caller.
+
+    Finding the boundaries of octet counted frames reads every MSG-LEN in
+    the file, which is done in the calling process.
+
+    Args:
+        path: the file
+        specification: SyslogSpecification or None.
+            If none SyslogSpecification.RFC_5424 will be used
+        options: the options of the DefaultBuilders or None for their
+            defaults, messages their filters reject are skipped. They are
+            sent to the worker processes, so must be picklable
+        errors: list receiving the index in the file and error of each
+            skipped message. The errors are copies made by detached_error in
+            the workers, of the same type and with the same message
+        two_stage: parse with SLL first and fall back to LL on errors.
+        workers: number of worker processes, defaults to the number of CPUs
+        ordered: if True the messages come in file order, otherwise in the
+            order their shards are done
+        shard_size: bytes per shard, a shard ends at the first frame
+            boundary after it. Defaults to a quarter of the file per worker,
+            kept between MIN_SHARD_SIZE and MAX_SHARD_SIZE
+
+    Yields:
+        SyslogDataSet: the messages, messages that fail with a ParseError or
+        DeviationError are skipped
+
+    Raises:
+        ParseError: if an octet count is invalid, or the last octet counted
+            message is incomplete.
+    """
+    if not specification:
+        specification = SyslogSpecification.RFC_5424
+    workers = workers or os.cpu_count() or 1
+    octet_counted = specification in SPECIFICATIONS_OCTET_COUNTED
+    indexes = _ErrorIndexes(errors)
+    initargs = (specification, options, two_stage)
+    with _mapped(path) as buffer, ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=initargs
+    ) as executor:
+        if not shard_size:
+            shard_size = len(buffer) // (workers * 4)
+            shard_size = min(max(shard_size, MIN_SHARD_SIZE), MAX_SHARD_SIZE)
+        running: Deque[Tuple[int, "Future[_ShardResult]"]] = deque()
+        for number, (start, end) in enumerate(
+            _shards(buffer, octet_counted, shard_size)
+        ):
+            running.append((number, executor.submit(_parse_shard, path, start, end)))
+            if len(running) < 2 * workers:
+                continue
+            for done, result in _done(running, ordered, drain=False):
+                indexes.add(done, result)
+                yield from result[0]
+        for done, result in _done(running, ordered, drain=True):
+            indexes.add(done, result)
+            yield from result[0]
+
+
+class _ErrorIndexes:
+    """Turns the error indexes of shards into indexes in the file."""
+
+    def __init__(self, errors: Optional[ErrorList]) -> None:
+        self._errors = errors
+        self._next = 0
+        self._base = 0
+        self._waiting: Dict[int, _ShardResult] = {}
+
+    def add(self, number: int, result: _ShardResult) -> None:
+        if self._errors is None:
+            return
+        self._waiting[number] = result
+        while self._next in self._waiting:
+            _, errors, count = self._waiting.pop(self._next)
+            self._errors.extend((self._base + index, error) for index, error in errors)
+            self._base += count
+            self._next += 1
+
+
+def _done(
+    running: Deque[Tuple[int, "Future[_ShardResult]"]], ordered: bool, drain: bool
+) -> Iterator[Tuple[int, _ShardResult]]:
+    while running:
+        if ordered:
+            number, future = running.popleft()
+            yield number, future.result()
+        else:
+            done, _ = wait(
+                [future for _, future in running], return_when=FIRST_COMPLETED
+            )
+            for item in [item for item in running if item[1] in done]:
+                running.remove(item)
+                yield item[0], item[1].result()
+        if not drain:
+            return
+
+
+@contextlib.contextmanager
+def _mapped(path: Path) -> Iterator[Buffer]:
+    with open(path, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            # an empty file can not be mapped
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def _release(buffer: Buffer, start: int, end: int) -> None:
+    if isinstance(buffer, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED"):
+        start -= start % mmap.PAGESIZE
+        end -= end % mmap.PAGESIZE
+        if end > start:
+            buffer.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+
+def _shards(
+    buffer: Buffer, octet_counted: bool, shard_size: int
+) -> Iterator[Tuple[int, int]]:
+    size = len(buffer)
+    start = 0
+    while start < size:
+        if octet_counted:
+            end = _octet_counted_end(buffer, start, start + shard_size)
+        else:
+            end = buffer.find(b"\n", start + shard_size - 1)
+            end = size if end < 0 else end + 1
+        yield start, end
+        start = end
+
+
+def _octet_counted_end(buffer: Buffer, pos: int, target: int) -> int:
+    size = len(buffer)
+    while pos < target:
+        pos, prefix = find_octet_count(buffer, pos, size)
+        if prefix is None:
+            # _frames raises for the incomplete frame
+            return size
+        pos = prefix[0] + prefix[1]
+    return min(pos, size)
+
+
+def _frames(
+    buffer: Buffer, pos: int, end: int, specification: SyslogSpecification
+) -> Iterator[bytes]:
+    if specification not in SPECIFICATIONS_OCTET_COUNTED:
+        yield from _lines(buffer, pos, end)
+        return
+    heroku = specification == SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN
+    while True:
+        pos, prefix = find_octet_count(buffer, pos, end)
+        if pos == end:
+            return
+        if prefix is None or prefix[0] + prefix[1] > end:
+            raise ParseError(f"Incomplete frame @ {pos}")
+        start, length = prefix
+        yield buffer[pos if heroku else start : start + length]
+        pos = start + length
+
+
+def _lines(buffer: Buffer, pos: int, end: int) -> Iterator[bytes]:
+    while pos < end:
+        stop, following = find_line(buffer, pos, end)
+        if stop > pos:
+            yield buffer[pos:stop]
+        if following < 0:
+            return
+        pos = following
+
+
+def _init_worker(
+    specification: SyslogSpecification,
+    options: Optional[BuilderOptions],
+    two_stage: bool,
+) -> None:
+    global _worker
+    decoder = SyslogStreamDecoder(
+        specification=specification, options=options, two_stage=two_stage
+    )
+    _worker = (decoder, specification)
+
+
+def _parse_shard(path: Path, start: int, end: int) -> _ShardResult:
+    assert _worker is not None
+    decoder, specification = _worker
+    first = decoder.count
+    errors: ErrorList = []
+    with _mapped(path) as buffer:
+        frames = _frames(buffer, start, end, specification)
+        messages = list(decoder.decode_batch(frames, errors))
+    errors = [(index - first, detached_error(error)) for index, error in errors]
+    return messages, errors, decoder.count - first
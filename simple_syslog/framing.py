@@ -0,0 +1,201 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import mmap
+from typing import List, Optional, Tuple, Union
+
+from simple_syslog.exceptions import ParseError
+
+# text, whose octet counts the caller turns into characters, or bytes
+Buffer = Union[str, bytes, bytearray, mmap.mmap]
+
+# MSG-LEN is NONZERO-DIGIT *DIGIT, more than 9 digits is not a sane length
+_MAX_OCTET_COUNT_DIGITS = 9
+_SEPARATORS = b"\r\n "
+_CR = 13
+
+
+def find_octet_count(
+    buffer: Buffer, pos: int, end: int
+) -> Tuple[int, Optional[Tuple[int, int]]]:
+    """Find the MSG-LEN SP of the next octet counted frame.
+
+    LF, CR and SP before the frame are skipped.
+
+    Args:
+        buffer: the data
+        pos: index to look from
+        end: index after the data available
+
+    Returns:
+        the index of the MSG-LEN, and the index of the SYSLOG-MSG with the
+        MSG-LEN, or None if the data ends before the SP
+
+    Raises:
+        ParseError: if the MSG-LEN is invalid.
+    """
+    if isinstance(buffer, str):
+        while pos < end and buffer[pos] in "\r\n ":
+            pos += 1
+        limit = min(end, pos + _MAX_OCTET_COUNT_DIGITS + 1)
+        space = buffer.find(" ", pos, limit)
+    else:
+        while pos < end and buffer[pos] in _SEPARATORS:
+            pos += 1
+        limit = min(end, pos + _MAX_OCTET_COUNT_DIGITS + 1)
+        space = buffer.find(b" ", pos, limit)
+    count = buffer[pos : limit if space < 0 else space]
+    # str.isdigit takes other digits than 0 to 9
+    digits = not count or (count.isascii() and count.isdigit())
+    if space < 0 and digits and len(count) <= _MAX_OCTET_COUNT_DIGITS:
+        return pos, None
+    if space < 0 or not count or not digits or int(count[:1]) == 0:
+        raise ParseError(f"Invalid octet count @ {pos}")
+    return pos, (space + 1, int(count))
+
+
+def find_line(buffer: Buffer, pos: int, end: int) -> Tuple[int, int]:
+    """Find the end of the next LF terminated frame.
+
+    Args:
+        buffer: the data
+        pos: index of the frame
+        end: index after the data available
+
+    Returns:
+        the index after the frame, without a CR before the LF, and the
+        index after the LF, or -1 if there is no LF before end
+    """
+    if isinstance(buffer, str):
+        lf = buffer.find("\n", pos, end)
+        stop = end if lf < 0 else lf
+        if stop > pos and buffer[stop - 1] == "\r":
+            stop -= 1
+    else:
+        lf = buffer.find(b"\n", pos, end)
+        stop = end if lf < 0 else lf
+        if stop > pos and buffer[stop - 1] == _CR:
+            stop -= 1
+    return stop, -1 if lf < 0 else lf + 1
+
+
+class SyslogFramer:
+    """Splits a byte stream into RFC 6587 frames.
+
+    Octet counted frames are MSG-LEN SP SYSLOG-MSG, LF, CR or SP between
+    them are ignored. Non-transparent frames end with LF, a CR before the LF
+    is not part of the frame.
+
+    Data can be fed in pieces of any size, frames split across pieces are
+    completed by the next piece. Frames are memoryview slices of the data
+    fed in, or of a copy of it when a frame was split, and stay valid as
+    long as that data is not modified.
+    """
+
+    def __init__(self, octet_counted: bool = True, include_count: bool = False) -> None:
+        """Create new SyslogFramer.
+
+        Args:
+            octet_counted: True for octet counted frames, False for LF
+                terminated frames.
+            include_count: if True octet counted frames start with their
+                MSG-LEN SP.
+        """
+        self._octet_counted = octet_counted
+        self._include_count = include_count
+        self._pending = b""
+
+    @property
+    def pending(self) -> int:
+        """Number of bytes of an incomplete frame held back.
+
+        Returns:
+            the number of bytes
+        """
+        return len(self._pending)
+
+    def feed(self, data: Union[bytes, bytearray, memoryview]) -> List[memoryview]:
+        """Split the next piece of the stream into frames.
+
+        Args:
+            data: the next piece of the stream
+
+        Returns:
+            the frames completed by data
+
+        Raises:
+            ParseError: if an octet count is invalid.
+
+        """
+        buffer: Union[bytes, bytearray]
+        if self._pending:
+            buffer = b"".join((self._pending, data))
+        elif isinstance(data, memoryview):
+            buffer = data.tobytes()
+        else:
+            buffer = data
+        frames: List[memoryview] = []
+        if self._octet_counted:
+            end = self._split_octet_counted(buffer, frames)
+        else:
+            end = self._split_lines(buffer, frames)
+        self._pending = bytes(buffer[end:])
+        return frames
+
+    def close(self) -> List[memoryview]:
+        """End the stream.
+
+        A non-transparent frame does not need the final LF.
+
+        Returns:
+            the last frame, if there is one
+
+        Raises:
+            ParseError: if an octet counted frame is incomplete.
+
+        """
+        pending, self._pending = self._pending, b""
+        if self._octet_counted:
+            if pending.strip(_SEPARATORS):
+                raise ParseError(f"Incomplete frame of {len(pending)} bytes")
+            return []
+        stop = find_line(pending, 0, len(pending))[0]
+        return [memoryview(pending)[:stop]] if stop else []
+
+    def _split_octet_counted(
+        self, buffer: Union[bytes, bytearray], frames: List[memoryview]
+    ) -> int:
+        view = memoryview(buffer)
+        size = len(buffer)
+        pos = 0
+        while True:
+            pos, prefix = find_octet_count(buffer, pos, size)
+            if prefix is None:
+                return pos
+            start, length = prefix
+            if start + length > size:
+                return pos
+            frames.append(view[pos if self._include_count else start : start + length])
+            pos = start + length
+
+    @staticmethod
+    def _split_lines(buffer: Union[bytes, bytearray], frames: List[memoryview]) -> int:
+        view = memoryview(buffer)
+        pos = 0
+        while True:
+            stop, following = find_line(buffer, pos, len(buffer))
+            if following < 0:
+                return pos
+            if stop > pos:
+                frames.append(view[pos:stop])
+            pos = following
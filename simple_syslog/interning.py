@@ -0,0 +1,95 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Sharing of repeated header values.
+
+A fleet has few hosts, applications and message ids, but every message
+holds its own copy of their names. Interned, the messages of a batch share
+one string for each.
+"""
+from typing import Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class InternTable:
+    """A bounded table of strings, returning one instance for equal strings.
+
+    The table is cleared once it holds size strings, so names that are no
+    longer seen do not stay in it. It may be shared by builders, the
+    counters are then only approximate.
+    """
+
+    def __init__(self, size: int = 4096) -> None:
+        """Create new InternTable.
+
+        Args:
+            size: the number of strings to keep
+        """
+        self._table: Dict[str, str] = dict()
+        self._size = size
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        """Number of values found in the table.
+
+        Returns:
+            the number of hits
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Number of values added to the table.
+
+        Returns:
+            the number of misses
+        """
+        return self._misses
+
+    def __len__(self) -> int:
+        """Number of strings in the table."""
+        return len(self._table)
+
+    def intern(self, value: T) -> T:
+        """Get the instance of the table equal to value.
+
+        Args:
+            value: the value, values other than str are returned as they are
+
+        Returns:
+            the instance in the table, or value once it is added
+
+        """
+        try:
+            interned = self._table.get(value)  # type: ignore
+        except ValueError:
+            # a writable memoryview
+            return value
+        if interned is not None:
+            self._hits += 1
+            return interned  # type: ignore
+        if not isinstance(value, str):
+            return value
+        self._misses += 1
+        if len(self._table) >= self._size:
+            self._table.clear()
+        self._table[value] = value
+        return value
+
+    def clear(self) -> None:
+        """Empty the table and reset the counters."""
+        self._table.clear()
+        self._hits = self._misses = 0
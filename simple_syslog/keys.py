@@ -14,7 +14,7 @@
 import abc
 from abc import ABC
 from enum import Enum
-from typing import Dict
+from typing import Dict, Iterable, Optional, Tuple
 
 
 class SyslogFieldKey(Enum):
@@ -33,6 +33,10 @@ class SyslogFieldKey(Enum):
     STRUCTURED_BASE = 11
     STRUCTURED_ELEMENT_ID_FMT = 12
     STRUCTURED_ELEMENT_ID_PNAME_FMT = 13
+    HEADER_PRI_SEVERITY_NAME = 14
+    HEADER_PRI_FACILITY_NAME = 15
+    HEADER_TIMESTAMP_NANOS = 16
+    HEADER_TIMESTAMP_OFFSET = 17
 
 
 SyslogFieldKeyDefaults: Dict[SyslogFieldKey, str] = {
@@ -49,6 +53,10 @@ SyslogFieldKeyDefaults: Dict[SyslogFieldKey, str] = {
     SyslogFieldKey.STRUCTURED_BASE: "syslog.structuredData",
     SyslogFieldKey.STRUCTURED_ELEMENT_ID_FMT: "syslog.structuredData.{ID}",
     SyslogFieldKey.STRUCTURED_ELEMENT_ID_PNAME_FMT: "syslog.structuredData.{ID}.{PNAME}",
+    SyslogFieldKey.HEADER_PRI_SEVERITY_NAME: "syslog.header.severityName",
+    SyslogFieldKey.HEADER_PRI_FACILITY_NAME: "syslog.header.facilityName",
+    SyslogFieldKey.HEADER_TIMESTAMP_NANOS: "syslog.header.timestampNanos",
+    SyslogFieldKey.HEADER_TIMESTAMP_OFFSET: "syslog.header.timestampOffset",
 }
 
 
@@ -395,3 +403,30 @@ class DefaultKeyProvider(KeyProvider):
         return SyslogFieldKeyDefaults.get(
             SyslogFieldKey.STRUCTURED_ELEMENT_ID_PNAME_FMT, "UNKNOWN"
         )
+
+
+def compile_key_names(
+    key_provider: KeyProvider, fields: Optional[Iterable[SyslogFieldKey]] = None
+) -> Tuple[str, ...]:
+    """Look up the names of the SyslogFieldKeys once.
+
+    KeyProviders written before a SyslogFieldKey was added may not know it,
+    the keys they raise a LookupError for are named UNKNOWN, as they are by
+    DefaultKeyProvider.
+
+    Args:
+        key_provider: the KeyProvider
+        fields: the SyslogFieldKeys to look up, None for all of them. The
+            other keys are named UNKNOWN
+
+    Returns:
+        the names, indexed by the value of each SyslogFieldKey
+
+    """
+    names = ["UNKNOWN"] * (max(key.value for key in SyslogFieldKey) + 1)
+    for key in SyslogFieldKey if fields is None else fields:
+        try:
+            names[key.value] = key_provider.get(key)
+        except LookupError:
+            pass
+    return tuple(names)
@@ -11,21 +11,89 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Dict
+from typing import Dict, List, Optional, cast
 
-from simple_syslog.builder import MessageConsumer
+from antlr4 import ParserRuleContext, Token
+
+from simple_syslog.builder import MessageConsumer, Projection
+from simple_syslog.data import FieldValue
 from simple_syslog.generated.grammars.Rfc3164Listener import Rfc3164Listener
 from simple_syslog.generated.grammars.Rfc3164Parser import Rfc3164Parser
 from simple_syslog.generated.grammars.Rfc5424Listener import Rfc5424Listener
 from simple_syslog.generated.grammars.Rfc5424Parser import Rfc5424Parser
 from simple_syslog.keys import SyslogFieldKey
+from simple_syslog.streams import BytesInputStream, strip_span
+
+
+def _text(ctx: ParserRuleContext, raw: bool = False) -> FieldValue:
+    """Text of the tokens matched by ctx.
+
+    When the parser is not building parse trees ctx has no children, and the
+    text is sliced from the input between the start and stop tokens. Every
+    token of the grammars is a single character, so if the span holds as many
+    characters as tokens nothing was skipped by the lexer and one slice of the
+    input is all it takes. Otherwise the tokens are joined.
+
+    A BytesInputStream with spans set, or with raw set, returns memoryviews
+    instead of text.
+    """
+    if ctx.parser.buildParseTrees:
+        text: str = ctx.getText()
+        return text
+    start, stop = ctx.start, ctx.stop
+    if stop is None or stop.tokenIndex < start.tokenIndex:
+        return ""
+    stream = start.getInputStream()
+    contiguous = stop.stop - start.start == stop.tokenIndex - start.tokenIndex
+    if isinstance(stream, BytesInputStream):
+        if contiguous:
+            return stream.getValue(start.start, stop.stop, raw)
+        return stream.getValueAt((token.start for token in _tokens(ctx)), raw)
+    if contiguous:
+        text = stream.getText(start.start, stop.stop)
+        return text
+    return "".join(token.text for token in _tokens(ctx))
+
+
+def _tokens(ctx: ParserRuleContext) -> List[Token]:
+    tokens: List[Token] = ctx.parser.getTokenStream().tokens
+    return tokens[ctx.start.tokenIndex : ctx.stop.tokenIndex + 1]
+
+
+def _message_text(ctx: ParserRuleContext) -> Optional[FieldValue]:
+    """Stripped text of the message matched by ctx, None if there is none."""
+    stream = ctx.start.getInputStream()
+    msg = _text(ctx, isinstance(stream, BytesInputStream) and stream.raw_message)
+    if not msg:
+        return None
+    if isinstance(msg, memoryview):
+        return strip_span(msg)
+    return msg.strip()
+
+
+def _timestamp_text(ctx: ParserRuleContext) -> FieldValue:
+    if ctx.parser.buildParseTrees:
+        return f"{ctx.full_date().getText()}T{ctx.full_time().getText()}"
+    return _text(ctx)
+
+
+def _consume_message(
+    consumer: MessageConsumer, projection: Projection, ctx: ParserRuleContext
+) -> None:
+    if projection.message:
+        msg = _message_text(ctx)
+        if msg is not None:
+            consumer.consume_value(SyslogFieldKey.MESSAGE, msg)
 
 
 # flake8: noqa
 class Syslog5424Listener(Rfc5424Listener):
     """Default implementation of Rfc5424Listener.
 
-    Parsed values are provided to the MessageConsumer
+    Parsed values are provided to the MessageConsumer.
+    Values are taken from the tokens matched by each rule, so the parser
+    may be run with buildParseTrees set to False. The text of fields the
+    MessageConsumer does not want is never taken.
     """
 
     def __init__(self, message_consumer: MessageConsumer) -> None:
@@ -35,21 +103,19 @@ class Syslog5424Listener(Rfc5424Listener):
             message_consumer: MessageConsumer to receive parsed messages
         """
         self._consumer = message_consumer
+        self._projection = Projection(message_consumer)
+        self._sd_id: FieldValue = ""
+        self._sd_parameters: Dict[FieldValue, FieldValue] = dict()
+        self._param_name: FieldValue = ""
 
     # pylint: disable=D
     def exitHeaderPriorityValue(
         self, ctx: Rfc5424Parser.HeaderPriorityValueContext
     ) -> None:
-        priority = ctx.getText()
-        self._consumer.consume_value(SyslogFieldKey.HEADER_PRI, priority)
-        pri = int(priority)
-        sev = pri % 8
-        facility = int(pri / 8)
-        self._consumer.consume_value(SyslogFieldKey.HEADER_PRI_SEVERITY, f"{sev}")
-        self._consumer.consume_value(SyslogFieldKey.HEADER_PRI_FACILITY, f"{facility}")
+        self._consumer.consume_priority(_text(ctx))
 
     def exitHeaderVersion(self, ctx: Rfc5424Parser.HeaderVersionContext) -> None:
-        self._consumer.consume_value(SyslogFieldKey.HEADER_VERSION, ctx.getText())
+        self._consumer.consume_value(SyslogFieldKey.HEADER_VERSION, _text(ctx))
 
     def exitHeaderNilHostName(
         self, ctx: Rfc5424Parser.HeaderNilHostNameContext
@@ -57,25 +123,29 @@ class Syslog5424Listener(Rfc5424Listener):
         self._consumer.handle_nil(SyslogFieldKey.HEADER_HOSTNAME)
 
     def exitHeaderHostName(self, ctx: Rfc5424Parser.HeaderHostNameContext) -> None:
-        self._consumer.consume_value(SyslogFieldKey.HEADER_HOSTNAME, ctx.getText())
+        if self._projection.hostname:
+            self._consumer.consume_value(SyslogFieldKey.HEADER_HOSTNAME, _text(ctx))
 
     def exitHeaderNilAppName(self, ctx: Rfc5424Parser.HeaderNilAppNameContext) -> None:
         self._consumer.handle_nil(SyslogFieldKey.HEADER_APPNAME)
 
     def exitHeaderAppName(self, ctx: Rfc5424Parser.HeaderAppNameContext) -> None:
-        self._consumer.consume_value(SyslogFieldKey.HEADER_APPNAME, ctx.getText())
+        if self._projection.app_name:
+            self._consumer.consume_value(SyslogFieldKey.HEADER_APPNAME, _text(ctx))
 
     def exitHeaderNilProcId(self, ctx: Rfc5424Parser.HeaderNilProcIdContext) -> None:
         self._consumer.handle_nil(SyslogFieldKey.HEADER_PROCID)
 
     def exitHeaderProcId(self, ctx: Rfc5424Parser.HeaderProcIdContext) -> None:
-        self._consumer.consume_value(SyslogFieldKey.HEADER_PROCID, ctx.getText())
+        if self._projection.procid:
+            self._consumer.consume_value(SyslogFieldKey.HEADER_PROCID, _text(ctx))
 
     def exitHeaderNilMsgId(self, ctx: Rfc5424Parser.HeaderNilMsgIdContext) -> None:
         self._consumer.handle_nil(SyslogFieldKey.HEADER_MSGID)
 
     def exitHeaderMsgId(self, ctx: Rfc5424Parser.HeaderMsgIdContext) -> None:
-        self._consumer.consume_value(SyslogFieldKey.HEADER_MSGID, ctx.getText())
+        if self._projection.msgid:
+            self._consumer.consume_value(SyslogFieldKey.HEADER_MSGID, _text(ctx))
 
     def exitHeaderNilTimestamp(
         self, ctx: Rfc5424Parser.HeaderNilTimestampContext
@@ -83,31 +153,42 @@ class Syslog5424Listener(Rfc5424Listener):
         self._consumer.handle_nil(SyslogFieldKey.HEADER_TIMESTAMP)
 
     def exitHeaderTimeStamp(self, ctx: Rfc5424Parser.HeaderTimeStampContext) -> None:
-        self._consumer.consume_value(
-            SyslogFieldKey.HEADER_TIMESTAMP,
-            f"{ctx.full_date().getText()}T{ctx.full_time().getText()}",
-        )
+        if self._projection.timestamp:
+            self._consumer.consume_timestamp(_timestamp_text(ctx))
+
+    def exitSd_id(self, ctx: Rfc5424Parser.Sd_idContext) -> None:
+        if self._projection.structured_data:
+            self._sd_id = _text(ctx)
+            self._sd_parameters = dict()
+
+    def exitParamName(self, ctx: Rfc5424Parser.ParamNameContext) -> None:
+        if self._projection.structured_data:
+            self._param_name = _text(ctx)
+
+    def exitParamValue(self, ctx: Rfc5424Parser.ParamValueContext) -> None:
+        if self._projection.structured_data:
+            self._sd_parameters[self._param_name] = _text(ctx)
 
     def exitSdElement(self, ctx: Rfc5424Parser.SdElementContext) -> None:
-        identifier = ctx.sd_id().getText()
-        parameters: Dict[str, str] = dict()
-        for paramContext in ctx.sd_param():
-            parameters[
-                paramContext.param_name().getText()
-            ] = paramContext.param_value().getText()
-        self._consumer.consume_structured(identifier, parameters)
+        if self._projection.structured_data:
+            # with spans set these are memoryviews, kept as they are by the
+            # MessageConsumer
+            self._consumer.consume_structured(
+                cast(str, self._sd_id), cast(Dict[str, str], self._sd_parameters)
+            )
 
     def exitMsg_utf8(self, ctx: Rfc5424Parser.Msg_utf8Context) -> None:
-        msg = ctx.getText()
-        if msg and msg != "":
-            self._consumer.consume_value(SyslogFieldKey.MESSAGE, msg.strip())
+        _consume_message(self._consumer, self._projection, ctx)
 
 
 # flake8: noqa
 class Syslog3164Listener(Rfc3164Listener):
     """Default implementation of Rfc3164Listener.
 
-    Parsed values are provided to the MessageConsumer
+    Parsed values are provided to the MessageConsumer.
+    Values are taken from the tokens matched by each rule, so the parser
+    may be run with buildParseTrees set to False. The text of fields the
+    MessageConsumer does not want is never taken.
     """
 
     def __init__(self, message_consumer: MessageConsumer) -> None:
@@ -117,37 +198,31 @@ class Syslog3164Listener(Rfc3164Listener):
             message_consumer: MessageConsumer to receive parsed messages
         """
         self._consumer = message_consumer
+        self._projection = Projection(message_consumer)
 
     def exitHeaderPriorityValue(self, ctx: Rfc3164Parser.HeaderPriorityValueContext):
-        priority = ctx.getText()
-        self._consumer.consume_value(SyslogFieldKey.HEADER_PRI, priority)
-        pri = int(priority)
-        sev = pri % 8
-        facility = int(pri / 8)
-        self._consumer.consume_value(SyslogFieldKey.HEADER_PRI_SEVERITY, f"{sev}")
-        self._consumer.consume_value(SyslogFieldKey.HEADER_PRI_FACILITY, f"{facility}")
+        self._consumer.consume_priority(_text(ctx))
 
     def exitHeaderHostName(self, ctx: Rfc3164Parser.HeaderHostNameContext):
-        self._consumer.consume_value(SyslogFieldKey.HEADER_HOSTNAME, ctx.getText())
+        if self._projection.hostname:
+            self._consumer.consume_value(SyslogFieldKey.HEADER_HOSTNAME, _text(ctx))
 
     def exitHeaderTimeStamp(self, ctx: Rfc3164Parser.HeaderTimeStampContext):
-        self._consumer.consume_value(
-            SyslogFieldKey.HEADER_TIMESTAMP,
-            f"{ctx.full_date().getText()}T{ctx.full_time().getText()}",
-        )
+        if self._projection.timestamp:
+            self._consumer.consume_timestamp(_timestamp_text(ctx))
 
     def exitHeaderTimeStamp3164(self, ctx: Rfc3164Parser.HeaderTimeStamp3164Context):
-        self._consumer.consume_value(
-            SyslogFieldKey.HEADER_TIMESTAMP,
-            f"{ctx.date_month_short().getText()}{ctx.date_day_short().getText()} {ctx.partial_time().getText()}",
-        )
+        if not self._projection.timestamp:
+            return
+        timestamp: FieldValue
+        if ctx.parser.buildParseTrees:
+            timestamp = f"{ctx.date_month_short().getText()}{ctx.date_day_short().getText()} {ctx.partial_time().getText()}"
+        else:
+            timestamp = _text(ctx)
+        self._consumer.consume_timestamp(timestamp)
 
     def exitMsg_any(self, ctx: Rfc3164Parser.Msg_anyContext):
-        msg = ctx.getText()
-        if msg and msg != "":
-            self._consumer.consume_value(SyslogFieldKey.MESSAGE, msg.strip())
+        _consume_message(self._consumer, self._projection, ctx)
 
     def exitMsg_utf8(self, ctx: Rfc3164Parser.Msg_utf8Context):
-        msg = ctx.getText()
-        if msg and msg != "":
-            self._consumer.consume_value(SyslogFieldKey.MESSAGE, msg.strip())
+        _consume_message(self._consumer, self._projection, ctx)
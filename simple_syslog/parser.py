@@ -0,0 +1,290 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import dataclasses
+import threading
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from simple_syslog.builder import BuilderOptions
+from simple_syslog.data import SyslogDataSet
+from simple_syslog.exceptions import DeviationError, FilteredError, ParseError
+from simple_syslog.policy import AllowableDeviation, NilPolicy
+from simple_syslog.reader import SyslogStreamReader
+from simple_syslog.specification import SyslogSpecification
+
+
+class SyslogParser:
+    """Parses syslog messages into SyslogDataSets.
+
+    Messages are parsed by a SyslogStreamReader and collected by a
+    DefaultBuilder, both are created once and reused for every message, so a
+    SyslogParser must not be shared between threads. Use a SyslogParserPool
+    for that.
+    """
+
+    def __init__(
+        self,
+        specification: Optional[SyslogSpecification] = None,
+        options: Optional[BuilderOptions] = None,
+        two_stage: bool = False,
+    ) -> None:
+        """Create new SyslogParser.
+
+        Args:
+            specification: SyslogSpecification or None.
+                If none SyslogSpecification.RFC_5424 will be used
+            options: the options of the DefaultBuilder or None for its
+                defaults. parse raises a FilteredError for messages its
+                filters reject, parse_many skips them
+            two_stage: parse with SLL first and fall back to LL on errors.
+        """
+        self._builder = (options or BuilderOptions()).create(specification)
+        self._reader = SyslogStreamReader(
+            self._builder, specification=specification, two_stage=two_stage
+        )
+
+    def parse(self, text: str) -> SyslogDataSet:
+        """Parse a single message.
+
+        The returned SyslogDataSet is owned by this parser and is
+        cleared by the next call to parse.
+
+        Args:
+            text: the message
+
+        Returns:
+            SyslogDataSet: the parsed message
+
+        Raises:
+            DeviationError: if data is missing without AllowedDeviation.
+            FilteredError: if a filter rejects the message.
+            ParseError: if the message has syntax errors.
+
+        """
+        self._reader.read_message(text)
+        return self._builder.produce()
+
+    def parse_bytes(
+        self, data: Union[bytes, bytearray, memoryview], raw_message: bool = False
+    ) -> SyslogDataSet:
+        """Parse a single message held in bytes.
+
+        The message is parsed without decoding it first, only the values of
+        the SyslogDataSet are decoded, as UTF-8. With raw_message set the
+        message is not decoded at all, consumers routing on the header
+        fields never pay for it.
+
+        The returned SyslogDataSet is owned by this parser and is
+        cleared by the next call to parse.
+
+        Args:
+            data: the message
+            raw_message: if True the message is a memoryview of its bytes
+
+        Returns:
+            SyslogDataSet: the parsed message
+
+        Raises:
+            DeviationError: if data is missing without AllowedDeviation.
+            FilteredError: if a filter rejects the message.
+            ParseError: if the message has syntax errors.
+
+        """
+        self._reader.read_bytes(data, raw_message=raw_message)
+        return self._builder.produce()
+
+    def parse_header(
+        self, text: str, structured_data: bool = False
+    ) -> Tuple[SyslogDataSet, int]:
+        """Parse the header of a single message, leaving the body unread.
+
+        Meant for routing and filtering on the header fields, the body is
+        neither scanned nor checked. It can be parsed later with parse, for
+        the messages that need it.
+
+        The returned SyslogDataSet is owned by this parser and is
+        cleared by the next call to parse.
+
+        Args:
+            text: the message
+            structured_data: if True the structured data of RFC 5424
+                messages is parsed as well
+
+        Returns:
+            Tuple[SyslogDataSet, int]: the header fields and the index in
+            text where the body starts, the structured data or the MSG if
+            structured_data is set
+
+        Raises:
+            DeviationError: if data is missing without AllowedDeviation.
+            FilteredError: if a filter rejects the message.
+            ParseError: if the header has syntax errors.
+
+        """
+        body = self._reader.read_header(text, structured_data=structured_data)
+        return self._builder.produce(), body
+
+    def parse_header_bytes(
+        self, data: Union[bytes, bytearray, memoryview], structured_data: bool = False
+    ) -> Tuple[SyslogDataSet, int]:
+        """Parse the header of a single message held in bytes.
+
+        See parse_header.
+
+        Args:
+            data: the message
+            structured_data: if True the structured data of RFC 5424
+                messages is parsed as well
+
+        Returns:
+            Tuple[SyslogDataSet, int]: the header fields and the index in
+            data where the body starts
+
+        Raises:
+            DeviationError: if data is missing without AllowedDeviation.
+            FilteredError: if a filter rejects the message.
+            ParseError: if the header has syntax errors.
+
+        """
+        body = self._reader.read_header_bytes(data, structured_data=structured_data)
+        return self._builder.produce(), body
+
+    def parse_many(
+        self,
+        lines: Iterable[str],
+        errors: Optional[List[Tuple[int, Exception]]] = None,
+    ) -> Iterator[SyslogDataSet]:
+        """Parse a number of messages.
+
+        Unlike parse, the SyslogDataSets belong to the caller and are not
+        touched by later messages. Messages that fail with a ParseError or
+        DeviationError are skipped, as are those rejected by a filter.
+
+        Args:
+            lines: the messages
+            errors: list receiving the index and error of each skipped message
+
+        Yields:
+            SyslogDataSet: the parsed messages
+
+        """
+        for index, text in enumerate(lines):
+            try:
+                self._reader.read_message(text)
+                data = self._builder.release()
+            except FilteredError:
+                continue
+            except (ParseError, DeviationError) as error:
+                if errors is not None:
+                    errors.append((index, error))
+                continue
+            yield data
+
+
+class SyslogParserPool:
+    """Hands out one SyslogParser per thread.
+
+    All parsers share the same configuration and are created on first use
+    in each thread.
+    """
+
+    def __init__(
+        self,
+        specification: Optional[SyslogSpecification] = None,
+        options: Optional[BuilderOptions] = None,
+        two_stage: bool = False,
+    ) -> None:
+        """Create new SyslogParserPool.
+
+        Args:
+            specification: SyslogSpecification or None.
+                If none SyslogSpecification.RFC_5424 will be used
+            options: the options of the DefaultBuilders or None for their
+                defaults, see SyslogParser
+            two_stage: parse with SLL first and fall back to LL on errors.
+        """
+        self._specification = specification
+        self._options = options
+        self._two_stage = two_stage
+        self._local = threading.local()
+
+    def get(self) -> SyslogParser:
+        """Get the SyslogParser of the calling thread.
+
+        Returns:
+            SyslogParser: the parser owned by the calling thread
+
+        """
+        parser: Optional[SyslogParser] = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = SyslogParser(
+                specification=self._specification,
+                options=self._options,
+                two_stage=self._two_stage,
+            )
+            self._local.parser = parser
+        return parser
+
+    def parse(self, text: str) -> SyslogDataSet:
+        """Parse a single message with the parser of the calling thread.
+
+        Args:
+            text: the message
+
+        Returns:
+            SyslogDataSet: the parsed message, owned by the calling thread's parser
+
+        """
+        return self.get().parse(text)
+
+
+def parse_many(
+    lines: Iterable[str],
+    specification: Optional[SyslogSpecification] = None,
+    options: Optional[BuilderOptions] = None,
+    errors: Optional[List[Tuple[int, Exception]]] = None,
+    two_stage: bool = False,
+    nil_policy: Optional[NilPolicy] = None,
+    allowed_deviations: Optional[List[AllowableDeviation]] = None,
+) -> Iterator[SyslogDataSet]:
+    """Parse a number of messages with a single SyslogParser.
+
+    Args:
+        lines: the messages
+        specification: SyslogSpecification or None.
+            If none SyslogSpecification.RFC_5424 will be used
+        options: the options of the DefaultBuilder or None for its defaults,
+            messages its filters reject are skipped
+        errors: list receiving the index and error of each skipped message
+        two_stage: parse with SLL first and fall back to LL on errors.
+        nil_policy: Policy for handling missing or nil values or None.
+            If set it takes the place of the one in options
+        allowed_deviations: List of AllowableDeviation or None.
+            If set it takes the place of the one in options
+
+    Returns:
+        Iterator[SyslogDataSet]: the parsed messages, see SyslogParser.parse_many
+
+    """
+    if nil_policy is not None:
+        options = dataclasses.replace(
+            options or BuilderOptions(), nil_policy=nil_policy
+        )
+    if allowed_deviations is not None:
+        options = dataclasses.replace(
+            options or BuilderOptions(), allowed_deviations=allowed_deviations
+        )
+    parser = SyslogParser(
+        specification=specification, options=options, two_stage=two_stage
+    )
+    return parser.parse_many(lines, errors)
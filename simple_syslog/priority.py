@@ -0,0 +1,132 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Decoding of the PRI and VERSION of a message.
+
+Every valid PRI is decoded once, into a table keyed by its text, so the
+parsers look up the severity and facility of a message instead of computing
+them.
+
+see https://tools.ietf.org/html/rfc5424#section-6.2.1.
+"""
+from typing import Dict, NamedTuple, Optional, Tuple, Union
+
+# the keywords of RFC 5424 severities, as used by syslog.conf
+SEVERITY_NAMES: Tuple[str, ...] = (
+    "emerg",
+    "alert",
+    "crit",
+    "err",
+    "warning",
+    "notice",
+    "info",
+    "debug",
+)
+
+# the keywords of RFC 5424 facilities, as used by syslog.conf
+FACILITY_NAMES: Tuple[str, ...] = (
+    "kern",
+    "user",
+    "mail",
+    "daemon",
+    "auth",
+    "syslog",
+    "lpr",
+    "news",
+    "uucp",
+    "cron",
+    "authpriv",
+    "ftp",
+    "ntp",
+    "security",
+    "console",
+    "solaris-cron",
+    "local0",
+    "local1",
+    "local2",
+    "local3",
+    "local4",
+    "local5",
+    "local6",
+    "local7",
+)
+
+
+class Priority(NamedTuple):
+    """A decoded PRI, with its values as numbers and as text."""
+
+    value: int
+    severity: int
+    facility: int
+    severity_text: str
+    facility_text: str
+    severity_name: Optional[str]
+    facility_name: Optional[str]
+
+
+def _priority(value: int) -> Priority:
+    severity, facility = value & 7, value >> 3
+    return Priority(
+        value,
+        severity,
+        facility,
+        str(severity),
+        str(facility),
+        SEVERITY_NAMES[severity],
+        FACILITY_NAMES[facility] if facility < len(FACILITY_NAMES) else None,
+    )
+
+
+# every PRI of RFC 5424, 0 to 191, by its text
+PRIORITIES: Dict[str, Priority] = {str(value): _priority(value) for value in range(192)}
+# every VERSION the grammars accept, by its text
+VERSIONS: Dict[str, int] = {str(value): value for value in range(1, 1000)}
+
+
+def decode_priority(text: Union[str, memoryview]) -> Optional[Priority]:
+    """Decode the PRI of a message.
+
+    Values the table does not hold, such as ones with leading zeros or above
+    191, are computed the same way.
+
+    Args:
+        text: the PRI, without the angle brackets, or a memoryview of it
+
+    Returns:
+        the decoded PRI, or None if text is not a number, which only
+        happens when the ANTLR parser recovers from syntax errors
+
+    """
+    if not isinstance(text, str):
+        # a span of a BytesInputStream
+        text = str(text, "ascii", "replace")
+    priority = PRIORITIES.get(text)
+    if priority is None and text.isdecimal():
+        return _priority(int(text))
+    return priority
+
+
+def decode_version(text: Union[str, memoryview]) -> Union[int, str]:
+    """Decode the VERSION of a message.
+
+    Args:
+        text: the VERSION, or a memoryview of it
+
+    Returns:
+        the VERSION as a number, or its text if it is not a number
+
+    """
+    if not isinstance(text, str):
+        # a span of a BytesInputStream
+        text = str(text, "ascii", "replace")
+    return VERSIONS.get(text, text)
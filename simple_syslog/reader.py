@@ -0,0 +1,425 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from antlr4 import (
+    BailErrorStrategy,
+    CommonTokenStream,
+    InputStream,
+    Parser,
+    ParserRuleContext,
+    PredictionMode,
+)
+from antlr4.atn.ATNState import ATNState
+from antlr4.atn.Transition import RuleTransition
+from antlr4.error.Errors import ParseCancellationException
+from antlr4.error.ErrorStrategy import DefaultErrorStrategy
+
+from simple_syslog.builder import MessageConsumer
+from simple_syslog.exceptions import FilteredError, ParseError, SimpleErrorListener
+from simple_syslog.framing import find_line, find_octet_count
+from simple_syslog.generated.grammars.Rfc3164Lexer import Rfc3164Lexer
+from simple_syslog.generated.grammars.Rfc3164Parser import Rfc3164Parser
+from simple_syslog.generated.grammars.Rfc5424Lexer import Rfc5424Lexer
+from simple_syslog.generated.grammars.Rfc5424Parser import Rfc5424Parser
+from simple_syslog.listener import Syslog3164Listener, Syslog5424Listener
+from simple_syslog.scanner import Syslog3164Scanner, Syslog5424Scanner, SyslogScanner
+from simple_syslog.specification import SPECIFICATIONS_3164, SyslogSpecification
+from simple_syslog.streams import BytesInputStream, TextInputStream
+
+SPECIFICATIONS_OCTET_COUNTED = [
+    SyslogSpecification.RFC_6587_3164,
+    SyslogSpecification.RFC_6587_5424,
+    SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN,
+]
+
+_SPACE = ord(" ")
+
+
+def _invoked_rules(
+    parser: Parser, outer: str, rules: List[str]
+) -> Tuple[Tuple[str, int], ...]:
+    """The rules with the ATN state the outer rule first invokes each from."""
+    outer_index = parser.ruleNames.index(outer)
+    invoking: Dict[str, int] = {}
+    for state in parser.atn.states:
+        if state is None or state.ruleIndex != outer_index:
+            continue
+        for transition in state.transitions:
+            if isinstance(transition, RuleTransition):
+                name = parser.ruleNames[transition.target.ruleIndex]
+                invoking.setdefault(name, state.stateNumber)
+    return tuple((rule, invoking[rule]) for rule in rules)
+
+
+def _octet_end(text: str, start: int, length: int) -> Optional[int]:
+    # The index after the length octets of text starting at start, None if
+    # text holds fewer of them, or -1 if they end inside a character. A
+    # character is one octet or more, so the octets are in length characters.
+    chunk = text[start : start + length]
+    if chunk.isascii():
+        return start + length if len(chunk) == length else None
+    encoded = chunk.encode("utf-8")
+    if len(encoded) < length:
+        return None
+    try:
+        return start + len(encoded[:length].decode("utf-8"))
+    except UnicodeDecodeError:
+        return -1
+
+
+class SyslogStreamReader:
+    """Parses the messages in a buffer, one after the other.
+
+    The MessageConsumer is called with start and complete around the values
+    of each message. Messages are scanned in place where possible, and the
+    ANTLR lexer and parser are reused with a window moved over the buffer,
+    so no string or parser is created per message.
+
+    Well formed messages are handled by a hand written scanner, everything
+    else is parsed with the ANTLR generated parser. The ANTLR parser runs
+    without building a parse tree, the listeners receive their values while
+    the message is being parsed. Syntax errors raise a ParseError through
+    the SimpleErrorListener instead of being recovered from.
+
+    With two_stage set the ANTLR parser first runs in SLL prediction mode and
+    gives up on the first syntax error. Only then is the message parsed again,
+    from its first token, in full LL mode.
+
+    read_header stops after the header, or after the structured data, and
+    returns where the body starts, so that routing on header fields does
+    not pay for scanning the body.
+
+    RFC 3164 and RFC 5424 messages are separated by LF. RFC 6587 and Heroku
+    messages are octet counted, the count is taken in octets of the UTF-8
+    encoding of the buffer.
+    """
+
+    def __init__(
+        self,
+        message_consumer: MessageConsumer,
+        specification: Optional[SyslogSpecification] = None,
+        two_stage: bool = False,
+    ) -> None:
+        """Create new SyslogStreamReader.
+
+        Args:
+            message_consumer: MessageConsumer to receive parsed messages
+            specification: SyslogSpecification or None.
+                If none SyslogSpecification.RFC_5424 will be used
+            two_stage: parse with SLL first and fall back to LL on errors.
+        """
+        if not specification:
+            specification = SyslogSpecification.RFC_5424
+        self._specification = specification
+        self._consumer = message_consumer
+        self._octet_counted = specification in SPECIFICATIONS_OCTET_COUNTED
+        self._scanner: Optional[SyslogScanner] = None
+        if specification in SPECIFICATIONS_3164:
+            self._lexer = Rfc3164Lexer(InputStream(""))
+            self._parser = Rfc3164Parser(CommonTokenStream(self._lexer))
+            self._listener = Syslog3164Listener(message_consumer)
+            self._scanner = Syslog3164Scanner(message_consumer)
+        else:
+            self._lexer = Rfc5424Lexer(InputStream(""))
+            self._parser = Rfc5424Parser(CommonTokenStream(self._lexer))
+            self._listener = Syslog5424Listener(message_consumer)
+            if specification != SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN:
+                self._scanner = Syslog5424Scanner(message_consumer)
+        self._tokens = self._parser.getTokenStream()
+        self._stream = TextInputStream("")
+        self._parser.buildParseTrees = False
+        self._two_stage = two_stage
+        self._bail_strategy = BailErrorStrategy()
+        self._error_strategy = DefaultErrorStrategy()
+        self._error_listener = SimpleErrorListener()
+        # characters the lexer skips are kept in the values sliced from the
+        # input, so only syntax errors of the parser raise a ParseError
+        self._lexer.removeErrorListeners()
+        self._parser.removeErrorListeners()
+        self._parser.addErrorListener(self._error_listener)
+        # the rules of read_header, without and with the structured data
+        self._outer_context = ParserRuleContext(None, -1)
+        if specification == SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN:
+            outer, header = "heroku_https_log_drain", ["octet_prefix", "sp", "header"]
+            structured_data = header
+        elif specification in SPECIFICATIONS_3164:
+            outer, header = "syslog_msg", ["header"]
+            structured_data = header
+        else:
+            outer, header = "syslog_msg", ["header"]
+            structured_data = header + ["sp", "structured_data"]
+        self._header_rules = _invoked_rules(self._parser, outer, header)
+        self._header_sd_rules = _invoked_rules(self._parser, outer, structured_data)
+
+    def read(self, text: str) -> int:
+        """Parse all messages in text.
+
+        Messages the MessageConsumer rejects with a FilteredError are
+        skipped.
+
+        Args:
+            text: the buffer
+
+        Returns:
+            the index after the last complete message. Anything after it
+            is the start of an octet counted message that is not complete.
+
+        Raises:
+            ParseError: if an octet count is invalid, or if a message has
+                syntax errors.
+
+        """
+        if self._octet_counted:
+            return self._read_octet_counted(text)
+        return self._read_lines(text)
+
+    def read_message(
+        self, text: str, pos: int = 0, endpos: Optional[int] = None
+    ) -> None:
+        """Parse a single message.
+
+        Heroku messages include their octet count.
+
+        Args:
+            text: the message, or a buffer holding it
+            pos: index of the message in text
+            endpos: index after the message in text, defaults to len(text)
+
+        Raises:
+            FilteredError: if the MessageConsumer rejects the message.
+            ParseError: if the message has syntax errors.
+
+        """
+        self._consumer.start()
+        if not self._scanner or not self._scanner.scan(text, pos, endpos):
+            self._consumer.reset()
+            if self._stream.strdata is not text:
+                self._stream = TextInputStream(text)
+            self._stream.window(pos, endpos)
+            self._parse_antlr(self._stream)
+        self._consumer.complete()
+
+    def read_bytes(
+        self,
+        data: Union[bytes, bytearray, memoryview],
+        pos: int = 0,
+        endpos: Optional[int] = None,
+        raw_message: bool = False,
+    ) -> None:
+        """Parse a single message held in bytes, without decoding it first.
+
+        Every octet is a symbol of the grammars, only the values handed to
+        the MessageConsumer are decoded, as UTF-8.
+
+        Heroku messages include their octet count.
+
+        Args:
+            data: the message, or a buffer holding it
+            pos: index of the message in data
+            endpos: index after the message in data, defaults to len(data)
+            raw_message: if True the message is handed to the
+                MessageConsumer as a memoryview, left for the consumer to
+                decode
+
+        Raises:
+            FilteredError: if the MessageConsumer rejects the message.
+            ParseError: if the message has syntax errors.
+
+        """
+        self._consumer.start()
+        if not self._scanner or not self._scanner.scan_bytes(
+            data, pos, endpos, raw_message
+        ):
+            self._consumer.reset()
+            view = memoryview(data)[pos:endpos]
+            self._parse_antlr(BytesInputStream(view, raw_message=raw_message))
+        self._consumer.complete()
+
+    def read_header(
+        self,
+        text: str,
+        pos: int = 0,
+        endpos: Optional[int] = None,
+        structured_data: bool = False,
+    ) -> int:
+        """Parse the header of a single message, leaving the body unread.
+
+        The body can be parsed later, for the messages that need it.
+
+        Args:
+            text: the message, or a buffer holding it
+            pos: index of the message in text
+            endpos: index after the message in text, defaults to len(text)
+            structured_data: if True the structured data of RFC 5424
+                messages is parsed as well
+
+        Returns:
+            the index in text where the body starts, the structured data or
+            the MSG if structured_data is set
+
+        Raises:
+            FilteredError: if the MessageConsumer rejects the header.
+            ParseError: if the header has syntax errors.
+
+        """
+        self._consumer.start()
+        body = -1
+        if self._scanner:
+            body = self._scanner.scan_header(text, pos, endpos, structured_data)
+        if body < 0:
+            self._consumer.reset()
+            if self._stream.strdata is not text:
+                self._stream = TextInputStream(text)
+            self._stream.window(pos, endpos)
+            body = self._parse_antlr_header(self._stream, structured_data)
+            if text.startswith(" ", body, endpos):
+                body += 1
+        self._consumer.complete()
+        return body
+
+    def read_header_bytes(
+        self,
+        data: Union[bytes, bytearray, memoryview],
+        pos: int = 0,
+        endpos: Optional[int] = None,
+        structured_data: bool = False,
+    ) -> int:
+        """Parse the header of a single message held in bytes.
+
+        Args:
+            data: the message, or a buffer holding it
+            pos: index of the message in data
+            endpos: index after the message in data, defaults to len(data)
+            structured_data: if True the structured data of RFC 5424
+                messages is parsed as well
+
+        Returns:
+            the index in data where the body starts, the structured data or
+            the MSG if structured_data is set
+
+        Raises:
+            FilteredError: if the MessageConsumer rejects the header.
+            ParseError: if the header has syntax errors.
+
+        """
+        self._consumer.start()
+        body = -1
+        if self._scanner:
+            body = self._scanner.scan_header_bytes(data, pos, endpos, structured_data)
+        if body < 0:
+            self._consumer.reset()
+            view = memoryview(data)[pos:endpos]
+            body = self._parse_antlr_header(BytesInputStream(view), structured_data)
+            if body < len(view) and view[body] == _SPACE:
+                body += 1
+            body += pos
+        self._consumer.complete()
+        return body
+
+    def _read_lines(self, text: str) -> int:
+        pos = 0
+        size = len(text)
+        while pos < size:
+            end, following = find_line(text, pos, size)
+            if end > pos:
+                self._read_unfiltered(text, pos, end)
+            if following < 0:
+                break
+            pos = following
+        return size
+
+    def _read_unfiltered(self, text: str, pos: int, endpos: int) -> None:
+        try:
+            self.read_message(text, pos, endpos)
+        except FilteredError:
+            pass
+
+    def _read_octet_counted(self, text: str) -> int:
+        pos = 0
+        size = len(text)
+        heroku = self._specification == SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN
+        while True:
+            pos, prefix = find_octet_count(text, pos, size)
+            if prefix is None:
+                return pos
+            start, length = prefix
+            end = _octet_end(text, start, length)
+            if end is None:
+                return pos
+            if end < 0:
+                raise ParseError(f"Invalid octet count @ {pos}")
+            self._read_unfiltered(text, pos if heroku else start, end)
+            pos = end
+
+    def _parse_antlr_header(self, stream: InputStream, structured_data: bool) -> int:
+        rules = self._header_sd_rules if structured_data else self._header_rules
+        # the index after the last token of the rules, in stream indexes
+        stop = self._parse_antlr(stream, lambda: self._run_rules(rules)).stop
+        index: int = stream.index if stop is None else stop.stop + 1
+        return index
+
+    def _run_rules(self, rules: Tuple[Tuple[str, int], ...]) -> ParserRuleContext:
+        # The rules run as if invoked by the rule of the whole message, so
+        # that prediction sees what follows them there. Called as start
+        # rules they could end at any token.
+        parser = self._parser
+        ctx = self._outer_context
+        for name, state in rules:
+            parser._ctx = self._outer_context
+            parser.state = state
+            ctx = getattr(parser, name)()
+        return ctx
+
+    def _parse_antlr(
+        self,
+        stream: InputStream,
+        rules: Optional[Callable[[], ParserRuleContext]] = None,
+    ) -> ParserRuleContext:
+        self._lexer.inputStream = stream
+        self._tokens.setTokenSource(self._lexer)
+        parser = self._parser
+        if self._two_stage:
+            # BailErrorStrategy still reports the error it bails on
+            parser.removeErrorListeners()
+            parser._errHandler = self._bail_strategy
+            parser._interp.predictionMode = PredictionMode.SLL
+            try:
+                return self._run_parser(rules)
+            except ParseCancellationException:
+                self._consumer.reset()
+            # the tokens are kept, LL starts over at the first of them
+            self._tokens.seek(0)
+            parser.addErrorListener(self._error_listener)
+        parser._errHandler = self._error_strategy
+        parser._interp.predictionMode = PredictionMode.LL
+        return self._run_parser(rules)
+
+    def _run_parser(
+        self, rules: Optional[Callable[[], ParserRuleContext]]
+    ) -> ParserRuleContext:
+        # Parser.reset() fails in the python runtime while parse listeners
+        # are attached, so they are attached again after the reset.
+        self._parser.removeParseListeners()
+        self._parser.setInputStream(self._tokens)
+        self._parser.addParseListener(self._listener)
+        # Nor does it reset the ATN state, which read_header and aborted
+        # parses leave behind. The start rule would take it for the state
+        # it was invoked from, and report errors differently.
+        self._parser.state = ATNState.INVALID_STATE_NUMBER
+        if rules is not None:
+            return rules()
+        if self._specification == SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN:
+            return self._parser.heroku_https_log_drain()
+        return self._parser.syslog_msg()
@@ -0,0 +1,190 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import selectors
+import socket
+from types import TracebackType
+from typing import List, Optional, Tuple, Type
+
+from simple_syslog.builder import BuilderOptions
+from simple_syslog.data import SyslogDataSet
+from simple_syslog.decoder import SyslogStreamDecoder
+from simple_syslog.specification import SyslogSpecification
+
+# largest payload of a UDP datagram over IPv4
+MAX_DATAGRAM_SIZE = 65507
+
+
+class SyslogDatagramReceiver:
+    """Receives syslog messages over UDP in batches.
+
+    Every call drains the socket of up to batch_size datagrams without
+    blocking between them, so a burst of messages costs one wait instead of
+    one per datagram. The datagrams are read into a ring of slots allocated
+    once, and handed to the decoder as memoryview slices of it.
+
+    Datagrams longer than max_datagram_size are truncated.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 514,
+        specification: Optional[SyslogSpecification] = None,
+        options: Optional[BuilderOptions] = None,
+        two_stage: bool = False,
+        batch_size: int = 64,
+        max_datagram_size: int = MAX_DATAGRAM_SIZE,
+        reuse_port: bool = False,
+        receive_buffer_size: Optional[int] = None,
+    ) -> None:
+        """Create new SyslogDatagramReceiver bound to host and port.
+
+        Args:
+            host: address to listen on
+            port: port to listen on
+            specification: SyslogSpecification or None.
+                If none SyslogSpecification.RFC_5424 will be used
+            options: the options of the DefaultBuilder or None for its
+                defaults, messages its filters reject are skipped
+            two_stage: parse with SLL first and fall back to LL on errors.
+            batch_size: most datagrams read by one call
+            max_datagram_size: size of a slot in the ring
+            reuse_port: set SO_REUSEPORT, so that several receivers can
+                share the port
+            receive_buffer_size: SO_RCVBUF of the socket or None for the
+                system default, datagrams arriving while it is full are lost
+
+        Raises:
+            ValueError: if reuse_port is set and the platform lacks
+                SO_REUSEPORT.
+        """
+        if reuse_port and not hasattr(socket, "SO_REUSEPORT"):
+            raise ValueError("SO_REUSEPORT is not supported on this platform")
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        self._socket = socket.socket(family, socket.SOCK_DGRAM)
+        try:
+            if reuse_port:
+                self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            if receive_buffer_size:
+                self._socket.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer_size
+                )
+            self._socket.bind((host, port))
+            self._socket.setblocking(False)
+        except OSError:
+            self._socket.close()
+            raise
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._socket, selectors.EVENT_READ)
+        ring = memoryview(bytearray(batch_size * max_datagram_size))
+        self._slots = [
+            ring[pos : pos + max_datagram_size]
+            for pos in range(0, len(ring), max_datagram_size)
+        ]
+        self._decoder = SyslogStreamDecoder(
+            specification=specification, options=options, two_stage=two_stage
+        )
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """The address the socket is bound to.
+
+        Returns:
+            the host and port
+        """
+        return self._socket.getsockname()[:2]  # type: ignore
+
+    def fileno(self) -> int:
+        """The file descriptor of the socket, to wait on it in an event loop.
+
+        Returns:
+            the file descriptor
+        """
+        return self._socket.fileno()
+
+    def receive(self, timeout: Optional[float] = None) -> List[memoryview]:
+        """Read the datagrams waiting on the socket.
+
+        Waits for the first datagram, then reads the ones already queued.
+        The datagrams are slices of the ring and are overwritten by the
+        next call.
+
+        Args:
+            timeout: seconds to wait for the first datagram, None waits for
+                ever and 0 does not wait
+
+        Returns:
+            the datagrams, empty if the timeout expired
+        """
+        datagrams: List[memoryview] = []
+        recv_into = self._socket.recv_into
+        for slot in self._slots:
+            try:
+                size = recv_into(slot)
+            except BlockingIOError:
+                if datagrams or not self._selector.select(timeout):
+                    break
+                try:
+                    size = recv_into(slot)
+                except BlockingIOError:
+                    break
+            datagrams.append(slot[:size])
+        return datagrams
+
+    def receive_batch(
+        self,
+        timeout: Optional[float] = None,
+        errors: Optional[List[Tuple[int, Exception]]] = None,
+    ) -> List[SyslogDataSet]:
+        """Read and parse the datagrams waiting on the socket.
+
+        Args:
+            timeout: seconds to wait for the first datagram, None waits for
+                ever and 0 does not wait
+            errors: list receiving the index and error of each skipped
+                message, counted over the life of the receiver
+
+        Returns:
+            the messages, messages that fail with a ParseError or
+            DeviationError are skipped
+        """
+        return list(self._decoder.decode_batch(self.receive(timeout), errors))
+
+    def close(self) -> None:
+        """Close the socket."""
+        self._selector.close()
+        self._socket.close()
+
+    def __enter__(self) -> "SyslogDatagramReceiver":
+        """Enter the context.
+
+        Returns:
+            the receiver
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Close the socket when leaving the context.
+
+        Args:
+            exc_type: type of the exception raised, if any
+            exc_value: the exception raised, if any
+            traceback: traceback of the exception, if any
+        """
+        self.close()
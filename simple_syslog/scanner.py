@@ -0,0 +1,657 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Hand written scanners for well formed syslog messages.
+
+The scanners accept a strict subset of what the ANTLR grammars accept, and
+for that subset they produce exactly the same MessageConsumer callbacks as
+the listeners in simple_syslog.listener.  Anything they are not sure about is
+rejected, so that the caller can fall back to the ANTLR parser.
+"""
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+from simple_syslog.builder import MessageConsumer, Projection
+from simple_syslog.keys import SyslogFieldKey
+from simple_syslog.policy import DASH
+from simple_syslog.streams import strip_span
+from simple_syslog.structured import scan_structured, scan_structured_bytes
+
+Bytes = Union[bytes, bytearray, memoryview]
+
+# LF and CR are skipped by the lexers, TAB and anything above U+00FF (other
+# than the BOM) are token errors. Those messages go through ANTLR.
+# The 3164 lexer does not know the BOM either.
+_NEEDS_ANTLR_5424 = re.compile("[\t\n\r\u0100-\ufefe\uff00-\U0010ffff]")
+_NEEDS_ANTLR_3164 = re.compile("[\t\n\r\u0100-\U0010ffff]")
+
+_PRI = r"(?:<(?P<pri>[0-9]{1,3})>)?"
+_PARTIAL_TIME = r"[0-9]{2}:[0-9]{2}:[0-9]{2}(?:\.[0-9]{1,6})?"
+_TIMESTAMP = (
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2}T" + _PARTIAL_TIME + r"(?:Z|[+-][0-9]{2}:[0-9]{2})"
+)
+_TIMESTAMP_3164 = r"[A-Z][a-z]{2}  ?[0-9]{1,2} " + _PARTIAL_TIME
+
+_HEADER_5424 = re.compile(
+    _PRI + r"(?:(?P<version>[1-9][0-9]{0,2})(?= ))?"
+    r" ?"
+    r"(?P<timestamp>-|" + _TIMESTAMP + r")"
+    r" (?P<hostname>[!-~]+)"
+    r" (?P<app_name>[!-~]+)"
+    r" (?P<procid>[!-~]+)"
+    # the 5424 grammar takes a leading '-' of MSGID for NILVALUE
+    r" (?P<msgid>-|[!-,.-~][!-~]*)"
+    r" "
+)
+
+_HEADER_3164 = re.compile(
+    _PRI + r" ?"
+    r"(?P<timestamp>" + _TIMESTAMP + r"|" + _TIMESTAMP_3164 + r")"
+    r" (?P<hostname>[!-~]+)"
+    r" "
+)
+
+
+# Over bytes every octet is a symbol of the lexers, only TAB is a token
+# error and LF and CR are skipped.
+_HEADER_5424_BYTES = re.compile(_HEADER_5424.pattern.encode())
+_HEADER_3164_BYTES = re.compile(_HEADER_3164.pattern.encode())
+_BOM_BYTES = b"\xef\xbb\xbf"
+_CR, _LF, _SPACE, _DASH = b"\r\n -"
+
+
+def _message_end(text: str, pos: int, endpos: Optional[int]) -> int:
+    """Index after the message, without trailing CR and LF."""
+    if endpos is None:
+        endpos = len(text)
+    while endpos > pos and text[endpos - 1] in "\r\n":
+        endpos -= 1
+    return endpos
+
+
+def _needs_antlr(text: str, pos: int, endpos: int, pattern: "re.Pattern[str]") -> bool:
+    """Whether text holds anything only the ANTLR parser handles."""
+    if text.isascii():
+        # find is many times faster than searching for a character class
+        return (
+            text.find("\t", pos, endpos) >= 0
+            or text.find("\n", pos, endpos) >= 0
+            or text.find("\r", pos, endpos) >= 0
+        )
+    return pattern.search(text, pos, endpos) is not None
+
+
+def _message_end_bytes(data: Bytes, pos: int, endpos: Optional[int]) -> int:
+    """Index after the message, without trailing CR and LF."""
+    if endpos is None:
+        endpos = len(data)
+    while endpos > pos and data[endpos - 1] in (_CR, _LF):
+        endpos -= 1
+    return endpos
+
+
+def _message_bytes(
+    data: Bytes, pos: int, endpos: Optional[int]
+) -> Tuple[Union[bytes, bytearray], int, int]:
+    """The message without trailing CR and LF, in bytes that support find."""
+    if isinstance(data, memoryview):
+        data, pos, endpos = data[pos:endpos].tobytes(), 0, None
+    return data, pos, _message_end_bytes(data, pos, endpos)
+
+
+def _needs_antlr_bytes(data: Bytes, pos: int, endpos: int) -> bool:
+    """Whether data holds anything only the ANTLR parser handles."""
+    if isinstance(data, memoryview):
+        data, pos, endpos = data[pos:endpos].tobytes(), 0, endpos - pos
+    return (
+        data.find(b"\t", pos, endpos) >= 0
+        or data.find(b"\n", pos, endpos) >= 0
+        or data.find(b"\r", pos, endpos) >= 0
+    )
+
+
+def _ascii_groups(match: "re.Match[bytes]") -> Dict[str, Optional[str]]:
+    """Groups of a match over printusascii, decoded."""
+    return {
+        name: value if value is None else value.decode()
+        for name, value in match.groupdict().items()
+    }
+
+
+class SyslogScanner(ABC):
+    """SyslogScanner Abstract Base Class.
+
+    SyslogScanners provide the values of the messages they accept to the
+    MessageConsumer, in the same order and with the same values as the
+    matching listener would provide them. The header comes first, before
+    the rest of the message is looked at, so that a MessageConsumer raising
+    on it stops the scan early.
+    """
+
+    def __init__(self, message_consumer: MessageConsumer) -> None:
+        """Create new SyslogScanner.
+
+        Args:
+            message_consumer: MessageConsumer to receive parsed messages
+        """
+        self._consumer = message_consumer
+        self._projection = Projection(message_consumer)
+
+    @abstractmethod
+    def scan(self, text: str, pos: int = 0, endpos: Optional[int] = None) -> bool:
+        """Scan a single message.
+
+        The header is passed to the MessageConsumer as soon as it is
+        scanned, before the rest of the message, which may still be
+        rejected. The MessageConsumer is reset before such a message is
+        parsed with the ANTLR parser.
+
+        Args:
+            text: the message, or a buffer holding it
+            pos: index of the message in text
+            endpos: index after the message in text, defaults to len(text)
+
+        Returns:
+            True if the message was accepted, False if it has to be parsed
+            with the ANTLR parser instead.
+
+        """
+        pass
+
+    @abstractmethod
+    def scan_bytes(
+        self,
+        data: Bytes,
+        pos: int = 0,
+        endpos: Optional[int] = None,
+        raw_message: bool = False,
+    ) -> bool:
+        """Scan a single message held in bytes.
+
+        Only the values handed to the MessageConsumer are decoded. The
+        message is accepted or rejected as the ANTLR parser would over a
+        BytesInputStream, which reads every octet as a symbol.
+
+        Args:
+            data: the message, or a buffer holding it
+            pos: index of the message in data
+            endpos: index after the message in data, defaults to len(data)
+            raw_message: if True the message is handed over as a memoryview,
+                instead of being decoded as UTF-8
+
+        Returns:
+            True if the message was accepted, False if it has to be parsed
+            with the ANTLR parser instead.
+
+        """
+        pass
+
+    @abstractmethod
+    def scan_header(
+        self,
+        text: str,
+        pos: int = 0,
+        endpos: Optional[int] = None,
+        structured_data: bool = False,
+    ) -> int:
+        """Scan the header of a message, leaving the body unread.
+
+        The header is passed to the MessageConsumer before the structured
+        data is scanned, see scan.
+
+        Args:
+            text: the message, or a buffer holding it
+            pos: index of the message in text
+            endpos: index after the message in text, defaults to len(text)
+            structured_data: if True the structured data of RFC 5424
+                messages is scanned as well
+
+        Returns:
+            the index in text where the body starts, or -1 if the header has
+            to be parsed with the ANTLR parser instead.
+
+        """
+        pass
+
+    @abstractmethod
+    def scan_header_bytes(
+        self,
+        data: Bytes,
+        pos: int = 0,
+        endpos: Optional[int] = None,
+        structured_data: bool = False,
+    ) -> int:
+        """Scan the header of a message held in bytes, leaving the body unread.
+
+        Args:
+            data: the message, or a buffer holding it
+            pos: index of the message in data
+            endpos: index after the message in data, defaults to len(data)
+            structured_data: if True the structured data of RFC 5424
+                messages is scanned as well
+
+        Returns:
+            the index in data where the body starts, or -1 if the header has
+            to be parsed with the ANTLR parser instead.
+
+        """
+        pass
+
+    def _emit_message(self, msg: str) -> None:
+        if msg and self._projection.message:
+            self._consumer.consume_value(SyslogFieldKey.MESSAGE, msg.strip())
+
+    def _emit_message_bytes(
+        self, data: Bytes, pos: int, endpos: int, raw_message: bool
+    ) -> None:
+        if endpos <= pos or not self._projection.message:
+            return
+        span = memoryview(data)[pos:endpos]
+        if raw_message:
+            msg: Union[str, memoryview] = strip_span(span)
+        else:
+            msg = str(span, "utf-8", "replace").strip()
+        self._consumer.consume_value(SyslogFieldKey.MESSAGE, msg)
+
+
+class Syslog5424Scanner(SyslogScanner):
+    """Single pass scanner for RFC 5424 messages.
+
+    Counterpart of Syslog5424Listener.
+    """
+
+    def __init__(self, message_consumer: MessageConsumer) -> None:
+        """Create new Syslog5424Scanner.
+
+        Args:
+            message_consumer: MessageConsumer to receive parsed messages
+        """
+        super().__init__(message_consumer)
+        self._header_fields = tuple(
+            (field_key, group)
+            for field_key, group in (
+                (SyslogFieldKey.HEADER_HOSTNAME, "hostname"),
+                (SyslogFieldKey.HEADER_APPNAME, "app_name"),
+                (SyslogFieldKey.HEADER_PROCID, "procid"),
+                (SyslogFieldKey.HEADER_MSGID, "msgid"),
+            )
+            if message_consumer.wants(field_key)
+        )
+
+    def scan(self, text: str, pos: int = 0, endpos: Optional[int] = None) -> bool:
+        """Scan a single message.
+
+        The header is passed to the MessageConsumer as soon as it is
+        scanned, before the rest of the message, which may still be
+        rejected. The MessageConsumer is reset before such a message is
+        parsed with the ANTLR parser.
+
+        Args:
+            text: the message, or a buffer holding it
+            pos: index of the message in text
+            endpos: index after the message in text, defaults to len(text)
+
+        Returns:
+            True if the message was accepted, False if it has to be parsed
+            with the ANTLR parser instead.
+
+        """
+        endpos = _message_end(text, pos, endpos)
+        header = _HEADER_5424.match(text, pos, endpos)
+        if not header:
+            return False
+        self._emit_header(header.groupdict())
+        if _needs_antlr(text, pos, endpos, _NEEDS_ANTLR_5424):
+            return False
+
+        structured = self._new_structured()
+        start = header.end()
+        pos = end = scan_structured(text, start, endpos, structured)
+        if pos < 0:
+            return False
+
+        if text.startswith(" ", pos, endpos):
+            pos += 1
+        if text.startswith("\ufeff", pos, endpos):
+            pos += 1
+        elif text.startswith("\xef\xbb\xbf", pos, endpos):
+            pos += 3
+        msg = text[pos:endpos]
+        if "\ufeff" in msg:
+            return False
+
+        self._emit_structured(structured, text, start, end)
+        self._emit_message(msg)
+        return True
+
+    def scan_bytes(
+        self,
+        data: Bytes,
+        pos: int = 0,
+        endpos: Optional[int] = None,
+        raw_message: bool = False,
+    ) -> bool:
+        """Scan a single message held in bytes.
+
+        Only the values handed to the MessageConsumer are decoded. The
+        message is accepted or rejected as the ANTLR parser would over a
+        BytesInputStream, which reads every octet as a symbol.
+
+        Args:
+            data: the message, or a buffer holding it
+            pos: index of the message in data
+            endpos: index after the message in data, defaults to len(data)
+            raw_message: if True the message is handed over as a memoryview,
+                instead of being decoded as UTF-8
+
+        Returns:
+            True if the message was accepted, False if it has to be parsed
+            with the ANTLR parser instead.
+
+        """
+        data, pos, endpos = _message_bytes(data, pos, endpos)
+        header = _HEADER_5424_BYTES.match(data, pos, endpos)
+        if not header:
+            return False
+        self._emit_header(_ascii_groups(header))
+        if _needs_antlr_bytes(data, pos, endpos):
+            return False
+
+        structured = self._new_structured()
+        start = header.end()
+        pos = end = scan_structured_bytes(data, start, endpos, structured)
+        if pos < 0:
+            return False
+
+        if pos < endpos and data[pos] == _SPACE:
+            pos += 1
+        if data.startswith(_BOM_BYTES, pos, endpos):
+            pos += 3
+
+        self._emit_structured_bytes(structured, data, start, end)
+        self._emit_message_bytes(data, pos, endpos, raw_message)
+        return True
+
+    def scan_header(
+        self,
+        text: str,
+        pos: int = 0,
+        endpos: Optional[int] = None,
+        structured_data: bool = False,
+    ) -> int:
+        """Scan the header of a message, leaving the body unread.
+
+        The fields of the header are printusascii, so only the structured
+        data is checked for what the ANTLR parser has to handle.
+
+        Args:
+            text: the message, or a buffer holding it
+            pos: index of the message in text
+            endpos: index after the message in text, defaults to len(text)
+            structured_data: if True the structured data is scanned as well
+
+        Returns:
+            the index in text where the structured data starts, or where the
+            MSG starts if structured_data is set. -1 if the header has to be
+            parsed with the ANTLR parser instead.
+
+        """
+        endpos = _message_end(text, pos, endpos)
+        header = _HEADER_5424.match(text, pos, endpos)
+        if not header:
+            return -1
+        self._emit_header(header.groupdict())
+        pos = header.end()
+        if structured_data:
+            structured = self._new_structured()
+            start = pos
+            pos = scan_structured(text, start, endpos, structured)
+            if pos < 0 or _needs_antlr(text, start, pos, _NEEDS_ANTLR_5424):
+                return -1
+            self._emit_structured(structured, text, start, pos)
+            if text.startswith(" ", pos, endpos):
+                pos += 1
+        return pos
+
+    def scan_header_bytes(
+        self,
+        data: Bytes,
+        pos: int = 0,
+        endpos: Optional[int] = None,
+        structured_data: bool = False,
+    ) -> int:
+        """Scan the header of a message held in bytes, leaving the body unread.
+
+        Args:
+            data: the message, or a buffer holding it
+            pos: index of the message in data
+            endpos: index after the message in data, defaults to len(data)
+            structured_data: if True the structured data is scanned as well
+
+        Returns:
+            the index in data where the structured data starts, or where the
+            MSG starts if structured_data is set. -1 if the header has to be
+            parsed with the ANTLR parser instead.
+
+        """
+        endpos = _message_end_bytes(data, pos, endpos)
+        header = _HEADER_5424_BYTES.match(data, pos, endpos)
+        if not header:
+            return -1
+        self._emit_header(_ascii_groups(header))
+        pos = header.end()
+        if structured_data:
+            structured = self._new_structured()
+            start = pos
+            pos = scan_structured_bytes(data, start, endpos, structured)
+            if pos < 0 or _needs_antlr_bytes(data, start, pos):
+                return -1
+            self._emit_structured_bytes(structured, data, start, pos)
+            if pos < endpos and data[pos] == _SPACE:
+                pos += 1
+        return pos
+
+    def _new_structured(self) -> Optional[List[Tuple[str, Dict[str, str]]]]:
+        # the structured data is checked but not collected when not wanted,
+        # or wanted as text
+        projection = self._projection
+        if projection.structured_data and not projection.structured_text:
+            return []
+        return None
+
+    def _emit_structured(
+        self,
+        structured: Optional[List[Tuple[str, Dict[str, str]]]],
+        text: str,
+        start: int,
+        end: int,
+    ) -> None:
+        if structured is not None:
+            for identifier, parameters in structured:
+                self._consumer.consume_structured(identifier, parameters)
+        elif self._projection.structured_text and text[start] != DASH:
+            self._consumer.consume_structured_text(text[start:end])
+
+    def _emit_structured_bytes(
+        self,
+        structured: Optional[List[Tuple[str, Dict[str, str]]]],
+        data: Bytes,
+        start: int,
+        end: int,
+    ) -> None:
+        if structured is not None:
+            for identifier, parameters in structured:
+                self._consumer.consume_structured(identifier, parameters)
+        elif self._projection.structured_text and data[start] != _DASH:
+            text = str(memoryview(data)[start:end], "utf-8", "replace")
+            self._consumer.consume_structured_text(text)
+
+    def _emit_header(self, header: Mapping[str, Optional[str]]) -> None:
+        consumer = self._consumer
+        priority = header["pri"]
+        if priority is not None:
+            consumer.consume_priority(priority)
+        version = header["version"]
+        if version is not None:
+            consumer.consume_value(SyslogFieldKey.HEADER_VERSION, version)
+        # the groups after the VERSION are always matched
+        if self._projection.timestamp:
+            timestamp = header["timestamp"]
+            if timestamp == DASH:
+                consumer.handle_nil(SyslogFieldKey.HEADER_TIMESTAMP)
+            elif timestamp is not None:
+                consumer.consume_timestamp(timestamp)
+        for field_key, group in self._header_fields:
+            value = header[group]
+            if value == DASH:
+                consumer.handle_nil(field_key)
+            elif value is not None:
+                consumer.consume_value(field_key, value)
+
+
+class Syslog3164Scanner(SyslogScanner):
+    """Single pass scanner for RFC 3164 messages.
+
+    Counterpart of Syslog3164Listener, handles both the BSD and the ISO
+    timestamp forms.
+    """
+
+    def scan(self, text: str, pos: int = 0, endpos: Optional[int] = None) -> bool:
+        """Scan a single message.
+
+        The header is passed to the MessageConsumer as soon as it is
+        scanned, before the rest of the message, which may still be
+        rejected. The MessageConsumer is reset before such a message is
+        parsed with the ANTLR parser.
+
+        Args:
+            text: the message, or a buffer holding it
+            pos: index of the message in text
+            endpos: index after the message in text, defaults to len(text)
+
+        Returns:
+            True if the message was accepted, False if it has to be parsed
+            with the ANTLR parser instead.
+
+        """
+        endpos = _message_end(text, pos, endpos)
+        header = _HEADER_3164.match(text, pos, endpos)
+        if not header:
+            return False
+        self._emit_header(header.groupdict())
+        if _needs_antlr(text, pos, endpos, _NEEDS_ANTLR_3164):
+            return False
+
+        self._emit_message(text[header.end() : endpos])
+        return True
+
+    def scan_bytes(
+        self,
+        data: Bytes,
+        pos: int = 0,
+        endpos: Optional[int] = None,
+        raw_message: bool = False,
+    ) -> bool:
+        """Scan a single message held in bytes.
+
+        Only the values handed to the MessageConsumer are decoded. The
+        message is accepted or rejected as the ANTLR parser would over a
+        BytesInputStream, which reads every octet as a symbol.
+
+        Args:
+            data: the message, or a buffer holding it
+            pos: index of the message in data
+            endpos: index after the message in data, defaults to len(data)
+            raw_message: if True the message is handed over as a memoryview,
+                instead of being decoded as UTF-8
+
+        Returns:
+            True if the message was accepted, False if it has to be parsed
+            with the ANTLR parser instead.
+
+        """
+        data, pos, endpos = _message_bytes(data, pos, endpos)
+        header = _HEADER_3164_BYTES.match(data, pos, endpos)
+        if not header:
+            return False
+        self._emit_header(_ascii_groups(header))
+        if _needs_antlr_bytes(data, pos, endpos):
+            return False
+
+        self._emit_message_bytes(data, header.end(), endpos, raw_message)
+        return True
+
+    def scan_header(
+        self,
+        text: str,
+        pos: int = 0,
+        endpos: Optional[int] = None,
+        structured_data: bool = False,
+    ) -> int:
+        """Scan the header of a message, leaving the body unread.
+
+        Args:
+            text: the message, or a buffer holding it
+            pos: index of the message in text
+            endpos: index after the message in text, defaults to len(text)
+            structured_data: ignored, RFC 3164 messages have none
+
+        Returns:
+            the index in text where the MSG starts, or -1 if the header has
+            to be parsed with the ANTLR parser instead.
+
+        """
+        header = _HEADER_3164.match(text, pos, _message_end(text, pos, endpos))
+        if not header:
+            return -1
+        self._emit_header(header.groupdict())
+        return header.end()
+
+    def scan_header_bytes(
+        self,
+        data: Bytes,
+        pos: int = 0,
+        endpos: Optional[int] = None,
+        structured_data: bool = False,
+    ) -> int:
+        """Scan the header of a message held in bytes, leaving the body unread.
+
+        Args:
+            data: the message, or a buffer holding it
+            pos: index of the message in data
+            endpos: index after the message in data, defaults to len(data)
+            structured_data: ignored, RFC 3164 messages have none
+
+        Returns:
+            the index in data where the MSG starts, or -1 if the header has
+            to be parsed with the ANTLR parser instead.
+
+        """
+        endpos = _message_end_bytes(data, pos, endpos)
+        header = _HEADER_3164_BYTES.match(data, pos, endpos)
+        if not header:
+            return -1
+        self._emit_header(_ascii_groups(header))
+        return header.end()
+
+    def _emit_header(self, header: Mapping[str, Optional[str]]) -> None:
+        priority = header["pri"]
+        if priority is not None:
+            self._consumer.consume_priority(priority)
+        # the TIMESTAMP and HOSTNAME groups are always matched
+        timestamp, hostname = header["timestamp"], header["hostname"]
+        if self._projection.timestamp and timestamp is not None:
+            self._consumer.consume_timestamp(timestamp)
+        if self._projection.hostname and hostname is not None:
+            self._consumer.consume_value(SyslogFieldKey.HEADER_HOSTNAME, hostname)
@@ -0,0 +1,266 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""asyncio syslog receivers.
+
+Messages are delivered in batches, either to an async callback or to an
+asyncio.Queue. Parse and deviation errors skip the message.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple, Union
+
+from simple_syslog.builder import BuilderOptions
+from simple_syslog.data import SyslogDataSet
+from simple_syslog.decoder import SyslogStreamDecoder
+from simple_syslog.exceptions import ParseError
+from simple_syslog.specification import SyslogSpecification
+
+BatchHandler = Union[
+    Callable[[List[SyslogDataSet]], Awaitable[Any]],
+    "asyncio.Queue[List[SyslogDataSet]]",
+]
+
+
+class _BatchDelivery:
+    """Hands batches to the BatchHandler.
+
+    Reading from a transport that can be paused stops while its batch is
+    handled, or while a bounded queue is full. Batches from transports that
+    cannot be paused are dropped when the queue is full.
+    """
+
+    def __init__(self, handler: BatchHandler) -> None:
+        self._handler = handler
+        self._tasks: Set["asyncio.Future[Any]"] = set()
+        self.dropped = 0
+
+    def deliver(
+        self, batch: List[SyslogDataSet], transport: Optional[asyncio.Transport] = None
+    ) -> None:
+        handler = self._handler
+        if isinstance(handler, asyncio.Queue):
+            try:
+                handler.put_nowait(batch)
+                return
+            except asyncio.QueueFull:
+                if transport is None:
+                    self.dropped += len(batch)
+                    return
+            task = asyncio.ensure_future(handler.put(batch))
+        else:
+            task = asyncio.ensure_future(handler(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if transport is not None:
+            transport.pause_reading()
+            task.add_done_callback(lambda _: _resume(transport))
+
+
+def _resume(transport: asyncio.Transport) -> None:
+    if not transport.is_closing():
+        transport.resume_reading()
+
+
+class SyslogDatagramProtocol(asyncio.DatagramProtocol):
+    """Receives one syslog message per UDP datagram.
+
+    The messages of all datagrams received in one iteration of the event
+    loop are delivered as one batch.
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler,
+        specification: Optional[SyslogSpecification] = None,
+        options: Optional[BuilderOptions] = None,
+        two_stage: bool = False,
+    ) -> None:
+        """Create new SyslogDatagramProtocol.
+
+        Args:
+            handler: async callback or asyncio.Queue receiving the batches
+            specification: SyslogSpecification or None.
+                If none SyslogSpecification.RFC_5424 will be used
+            options: the options of the DefaultBuilder or None for its
+                defaults, messages its filters reject are skipped
+            two_stage: parse with SLL first and fall back to LL on errors.
+        """
+        self._delivery = _BatchDelivery(handler)
+        self._decoder = SyslogStreamDecoder(
+            specification=specification, options=options, two_stage=two_stage
+        )
+        self._batch: List[SyslogDataSet] = []
+
+    @property
+    def dropped(self) -> int:
+        """Number of messages dropped because the queue was full.
+
+        Returns:
+            the number of messages
+        """
+        return self._delivery.dropped
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        """Parse a datagram.
+
+        Args:
+            data: the datagram
+            addr: address of the sender
+        """
+        if not self._batch:
+            asyncio.get_running_loop().call_soon(self._flush)
+        self._batch.extend(self._decoder.decode(data))
+
+    def _flush(self) -> None:
+        batch, self._batch = self._batch, []
+        if batch:
+            self._delivery.deliver(batch)
+
+
+class SyslogStreamProtocol(asyncio.Protocol):
+    """Receives syslog messages over a TCP connection.
+
+    The framing follows the SyslogSpecification, see SyslogStreamDecoder.
+    The messages of each read are delivered as one batch, and reading is
+    paused until the batch is handled. Connections with invalid framing are
+    closed.
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler,
+        specification: Optional[SyslogSpecification] = None,
+        options: Optional[BuilderOptions] = None,
+        two_stage: bool = False,
+    ) -> None:
+        """Create new SyslogStreamProtocol.
+
+        Args:
+            handler: async callback or asyncio.Queue receiving the batches
+            specification: SyslogSpecification or None.
+                If none SyslogSpecification.RFC_5424 will be used
+            options: the options of the DefaultBuilder or None for its
+                defaults, messages its filters reject are skipped
+            two_stage: parse with SLL first and fall back to LL on errors.
+        """
+        self._delivery = _BatchDelivery(handler)
+        self._decoder = SyslogStreamDecoder(
+            specification=specification, options=options, two_stage=two_stage
+        )
+        self._transport: Optional[asyncio.Transport] = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Keep the transport of the connection.
+
+        Args:
+            transport: the transport
+        """
+        self._transport = transport  # type: ignore
+
+    def data_received(self, data: bytes) -> None:
+        """Parse the messages completed by data.
+
+        Args:
+            data: the data read
+        """
+        try:
+            batch = list(self._decoder.feed(data))
+        except ParseError:
+            if self._transport is not None:
+                self._transport.close()
+            return
+        if batch:
+            self._delivery.deliver(batch, self._transport)
+
+    def eof_received(self) -> Optional[bool]:
+        """Parse a last message that was not terminated.
+
+        Returns:
+            None, the transport closes itself
+        """
+        try:
+            batch = list(self._decoder.close())
+        except ParseError:
+            return None
+        if batch:
+            self._delivery.deliver(batch)
+        return None
+
+
+async def start_udp_server(
+    handler: BatchHandler,
+    host: str = "127.0.0.1",
+    port: int = 514,
+    specification: Optional[SyslogSpecification] = None,
+    options: Optional[BuilderOptions] = None,
+    two_stage: bool = False,
+    reuse_port: bool = False,
+) -> Tuple[asyncio.DatagramTransport, SyslogDatagramProtocol]:
+    """Listen for syslog messages over UDP.
+
+    Args:
+        handler: async callback or asyncio.Queue receiving the batches
+        host: address to listen on
+        port: port to listen on
+        specification: SyslogSpecification or None.
+            If none SyslogSpecification.RFC_5424 will be used
+        options: the options of the DefaultBuilder or None for its
+            defaults, messages its filters reject are skipped
+        two_stage: parse with SLL first and fall back to LL on errors.
+        reuse_port: set SO_REUSEPORT, so that several servers can share the
+            port
+
+    Returns:
+        the transport and protocol of the endpoint, close the transport to stop
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.create_datagram_endpoint(  # type: ignore
+        lambda: SyslogDatagramProtocol(
+            handler, specification=specification, options=options, two_stage=two_stage
+        ),
+        local_addr=(host, port),
+        reuse_port=reuse_port or None,
+    )
+
+
+async def start_tcp_server(
+    handler: BatchHandler,
+    host: str = "127.0.0.1",
+    port: int = 514,
+    specification: Optional[SyslogSpecification] = None,
+    options: Optional[BuilderOptions] = None,
+    two_stage: bool = False,
+) -> asyncio.Server:
+    """Listen for syslog messages over TCP.
+
+    Args:
+        handler: async callback or asyncio.Queue receiving the batches
+        host: address to listen on
+        port: port to listen on
+        specification: SyslogSpecification or None.
+            If none SyslogSpecification.RFC_5424 will be used
+        options: the options of the DefaultBuilder or None for its
+            defaults, messages its filters reject are skipped
+        two_stage: parse with SLL first and fall back to LL on errors.
+
+    Returns:
+        the server, close it to stop
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.create_server(
+        lambda: SyslogStreamProtocol(
+            handler, specification=specification, options=options, two_stage=two_stage
+        ),
+        host,
+        port,
+    )
@@ -31,3 +31,6 @@ class SyslogSpecification(enum.Enum):
         if doc is not None:
             self.__doc__ = doc
         return self
+
+
+SPECIFICATIONS_3164 = [SyslogSpecification.RFC_3164, SyslogSpecification.RFC_6587_3164]
@@ -0,0 +1,218 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import Iterable, Optional, Union
+
+from antlr4 import InputStream, Token
+
+_WHITESPACE = frozenset(b" \t\n\r\x0b\x0c")
+_EOF: int = Token.EOF
+
+
+def strip_span(span: memoryview) -> memoryview:
+    """Strip ASCII whitespace from both ends of a span, without copying it.
+
+    Args:
+        span: the span
+
+    Returns:
+        the stripped span
+    """
+    begin, end = 0, len(span)
+    while begin < end and span[begin] in _WHITESPACE:
+        begin += 1
+    while end > begin and span[end - 1] in _WHITESPACE:
+        end -= 1
+    return span[begin:end]
+
+
+class BytesInputStream(InputStream):
+    """InputStream over raw bytes.
+
+    Every byte is one input symbol, which is what the grammars expect: they
+    describe syslog in octets, and UTF-8 sequences in the MSG are matched
+    byte by byte.
+
+    Values are decoded only for the spans the listeners ask for. If spans is
+    True the listeners hand memoryview slices of the original buffer to the
+    MessageConsumer instead of decoded strings. If raw_message is True only
+    the message is handed over as a memoryview, and left for the consumer
+    to decode.
+
+    Tokens hold single bytes, so the parser should be run with
+    buildParseTrees set to False, letting the listeners take each value from
+    the input in one piece.
+    """
+
+    def __init__(
+        self,
+        data: Union[bytes, bytearray, memoryview],
+        encoding: str = "utf-8",
+        errors: str = "replace",
+        spans: bool = False,
+        raw_message: bool = False,
+    ) -> None:
+        """Create new BytesInputStream.
+
+        Args:
+            data: the raw message bytes
+            encoding: encoding used to decode spans
+            errors: error handling used to decode spans
+            spans: if True getValue returns memoryview slices
+            raw_message: if True the message is a memoryview slice
+        """
+        self.name = "<bytes>"
+        self.buffer = memoryview(data).cast("B")
+        self.encoding = encoding
+        self.errors = errors
+        self.spans = spans
+        self.raw_message = raw_message
+        self._index = 0
+        self.data = self.buffer.tolist()
+        self._size = len(self.data)
+
+    @property
+    def strdata(self) -> str:  # type: ignore
+        """The whole input, decoded.
+
+        Returns:
+            the decoded input
+
+        """
+        return str(self.buffer, self.encoding, self.errors)
+
+    def getText(self, start: int, stop: int) -> str:
+        """Text between two symbol indexes, inclusive.
+
+        Args:
+            start: index of the first byte
+            stop: index of the last byte
+
+        Returns:
+            the decoded text
+
+        """
+        return str(self._span(start, stop), self.encoding, self.errors)
+
+    def getValue(
+        self, start: int, stop: int, raw: bool = False
+    ) -> Union[str, memoryview]:
+        """Value between two symbol indexes, inclusive.
+
+        Args:
+            start: index of the first byte
+            stop: index of the last byte
+            raw: if True return a memoryview even if spans is False
+
+        Returns:
+            the decoded text, or a memoryview if spans or raw is True
+
+        """
+        span = self._span(start, stop)
+        if self.spans or raw:
+            return span
+        return str(span, self.encoding, self.errors)
+
+    def getValueAt(
+        self, indexes: Iterable[int], raw: bool = False
+    ) -> Union[str, memoryview]:
+        """Value of the bytes at the given indexes.
+
+        Used for spans the lexer skipped bytes in.
+
+        Args:
+            indexes: indexes of the bytes
+            raw: if True return a memoryview even if spans is False
+
+        Returns:
+            the decoded text, or a memoryview if spans or raw is True
+
+        """
+        data = self.data
+        joined = bytes(data[index] for index in indexes)
+        if self.spans or raw:
+            return memoryview(joined)
+        return str(joined, self.encoding, self.errors)
+
+    def _span(self, start: int, stop: int) -> memoryview:
+        if stop >= self._size:
+            stop = self._size - 1
+        if start >= self._size or stop < start:
+            return self.buffer[0:0]
+        return self.buffer[start : stop + 1]
+
+    def __str__(self) -> str:
+        """The whole input, decoded.
+
+        Returns:
+            the decoded input
+
+        """
+        return self.strdata
+
+
+class TextInputStream(InputStream):
+    """InputStream over a window of a str.
+
+    Unlike InputStream no list of code points is built, so a window can be
+    moved over a large buffer holding many messages without copying it.
+    Indexes are those of the whole buffer.
+    """
+
+    def __init__(self, text: str, start: int = 0, stop: Optional[int] = None) -> None:
+        """Create new TextInputStream.
+
+        Args:
+            text: the buffer
+            start: index of the first character of the window
+            stop: index after the last character of the window,
+                defaults to len(text)
+        """
+        self.name = "<text>"
+        self.strdata = text
+        self.window(start, stop)
+
+    def window(self, start: int, stop: Optional[int] = None) -> None:
+        """Move the window over the buffer.
+
+        Args:
+            start: index of the first character of the window
+            stop: index after the last character of the window,
+                defaults to len(text)
+        """
+        self._start = start
+        self._index = start
+        self._size = len(self.strdata) if stop is None else stop
+
+    def reset(self) -> None:
+        """Go back to the start of the window."""
+        self._index = self._start
+
+    def LA(self, offset: int) -> int:
+        """Look ahead in the window.
+
+        Args:
+            offset: distance from the current index, 1 is the current symbol
+
+        Returns:
+            the code point, or Token.EOF past the end of the window
+
+        """
+        if offset == 0:
+            return 0
+        if offset < 0:
+            offset += 1
+        pos = self._index + offset - 1
+        if pos < self._start or pos >= self._size:
+            return _EOF
+        return ord(self.strdata[pos])
@@ -0,0 +1,145 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Scanning of RFC 5424 structured data.
+
+Used by the scanners to check and collect the structured data of a message,
+and by SyslogDataSet to parse structured data kept as text. PARAM-VALUEs are
+kept as they are written, with their escapes.
+"""
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+from simple_syslog.policy import DASH
+
+Bytes = Union[bytes, bytearray, memoryview]
+StructuredData = Dict[str, Dict[str, str]]
+
+# printusascii without '=', ']' and '"'
+_SD_NAME = r"[!#-<>-\\^-~]+"
+_SD_ID = re.compile(r"\[(" + _SD_NAME + r")")
+# '"', '\' and ']' are escaped in a PARAM-VALUE
+_SD_PARAM = re.compile(r" (" + _SD_NAME + r')="([^"\\\]]*(?:\\["\\\]][^"\\\]]*)*)"')
+_SD_ID_BYTES = re.compile(_SD_ID.pattern.encode())
+_SD_PARAM_BYTES = re.compile(_SD_PARAM.pattern.encode())
+_DASH, _OPEN, _CLOSE = b"-[]"
+
+
+def scan_structured(
+    text: str,
+    pos: int,
+    endpos: int,
+    structured: Optional[List[Tuple[str, Dict[str, str]]]],
+) -> int:
+    """Scan the structured data of a message.
+
+    Args:
+        text: the message, or a buffer holding it
+        pos: index of the structured data in text
+        endpos: index after the message in text
+        structured: list receiving the SD-IDs and their parameters, or None
+            to only check the structured data
+
+    Returns:
+        the index after the structured data, or -1 if it is not well formed
+
+    """
+    if text.startswith(DASH, pos, endpos):
+        return pos + 1
+    if not text.startswith("[", pos, endpos):
+        return -1
+    while text.startswith("[", pos, endpos):
+        element = _SD_ID.match(text, pos, endpos)
+        if not element:
+            return -1
+        pos = element.end()
+        parameters: Dict[str, str] = dict()
+        param = _SD_PARAM.match(text, pos, endpos)
+        while param:
+            if structured is not None:
+                parameters[param.group(1)] = param.group(2)
+            pos = param.end()
+            param = _SD_PARAM.match(text, pos, endpos)
+        if not text.startswith("]", pos, endpos):
+            return -1
+        pos += 1
+        if structured is not None:
+            structured.append((element.group(1), parameters))
+    return pos
+
+
+def scan_structured_bytes(
+    data: Bytes,
+    pos: int,
+    endpos: int,
+    structured: Optional[List[Tuple[str, Dict[str, str]]]],
+) -> int:
+    """Scan the structured data of a message held in bytes.
+
+    PARAM-VALUEs are decoded as UTF-8, SD-IDs and PARAM-NAMEs are ASCII.
+
+    Args:
+        data: the message, or a buffer holding it
+        pos: index of the structured data in data
+        endpos: index after the message in data
+        structured: list receiving the SD-IDs and their parameters, or None
+            to only check the structured data
+
+    Returns:
+        the index after the structured data, or -1 if it is not well formed
+
+    """
+    if pos < endpos and data[pos] == _DASH:
+        return pos + 1
+    if pos == endpos or data[pos] != _OPEN:
+        return -1
+    while pos < endpos and data[pos] == _OPEN:
+        element = _SD_ID_BYTES.match(data, pos, endpos)
+        if not element:
+            return -1
+        pos = element.end()
+        parameters: Dict[str, str] = dict()
+        param = _SD_PARAM_BYTES.match(data, pos, endpos)
+        while param:
+            if structured is not None:
+                value = str(param.group(2), "utf-8", "replace")
+                parameters[str(param.group(1), "ascii")] = value
+            pos = param.end()
+            param = _SD_PARAM_BYTES.match(data, pos, endpos)
+        if pos == endpos or data[pos] != _CLOSE:
+            return -1
+        pos += 1
+        if structured is not None:
+            structured.append((str(element.group(1), "ascii"), parameters))
+    return pos
+
+
+def parse_structured(text: str) -> StructuredData:
+    """Parse structured data kept as text.
+
+    Args:
+        text: the structured data of a message, as accepted by
+            scan_structured
+
+    Returns:
+        the parameters of each SD-ID, the last element wins for repeated
+        SD-IDs
+
+    Raises:
+        ValueError: if text is not well formed structured data.
+
+    """
+    structured: List[Tuple[str, Dict[str, str]]] = []
+    if scan_structured(text, 0, len(text), structured) != len(text):
+        raise ValueError(f"Invalid structured data {text!r}")
+    return dict(structured)
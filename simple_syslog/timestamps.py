@@ -0,0 +1,237 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Decoding of the TIMESTAMP of a message.
+
+Messages come in bursts within the same second, so the decoders keep the
+seconds of the timestamps they have decoded, by their text without the
+fraction, and only parse the fraction of each message.
+
+RFC 3164 timestamps have neither a year nor a zone. The year is the one
+that puts the timestamp closest to a reference clock, so messages of
+December read in January are from the year before, and the zone is given
+per host.
+
+see https://tools.ietf.org/html/rfc5424#section-6.2.3.
+see https://tools.ietf.org/html/rfc3164#section-4.1.2.
+"""
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple, Union
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_SECOND = timedelta(seconds=1)
+_NANOS = 1_000_000_000
+# nanoseconds of a unit of a fraction with as many digits as the index
+_FRACTION_SCALES = tuple(10 ** (9 - digits) for digits in range(10))
+# length of FULL-DATE "T" HH:MM:SS
+_SECONDS_END = 19
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun")
+        + ("Jul", "Aug", "Sep", "Oct", "Nov", "Dec"),
+        1,
+    )
+}
+# the year of a decoded RFC 3164 timestamp may change once the clock is
+# further from it than this
+_HALF_YEAR = 182 * 24 * 3600
+
+
+class Timestamp(NamedTuple):
+    """A decoded TIMESTAMP."""
+
+    # nanoseconds since the epoch
+    nanos: int
+    # offset from UTC in seconds
+    offset: int
+
+
+# skips the argument handling of Timestamp()
+_timestamp = Timestamp._make
+
+
+def _decode_seconds(text: str) -> Optional[Tuple[int, int]]:
+    seconds, zone = text[:_SECONDS_END], text[_SECONDS_END:]
+    if seconds[10:11] != "T":
+        return None
+    try:
+        parsed = datetime.fromisoformat(seconds + ("+00:00" if zone == "Z" else zone))
+    except ValueError:
+        return None
+    offset = parsed.utcoffset()
+    if offset is None:
+        return None
+    return (parsed - _EPOCH) // _SECOND * _NANOS, offset // _SECOND
+
+
+class TimestampDecoder:
+    """Decodes RFC 5424 TIMESTAMPs.
+
+    The decoded seconds are kept in a dict, which is cleared once it holds
+    cache_size of them. A TimestampDecoder belongs to a single builder.
+    """
+
+    def __init__(self, cache_size: int = 1024) -> None:
+        """Create new TimestampDecoder.
+
+        Args:
+            cache_size: the number of seconds to keep
+        """
+        self._cache: Dict[str, Optional[Tuple[int, int]]] = dict()
+        self._cache_size = cache_size
+
+    def decode(self, text: Union[str, memoryview]) -> Optional[Timestamp]:
+        """Decode a TIMESTAMP.
+
+        Args:
+            text: the TIMESTAMP, or a memoryview of it
+
+        Returns:
+            the decoded TIMESTAMP, or None if text is not one, such as an
+            RFC 3164 timestamp or a date that does not exist
+
+        """
+        if not isinstance(text, str):
+            # a span of a BytesInputStream
+            text = str(text, "ascii", "replace")
+        # FULL-DATE "T" HH:MM:SS [TIME-SECFRAC] TIME-OFFSET
+        end = len(text) - 1 if text.endswith("Z") else len(text) - 6
+        if end < _SECONDS_END:
+            return None
+        key = text if end == _SECONDS_END else text[:_SECONDS_END] + text[end:]
+        try:
+            seconds = self._cache[key]
+        except KeyError:
+            if len(self._cache) >= self._cache_size:
+                self._cache.clear()
+            seconds = self._cache[key] = _decode_seconds(key)
+        if seconds is None:
+            return None
+        nanos, offset = seconds
+        if end > _SECONDS_END:
+            fraction = text[_SECONDS_END + 1 : end]
+            if (
+                text[_SECONDS_END] != "."
+                or not 0 < len(fraction) < len(_FRACTION_SCALES)
+                or not fraction.isdecimal()
+            ):
+                return None
+            nanos += int(fraction) * _FRACTION_SCALES[len(fraction)]
+        return _timestamp((nanos, offset))
+
+
+def _decode_bsd_seconds(
+    text: str, zone: tzinfo, now: float
+) -> Optional[Tuple[int, int]]:
+    # Mmm dd hh:mm:ss, the day may be padded with a space
+    parts = text.split(" ")
+    if len(parts) == 4 and not parts[1]:
+        del parts[1]
+    if len(parts) != 3 or len(parts[2]) != 8:
+        return None
+    month = _MONTHS.get(parts[0])
+    numbers = (parts[1], parts[2][:2], parts[2][3:5], parts[2][6:])
+    if (
+        month is None
+        or parts[2][2::3] != "::"
+        or not all(number.isdecimal() for number in numbers)
+    ):
+        return None
+    day, hour, minute, second = map(int, numbers)
+    year = datetime.fromtimestamp(now, zone).year
+    closest: Optional[Tuple[int, int]] = None
+    for candidate in (year - 1, year, year + 1):
+        try:
+            local = datetime(candidate, month, day, hour, minute, second, tzinfo=zone)
+        except ValueError:
+            continue
+        seconds = (local - _EPOCH) // _SECOND
+        if closest is None or abs(seconds - now) < abs(closest[0] - now):
+            closest = seconds, local.utcoffset() // _SECOND  # type: ignore
+    return closest
+
+
+class BsdTimestampDecoder:
+    """Decodes RFC 3164 timestamps.
+
+    The year is inferred from clock, the zone is the one of the host, or
+    default_timezone. The decoded seconds are kept in a least recently used
+    cache of cache_size entries, keyed by the text without the fraction and
+    the zone. A BsdTimestampDecoder belongs to a single builder.
+    """
+
+    def __init__(
+        self,
+        default_timezone: Optional[tzinfo] = None,
+        host_timezones: Optional[Mapping[str, tzinfo]] = None,
+        clock: Callable[[], float] = time.time,
+        cache_size: int = 1024,
+    ) -> None:
+        """Create new BsdTimestampDecoder.
+
+        Args:
+            default_timezone: the zone of hosts without one, or None for UTC
+            host_timezones: the zones of hosts, by HOSTNAME
+            clock: the reference clock, in seconds since the epoch
+            cache_size: the number of seconds to keep
+        """
+        self._default_timezone = default_timezone or timezone.utc
+        self._host_timezones = host_timezones
+        self._clock = clock
+        self._cache: "OrderedDict[Tuple[str, tzinfo], Tuple[int, int]]" = OrderedDict()
+        self._cache_size = cache_size
+
+    def decode(
+        self, text: Union[str, memoryview], hostname: Optional[str] = None
+    ) -> Optional[Timestamp]:
+        """Decode an RFC 3164 timestamp.
+
+        Args:
+            text: the timestamp, or a memoryview of it
+            hostname: the HOSTNAME of the message, or None
+
+        Returns:
+            the decoded timestamp, or None if text is not one or names a
+            date that does not exist
+
+        """
+        if not isinstance(text, str):
+            # a span of a BytesInputStream
+            text = str(text, "ascii", "replace")
+        zone = self._default_timezone
+        if hostname is not None and self._host_timezones is not None:
+            zone = self._host_timezones.get(hostname, zone)
+        text, dot, fraction = text.partition(".")
+        key = text, zone
+        now = self._clock()
+        seconds = self._cache.get(key)
+        if seconds is not None and abs(seconds[0] - now) < _HALF_YEAR:
+            self._cache.move_to_end(key)
+        else:
+            seconds = _decode_bsd_seconds(text, zone, now)
+            if seconds is None:
+                return None
+            self._cache[key] = seconds
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        nanos = seconds[0] * _NANOS
+        if dot:
+            if not 0 < len(fraction) < len(_FRACTION_SCALES) or not (
+                fraction.isdecimal()
+            ):
+                return None
+            nanos += int(fraction) * _FRACTION_SCALES[len(fraction)]
+        return _timestamp((nanos, seconds[1]))
@@ -180,15 +180,30 @@ def test_with_deviation_allowed(file_of_3164_single_ise_deviation_txt) -> None:
     )
 
 
+def test_without_parse_tree(file_of_3164_single_ise_old_date_txt) -> None:
+    """Test that the listener works when the parser builds no parse tree.
+
+    Args:
+        file_of_3164_single_ise_old_date_txt: Path fixture
+
+    """
+    expected = handle_3164_file(file_of_3164_single_ise_old_date_txt)
+    assert expected == handle_3164_file(
+        file_of_3164_single_ise_old_date_txt, build_parse_trees=False
+    )
+
+
 def handle_3164_file(
     file_name: Path,
     nil_policy: Optional[NilPolicy] = None,
     deviations: Optional[List[AllowableDeviation]] = None,
     specification: SyslogSpecification = None,
+    build_parse_trees: bool = True,
 ):
     """Utility function to parse a file."""
     lexer = Rfc3164Lexer(FileStream(file_name.as_posix()))
     parser = Rfc3164Parser(CommonTokenStream(lexer))
+    parser.buildParseTrees = build_parse_trees
     key_provider = DefaultKeyProvider()
     if not nil_policy:
         nil_policy = NilPolicy.OMIT
@@ -236,14 +236,29 @@ def test_missing_header_field_dash(file_of_log_txt) -> None:
     assert syslog_data.data[SyslogFieldKeyDefaults[SyslogFieldKey.HEADER_MSGID]] == "-"
 
 
+def test_without_parse_tree(file_of_5424_log_all_txt) -> None:
+    """Test that the listener works when the parser builds no parse tree.
+
+    Args:
+        file_of_5424_log_all_txt: Path fixture
+
+    """
+    expected = handle_5424_file(file_of_5424_log_all_txt)
+    assert expected == handle_5424_file(
+        file_of_5424_log_all_txt, build_parse_trees=False
+    )
+
+
 def handle_5424_file(
     file_name: Path,
     nil_policy: Optional[NilPolicy] = None,
     deviations: Optional[List[AllowableDeviation]] = None,
+    build_parse_trees: bool = True,
 ):
     """Utility function to parse a file."""
     lexer = Rfc5424Lexer(FileStream(file_name.as_posix()))
     parser = Rfc5424Parser(CommonTokenStream(lexer))
+    parser.buildParseTrees = build_parse_trees
     key_provider = DefaultKeyProvider()
     if not nil_policy:
         nil_policy = NilPolicy.OMIT
@@ -0,0 +1,231 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pickle
+from pathlib import Path
+
+import pytest
+
+from simple_syslog.builder import BuilderOptions, DefaultBuilder, RecordBuilder
+from simple_syslog.data import RECORD_FIELDS, SyslogRecord
+from simple_syslog.exceptions import DeviationError
+from simple_syslog.interning import InternTable
+from simple_syslog.keys import DefaultKeyProvider, SyslogFieldKey, compile_key_names
+from simple_syslog.parser import SyslogParser
+from simple_syslog.policy import AllowableDeviation, NilPolicy
+from simple_syslog.reader import SyslogStreamReader
+from simple_syslog.specification import SyslogSpecification
+from tests.conftest import (
+    LOG_ALL_PATH,
+    LOG_MISSING_PRI_PATH,
+    LOG_MIX_PATH,
+    LOG_NILS_PATH,
+    LOG_UTF8_UMLAUTS_PATH,
+    SINGLE_ISE_PATH,
+)
+
+ALL_DEVIATIONS = [AllowableDeviation.PRIORITY, AllowableDeviation.VERSION]
+
+
+class _PrefixKeyProvider(DefaultKeyProvider):
+    """KeyProvider with names of its own."""
+
+    def get(self, key: SyslogFieldKey) -> str:
+        return "prefix." + super().get(key)
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [LOG_ALL_PATH, LOG_MIX_PATH, LOG_NILS_PATH, LOG_UTF8_UMLAUTS_PATH],
+)
+@pytest.mark.parametrize("nil_policy", [NilPolicy.OMIT, NilPolicy.DASH])
+@pytest.mark.parametrize("lazy_structured_data", [False, True])
+def test_record_same_as_data_set(
+    file_name: Path, nil_policy: NilPolicy, lazy_structured_data: bool
+) -> None:
+    """Test that records hold the same values as SyslogDataSets.
+
+    Args:
+        file_name: Path to the log file
+        nil_policy: the NilPolicy
+        lazy_structured_data: keep the structured data as text
+
+    """
+    text = file_name.read_text()
+    builder = DefaultBuilder(nil_policy=nil_policy, allowed_deviations=ALL_DEVIATIONS)
+    SyslogStreamReader(builder).read_message(text)
+    expected = builder.produce()
+
+    record_builder = RecordBuilder(
+        nil_policy=nil_policy,
+        allowed_deviations=ALL_DEVIATIONS,
+        lazy_structured_data=lazy_structured_data,
+    )
+    reader = SyslogStreamReader(record_builder)
+    for data in (text, text.encode()):
+        if isinstance(data, str):
+            reader.read_message(data)
+        else:
+            reader.read_bytes(data)
+        record = record_builder.produce()
+        assert record.to_dict() == expected.data
+        assert record.structured_data == expected.structured_data
+        assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_record_fields() -> None:
+    """Test lookups by SyslogFieldKey and names from a KeyProvider."""
+    builder = RecordBuilder(specification=SyslogSpecification.RFC_3164)
+    SyslogStreamReader(builder, SyslogSpecification.RFC_3164).read_message(
+        SINGLE_ISE_PATH.read_text()
+    )
+    record = builder.produce()
+    assert record.host_name == "lzpqrst-admin.in.mycompany.com.lg"
+    assert record[SyslogFieldKey.HEADER_HOSTNAME] == record.host_name
+    assert record.app_name is None
+    assert not record.structured_data
+    names = record.to_dict(_PrefixKeyProvider())
+    assert names["prefix.syslog.header.hostName"] == record.host_name
+    with pytest.raises(KeyError):
+        record[SyslogFieldKey.STRUCTURED_BASE]
+
+
+@pytest.mark.parametrize("field_key", list(SyslogFieldKey))
+def test_record_builder_keys(field_key: SyslogFieldKey) -> None:
+    """Test that values and nils of fields without a slot are ignored.
+
+    Args:
+        field_key: the field
+
+    """
+    builder = RecordBuilder(nil_policy=NilPolicy.DASH)
+    builder.start()
+    builder.consume_value(SyslogFieldKey.HEADER_PRI, "14")
+    builder.consume_value(SyslogFieldKey.HEADER_VERSION, "1")
+    builder.handle_nil(field_key)
+    builder.consume_value(field_key, "6")
+    builder.complete()
+    record = builder.produce()
+    if field_key in RECORD_FIELDS:
+        assert record[field_key] == "6"
+    else:
+        assert record == SyslogRecord(priority="14", version="1")
+
+
+def test_record_builder_deviations() -> None:
+    """Test that records are checked for deviations like SyslogDataSets."""
+    builder = RecordBuilder()
+    reader = SyslogStreamReader(builder)
+    reader.read_message(LOG_MISSING_PRI_PATH.read_text())
+    with pytest.raises(DeviationError):
+        builder.produce()
+    builder = RecordBuilder(allowed_deviations=[AllowableDeviation.PRIORITY])
+    SyslogStreamReader(builder).read_message(LOG_MISSING_PRI_PATH.read_text())
+    assert builder.produce().priority is None
+
+
+def test_record_projection() -> None:
+    """Test that records only hold the projected fields."""
+    builder = RecordBuilder(fields=[SyslogFieldKey.MESSAGE])
+    SyslogStreamReader(builder).read_message(LOG_ALL_PATH.read_text())
+    record = builder.produce()
+    assert record == SyslogRecord(message=record.message)
+    assert record.message
+
+
+def test_interned_values() -> None:
+    """Test that records and data sets share the strings of header values."""
+    text = LOG_ALL_PATH.read_text()
+    interner = InternTable()
+    records = []
+    builder = RecordBuilder(interner=interner)
+    reader = SyslogStreamReader(builder)
+    for data in (text, text.replace(" ", "\n", 1)):
+        reader.read_message(data)
+        records.append(builder.produce())
+    assert records[0] == records[1]
+    assert records[0].host_name is records[1].host_name
+    assert records[0].msg_id is records[1].msg_id
+    assert records[0].message is not records[1].message
+    assert interner.misses == 4 and interner.hits == 4
+
+    data_set_builder = DefaultBuilder(interner=interner)
+    SyslogStreamReader(data_set_builder).read_message(text)
+    data_set = data_set_builder.produce()
+    assert data_set.data["syslog.header.appName"] is records[0].app_name
+    assert interner.hits == 8
+
+
+class _CountingKeyProvider(DefaultKeyProvider):
+    """KeyProvider that counts the names it is asked for."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def get(self, key: SyslogFieldKey) -> str:
+        self.calls += 1
+        return super().get(key)
+
+
+class _MappingKeyProvider(DefaultKeyProvider):
+    """KeyProvider that only knows the names in a dict."""
+
+    M = {
+        SyslogFieldKey.MESSAGE: "msg",
+        SyslogFieldKey.HEADER_HOSTNAME: "host",
+        SyslogFieldKey.HEADER_PRI: "pri",
+    }
+
+    def get(self, key: SyslogFieldKey) -> str:
+        return self.M[key]
+
+
+def test_key_names_unknown() -> None:
+    """Test that keys a KeyProvider raises a LookupError for are UNKNOWN."""
+    names = compile_key_names(_MappingKeyProvider())
+    assert names[SyslogFieldKey.HEADER_HOSTNAME.value] == "host"
+    assert names[SyslogFieldKey.HEADER_TIMESTAMP_NANOS.value] == "UNKNOWN"
+    builder = DefaultBuilder(
+        key_provider=_MappingKeyProvider(),
+        fields=[SyslogFieldKey.MESSAGE, SyslogFieldKey.HEADER_HOSTNAME],
+    )
+    SyslogStreamReader(builder).read_message(LOG_ALL_PATH.read_text())
+    assert builder.produce().data.keys() == {"msg", "host"}
+
+
+def test_key_names_compiled() -> None:
+    """Test that the KeyProvider is only asked for names once."""
+    key_provider = _CountingKeyProvider()
+    names = compile_key_names(key_provider)
+    for key in SyslogFieldKey:
+        assert names[key.value] == key_provider.get(key)
+
+    key_provider = _CountingKeyProvider()
+    builder = DefaultBuilder(key_provider=key_provider, nil_policy=NilPolicy.DASH)
+    calls = key_provider.calls
+    assert calls == len(SyslogFieldKey)
+    reader = SyslogStreamReader(builder)
+    for path in (LOG_ALL_PATH, LOG_NILS_PATH):
+        reader.read_message(path.read_text())
+        assert (
+            builder.produce().data.keys()
+            == SyslogParser(options=BuilderOptions(nil_policy=NilPolicy.DASH))
+            .parse(path.read_text())
+            .data.keys()
+        )
+    assert key_provider.calls == calls
+
+    key_provider = _CountingKeyProvider()
+    fields = [SyslogFieldKey.MESSAGE, SyslogFieldKey.HEADER_HOSTNAME]
+    DefaultBuilder(key_provider=key_provider, fields=fields)
+    assert key_provider.calls == len(fields)
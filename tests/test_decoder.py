@@ -0,0 +1,118 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+from typing import List, Optional, Tuple
+
+import pytest
+
+from simple_syslog.builder import BuilderOptions
+from simple_syslog.data import SyslogDataSet
+from simple_syslog.decoder import SyslogStreamDecoder
+from simple_syslog.exceptions import DeviationError
+from simple_syslog.parser import SyslogParser
+from simple_syslog.policy import AllowableDeviation
+from simple_syslog.specification import SyslogSpecification
+from tests.conftest import (
+    LOG_ALL_PATH,
+    LOG_MISSING_PRI_PATH,
+    LOG_NILS_PATH,
+    LOG_UTF8_UMLAUTS_PATH,
+    SINGLE_ISE_PATH,
+)
+
+MESSAGES = [
+    LOG_ALL_PATH.read_text().rstrip("\n"),
+    LOG_NILS_PATH.read_text().rstrip("\n"),
+    LOG_UTF8_UMLAUTS_PATH.read_text(encoding="utf-8").rstrip("\n"),
+    "<14>1 2014-06-20T09:14:07+00:00 host app - - - tab\there",
+]
+
+
+def parse_each(
+    lines: List[str], specification: Optional[SyslogSpecification] = None
+) -> List[SyslogDataSet]:
+    """Utility function to parse every line on its own."""
+    parser = SyslogParser(specification=specification)
+    return [copy.deepcopy(parser.parse(line)) for line in lines]
+
+
+def decode_in_pieces(
+    decoder: SyslogStreamDecoder, data: bytes, size: int
+) -> List[SyslogDataSet]:
+    """Utility function to feed data in pieces of the given size."""
+    messages: List[SyslogDataSet] = []
+    for pos in range(0, len(data), size):
+        messages.extend(decoder.feed(data[pos : pos + size]))
+    messages.extend(decoder.close())
+    return messages
+
+
+@pytest.mark.parametrize("size", [1, 13, 4096])
+def test_decode_lines(size: int) -> None:
+    """Test that a LF terminated stream gives the same data as single messages.
+
+    Args:
+        size: size of the reads
+
+    """
+    data = "\n".join(MESSAGES).encode("utf-8")
+    messages = decode_in_pieces(SyslogStreamDecoder(), data, size)
+    assert parse_each(MESSAGES) == messages
+
+
+@pytest.mark.parametrize("size", [1, 13, 4096])
+def test_decode_octet_counted(size: int) -> None:
+    """Test that an octet counted stream gives the same data as single messages.
+
+    Args:
+        size: size of the reads
+
+    """
+    frames = [message.encode("utf-8") for message in MESSAGES]
+    data = b"".join(b"%d %s" % (len(frame), frame) for frame in frames)
+    decoder = SyslogStreamDecoder(SyslogSpecification.RFC_6587_5424)
+    assert parse_each(MESSAGES) == decode_in_pieces(decoder, data, size)
+
+
+def test_decode_3164() -> None:
+    """Test that a RFC 3164 stream is decoded."""
+    line = SINGLE_ISE_PATH.read_text().rstrip("\n")
+    specification = SyslogSpecification.RFC_3164
+    decoder = SyslogStreamDecoder(specification)
+    messages = list(decoder.feed(f"{line}\n{line}\n".encode()))
+    assert parse_each([line, line], specification) == messages
+
+
+def test_decode_heroku() -> None:
+    """Test that a Heroku stream is decoded with the octet counts."""
+    message = "<40>1 2012-11-30T06:45:29+00:00 host app web.3 - State changed"
+    frame = f"{len(message)} {message}"
+    specification = SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN
+    decoder = SyslogStreamDecoder(specification)
+    messages = list(decoder.feed((frame * 2).encode()))
+    assert parse_each([frame, frame], specification) == messages
+
+
+def test_decode_errors() -> None:
+    """Test that messages with errors are skipped and collected."""
+    lines = [MESSAGES[0], LOG_MISSING_PRI_PATH.read_text().rstrip("\n"), MESSAGES[1]]
+    errors: List[Tuple[int, Exception]] = []
+    decoder = SyslogStreamDecoder(
+        options=BuilderOptions(allowed_deviations=[AllowableDeviation.VERSION])
+    )
+    messages = list(decoder.feed("\n".join(lines).encode(), errors))
+    messages.extend(decoder.close(errors))
+    assert parse_each([lines[0], lines[2]]) == messages
+    assert [index for index, _ in errors] == [1]
+    assert isinstance(errors[0][1], DeviationError)
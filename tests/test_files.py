@@ -0,0 +1,148 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from simple_syslog.builder import BuilderOptions
+from simple_syslog.exceptions import DeviationError, ParseError
+from simple_syslog.files import parse_file, parse_file_parallel
+from simple_syslog.policy import AllowableDeviation
+from simple_syslog.specification import SyslogSpecification
+from tests.conftest import LOG_MISSING_PRI_PATH
+from tests.test_reader import HEROKU_LINES, LINES_5424, parse_each
+
+ALL_DEVIATIONS = [AllowableDeviation.PRIORITY, AllowableDeviation.VERSION]
+LENIENT_OPTIONS = BuilderOptions(allowed_deviations=ALL_DEVIATIONS)
+LINES = LINES_5424 * 50
+
+
+def test_parse_file(tmp_path: Path) -> None:
+    """Test that the lines of a file are parsed like single messages."""
+    path = tmp_path.joinpath("log.txt")
+    path.write_text("\r\n".join(LINES) + "\n\n", encoding="utf-8")
+    messages = parse_file(path, options=LENIENT_OPTIONS)
+    assert list(messages) == parse_each(LINES)
+
+
+def test_parse_file_octet_counted(tmp_path: Path) -> None:
+    """Test that octet counted messages of a file are parsed."""
+    path = tmp_path.joinpath("log.txt")
+    frames = [line.encode() for line in LINES]
+    path.write_bytes(b"".join(b"%d %s\n" % (len(frame), frame) for frame in frames))
+    messages = parse_file(
+        path,
+        SyslogSpecification.RFC_6587_5424,
+        options=LENIENT_OPTIONS,
+    )
+    assert list(messages) == parse_each(LINES)
+
+
+def test_parse_file_heroku(tmp_path: Path) -> None:
+    """Test that Heroku messages of a file are parsed with their count."""
+    path = tmp_path.joinpath("log.txt")
+    lines = [f"{len(line)} {line}" for line in HEROKU_LINES]
+    path.write_text("".join(lines), encoding="utf-8")
+    specification = SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN
+    messages = parse_file(path, specification)
+    assert list(messages) == parse_each(lines, specification)
+
+
+def test_parse_file_parallel(tmp_path: Path) -> None:
+    """Test that shards are parsed in file order."""
+    path = tmp_path.joinpath("log.txt")
+    path.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    messages = parse_file_parallel(
+        path,
+        options=LENIENT_OPTIONS,
+        workers=2,
+        shard_size=1000,
+    )
+    assert list(messages) == parse_each(LINES)
+
+
+def test_parse_file_parallel_unordered(tmp_path: Path) -> None:
+    """Test that octet counted shards are parsed in any order."""
+    path = tmp_path.joinpath("log.txt")
+    frames = [line.encode() for line in LINES]
+    path.write_bytes(b"".join(b"%d %s\n" % (len(frame), frame) for frame in frames))
+    messages = list(
+        parse_file_parallel(
+            path,
+            SyslogSpecification.RFC_6587_5424,
+            options=LENIENT_OPTIONS,
+            workers=2,
+            ordered=False,
+            shard_size=1000,
+        )
+    )
+    expected = parse_each(LINES)
+    assert len(messages) == len(expected)
+    assert all(message in expected for message in messages)
+
+
+def test_parse_file_parallel_errors(tmp_path: Path) -> None:
+    """Test that skipped messages are indexed over the whole file."""
+    path = tmp_path.joinpath("log.txt")
+    missing_pri = LOG_MISSING_PRI_PATH.read_text().rstrip("\n")
+    lines = [LINES_5424[0]] * 10 + [missing_pri] + [LINES_5424[0]] * 10
+    path.write_text("\n".join(lines * 3), encoding="utf-8")
+    errors: List[Tuple[int, Exception]] = []
+    messages = parse_file_parallel(
+        path,
+        options=BuilderOptions(allowed_deviations=[AllowableDeviation.VERSION]),
+        errors=errors,
+        workers=2,
+        ordered=False,
+        shard_size=1000,
+    )
+    assert len(list(messages)) == 60
+    assert [index for index, _ in errors] == [10, 31, 52]
+    assert all(isinstance(error, DeviationError) for _, error in errors)
+
+
+def test_parse_file_parallel_same_errors(tmp_path: Path) -> None:
+    """Test that errors from the workers keep their type, message and index."""
+    path = tmp_path.joinpath("log.txt")
+    missing_pri = LOG_MISSING_PRI_PATH.read_text().rstrip("\n")
+    lines = [LINES_5424[0]] * 10 + [missing_pri, "<14>1 bogus"] + [LINES_5424[0]] * 9
+    path.write_text("\n".join(lines * 3), encoding="utf-8")
+    errors: List[Tuple[int, Exception]] = []
+    parallel_errors: List[Tuple[int, Exception]] = []
+    list(parse_file(path, errors=errors))
+    list(parse_file_parallel(path, errors=parallel_errors, workers=2, shard_size=1000))
+    assert [(index, type(error)) for index, error in parallel_errors] == [
+        (index, type(error)) for index, error in errors
+    ]
+    assert [str(error) for _, error in parallel_errors] == [
+        str(error.args[0]) for _, error in errors
+    ]
+    assert {type(error) for _, error in errors} == {DeviationError, ParseError}
+
+
+def test_parse_file_parallel_incomplete(tmp_path: Path) -> None:
+    """Test that an incomplete octet counted message raises a ParseError."""
+    path = tmp_path.joinpath("log.txt")
+    path.write_bytes(b"12 <14>1 - -")
+    with pytest.raises(ParseError):
+        list(parse_file_parallel(path, SyslogSpecification.RFC_6587_5424, workers=1))
+
+
+def test_parse_empty_file(tmp_path: Path) -> None:
+    """Test that an empty file has no messages."""
+    path = tmp_path.joinpath("log.txt")
+    path.write_bytes(b"")
+    assert list(parse_file(path)) == []
+    assert list(parse_file_parallel(path, workers=1)) == []
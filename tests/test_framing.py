@@ -0,0 +1,146 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import List, Optional, Tuple
+
+import pytest
+
+from simple_syslog.exceptions import ParseError
+from simple_syslog.framing import SyslogFramer, find_line, find_octet_count
+from tests.conftest import LOG_ALL_PATH, LOG_UTF8_UMLAUTS_PATH
+
+MESSAGES = [
+    LOG_ALL_PATH.read_bytes().rstrip(b"\n"),
+    LOG_UTF8_UMLAUTS_PATH.read_bytes().rstrip(b"\n"),
+    b"<14>1 - - - - - - first\nsecond",
+]
+
+
+def feed_in_pieces(framer: SyslogFramer, data: bytes, size: int) -> List[bytes]:
+    """Utility function to feed data in pieces of the given size."""
+    frames: List[bytes] = []
+    for pos in range(0, len(data), size):
+        frames.extend(bytes(frame) for frame in framer.feed(data[pos : pos + size]))
+    frames.extend(bytes(frame) for frame in framer.close())
+    return frames
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 100, 100000])
+def test_octet_counted(size: int) -> None:
+    """Test that octet counted frames are split wherever the reads end.
+
+    Args:
+        size: size of the reads
+
+    """
+    data = b"".join(b"%d %s\n" % (len(message), message) for message in MESSAGES)
+    assert MESSAGES * 2 == feed_in_pieces(SyslogFramer(), data * 2, size)
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 100, 100000])
+def test_non_transparent(size: int) -> None:
+    """Test that LF terminated frames are split wherever the reads end.
+
+    Args:
+        size: size of the reads
+
+    """
+    messages = MESSAGES[:2]
+    data = b"\r\n".join(messages) + b"\n\n" + b"\n".join(messages)
+    framer = SyslogFramer(octet_counted=False)
+    assert messages * 2 == feed_in_pieces(framer, data, size)
+
+
+def test_pending() -> None:
+    """Test that an incomplete frame is held back."""
+    framer = SyslogFramer()
+    assert not framer.feed(b"17 <14>1 - - - -")
+    assert framer.pending == 16
+    assert [b"<14>1 - - - - - -"] == [bytes(frame) for frame in framer.feed(b" - -")]
+    assert framer.pending == 0
+
+
+@pytest.mark.parametrize(
+    "data", [b"<14>1 - - - - - -", b"017 <14>1 - - - - - -", b"1234567890123 <14>"]
+)
+def test_invalid_octet_count(data: bytes) -> None:
+    """Test that an invalid octet count raises a ParseError.
+
+    Args:
+        data: the stream
+
+    """
+    with pytest.raises(ParseError):
+        SyslogFramer().feed(data)
+
+
+def test_incomplete_on_close() -> None:
+    """Test that closing with an incomplete frame raises a ParseError."""
+    framer = SyslogFramer()
+    framer.feed(b"17 <14>1")
+    with pytest.raises(ParseError):
+        framer.close()
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        ("17 <14>1", (0, (3, 17))),
+        ("\r\n 17 <14>1", (3, (6, 17))),
+        ("123456789", (0, None)),
+        (" ", (1, None)),
+    ],
+)
+def test_find_octet_count(
+    data: str, expected: Tuple[int, Optional[Tuple[int, int]]]
+) -> None:
+    """Test that text and bytes are framed the same.
+
+    Args:
+        data: the data
+        expected: the index of the MSG-LEN, of the SYSLOG-MSG and the MSG-LEN
+
+    """
+    assert find_octet_count(data, 0, len(data)) == expected
+    assert find_octet_count(data.encode(), 0, len(data)) == expected
+
+
+@pytest.mark.parametrize(
+    "data", ["1234567890", "1234567890 <14>", "017 <14>", "x <14>", "1\u0661 <14>"]
+)
+def test_find_invalid_octet_count(data: str) -> None:
+    """Test that text and bytes reject the same octet counts.
+
+    Args:
+        data: the data
+
+    """
+    with pytest.raises(ParseError):
+        find_octet_count(data, 0, len(data))
+    with pytest.raises(ParseError):
+        find_octet_count(data.encode(), 0, len(data.encode()))
+
+
+@pytest.mark.parametrize(
+    "data, expected", [("a\r\nb", (1, 3)), ("a\nb", (1, 2)), ("a\r", (1, -1))]
+)
+def test_find_line(data: str, expected: Tuple[int, int]) -> None:
+    """Test that a CR before the LF is not part of the frame.
+
+    Args:
+        data: the data
+        expected: the index after the frame and after the LF
+
+    """
+    assert find_line(data, 0, len(data)) == expected
+    assert find_line(data.encode(), 0, len(data)) == expected
@@ -0,0 +1,37 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from simple_syslog.interning import InternTable
+
+
+def test_intern() -> None:
+    """Test that equal strings come back as one instance, and the counters."""
+    table = InternTable()
+    first = table.intern("".join(["host", "1"]))
+    second = "".join(["host", "1"])
+    assert second is not first
+    assert table.intern(second) is first
+    assert (table.hits, table.misses, len(table)) == (1, 1, 1)
+    for view in (memoryview(b"host1"), memoryview(bytearray(b"host1"))):
+        assert table.intern(view) is view
+    table.clear()
+    assert (table.hits, table.misses, len(table)) == (0, 0, 0)
+
+
+def test_intern_bounded() -> None:
+    """Test that the table is cleared once it is full."""
+    table = InternTable(size=2)
+    for value in ("a", "b", "c"):
+        table.intern(value)
+    assert len(table) == 1
+    assert table.misses == 3
@@ -0,0 +1,795 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Set, Tuple
+
+import pytest
+from antlr4 import CommonTokenStream, InputStream
+
+from simple_syslog.builder import BuilderOptions, DefaultBuilder
+from simple_syslog.data import FieldValue
+from simple_syslog.exceptions import (
+    DeviationError,
+    FilteredError,
+    ParseError,
+    SimpleErrorListener,
+)
+from simple_syslog.generated.grammars.Rfc5424Lexer import Rfc5424Lexer
+from simple_syslog.generated.grammars.Rfc5424Parser import Rfc5424Parser
+from simple_syslog.keys import DefaultKeyProvider, SyslogFieldKey
+from simple_syslog.parser import SyslogParser, SyslogParserPool, parse_many
+from simple_syslog.policy import AllowableDeviation, NilPolicy
+from simple_syslog.reader import SyslogStreamReader
+from simple_syslog.scanner import Syslog3164Scanner, Syslog5424Scanner
+from simple_syslog.specification import SyslogSpecification
+from tests.conftest import (
+    LOG_ALL_PATH,
+    LOG_MISSING_PRI_PATH,
+    LOG_MISSING_PRIVERSION_PATH,
+    LOG_MISSING_VERSION_PATH,
+    LOG_MIX_PATH,
+    LOG_NILS_PATH,
+    LOG_PATH,
+    LOG_UTF8_UMLAUTS_PATH,
+    LOG_WITH_BOM_PATH,
+    SINGLE_ISE_DEVIATION_PATH,
+    SINGLE_ISE_OLD_DATE_PATH,
+    SINGLE_ISE_PATH,
+)
+from tests.test_3164_listener import handle_3164_file
+from tests.test_5424_listener import handle_5424_file
+
+ALL_DEVIATIONS = [AllowableDeviation.PRIORITY, AllowableDeviation.VERSION]
+LENIENT_OPTIONS = BuilderOptions(allowed_deviations=ALL_DEVIATIONS)
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        LOG_PATH,
+        LOG_ALL_PATH,
+        LOG_MISSING_PRI_PATH,
+        LOG_MISSING_VERSION_PATH,
+        LOG_MISSING_PRIVERSION_PATH,
+        LOG_NILS_PATH,
+        LOG_MIX_PATH,
+    ],
+)
+@pytest.mark.parametrize("nil_policy", [NilPolicy.OMIT, NilPolicy.NULL, NilPolicy.DASH])
+def test_5424_same_as_antlr(file_name: Path, nil_policy: NilPolicy) -> None:
+    """Test that SyslogParser produces the same data as the ANTLR parser.
+
+    Args:
+        file_name: Path to the log file
+        nil_policy: the NilPolicy to use
+
+    """
+    expected = handle_5424_file(file_name, nil_policy, ALL_DEVIATIONS)
+    parser = SyslogParser(
+        options=BuilderOptions(nil_policy=nil_policy, allowed_deviations=ALL_DEVIATIONS)
+    )
+    assert expected == parser.parse(file_name.read_text())
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [LOG_ALL_PATH, LOG_NILS_PATH, LOG_UTF8_UMLAUTS_PATH, LOG_WITH_BOM_PATH],
+)
+def test_5424_scanner_accepts(file_name: Path) -> None:
+    """Test that well formed messages do not need the ANTLR parser.
+
+    Args:
+        file_name: Path to the log file
+
+    """
+    assert Syslog5424Scanner(DefaultBuilder()).scan(
+        file_name.read_text(encoding="utf-8")
+    )
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "YIKES!",
+        '<14>1 - - - - - [a b="c\\x"] msg',
+        "<14>1 - - - - - - tab\there",
+        "<14>1 - - - - - - first\nsecond",
+    ],
+)
+def test_5424_scanner_rejects(line: str) -> None:
+    """Test that the scanner leaves anything unusual to the ANTLR parser.
+
+    Args:
+        line: the message
+
+    """
+    assert not Syslog5424Scanner(DefaultBuilder()).scan(line)
+
+
+def test_5424_bom_stripped() -> None:
+    """Test that the message of a log with a BOM does not contain the BOM."""
+    parser = SyslogParser()
+    syslog_data = parser.parse(LOG_WITH_BOM_PATH.read_text(encoding="utf-8"))
+    assert syslog_data.data["syslog.message"] == "Removing instance"
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        SINGLE_ISE_PATH,
+        SINGLE_ISE_DEVIATION_PATH,
+        SINGLE_ISE_OLD_DATE_PATH,
+    ],
+)
+def test_3164_same_as_antlr(file_name: Path) -> None:
+    """Test that SyslogParser produces the same data as the ANTLR parser.
+
+    Args:
+        file_name: Path to the log file
+
+    """
+    expected = handle_3164_file(file_name, deviations=ALL_DEVIATIONS)
+    parser = SyslogParser(
+        specification=SyslogSpecification.RFC_3164, options=LENIENT_OPTIONS
+    )
+    assert expected == parser.parse(file_name.read_text())
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [SINGLE_ISE_PATH, SINGLE_ISE_DEVIATION_PATH, SINGLE_ISE_OLD_DATE_PATH],
+)
+def test_3164_scanner_accepts(file_name: Path) -> None:
+    """Test that well formed messages do not need the ANTLR parser.
+
+    Args:
+        file_name: Path to the log file
+
+    """
+    builder = DefaultBuilder(specification=SyslogSpecification.RFC_3164)
+    assert Syslog3164Scanner(builder).scan(file_name.read_text())
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "<181>Aug  6 17:26:31 10.34.84.145",
+        "<181>Aug   6 17:26:31 10.34.84.145 msg",
+        "<181>Aug  6 17:26:31  msg",
+        "<181>2018-09-14T00:54:09 host msg",
+    ],
+)
+def test_3164_scanner_rejects(line: str) -> None:
+    """Test that the scanner leaves anything unusual to the ANTLR parser.
+
+    Args:
+        line: the message
+
+    """
+    builder = DefaultBuilder(
+        specification=SyslogSpecification.RFC_3164, allowed_deviations=ALL_DEVIATIONS
+    )
+    builder.start()
+    assert not Syslog3164Scanner(builder).scan(line)
+    assert not builder.produce().data
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        LOG_MIX_PATH.read_text(),
+        LOG_MISSING_PRIVERSION_PATH.read_text(),
+        "<14>1 2014-06-20T09:14:07+00:00 host app - - - tab\there",
+    ],
+)
+def test_two_stage_same_as_ll(line: str) -> None:
+    """Test that SLL prediction gives the same data as full LL prediction.
+
+    Args:
+        line: the message
+
+    """
+    expected = copy.deepcopy(SyslogParser(options=LENIENT_OPTIONS).parse(line))
+    parser = SyslogParser(options=LENIENT_OPTIONS, two_stage=True)
+    assert expected == parser.parse(line)
+
+
+def test_two_stage_syntax_error() -> None:
+    """Test that syntax errors raise a ParseError in two stage mode."""
+    parser = SyslogParser(options=LENIENT_OPTIONS, two_stage=True)
+    with pytest.raises(ParseError):
+        parser.parse("<14>1 2014-06-20T09:14:07+00:00 host app - - [a")
+    expected = handle_5424_file(LOG_MIX_PATH, deviations=ALL_DEVIATIONS)
+    assert expected == parser.parse(LOG_MIX_PATH.read_text())
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "<14>1 2014-06-20T09:14:07+00:00 host app - - [a",
+        "<14>1 2014-06-20T09:14:07+00:00 host app - - [a b=c] msg",
+        '<14>1 \u20ac 12 app proc msgid [a b="c"] msg body',
+        "<14>1 bogus",
+    ],
+)
+def test_two_stage_error_same_as_ll(line: str) -> None:
+    """Test that the LL stage reports the error a plain LL parse does.
+
+    Args:
+        line: the message, which SLL prediction gives up on
+
+    """
+    parser = Rfc5424Parser(CommonTokenStream(Rfc5424Lexer(InputStream(line))))
+    parser.removeErrorListeners()
+    parser.addErrorListener(SimpleErrorListener())
+    with pytest.raises(ParseError) as expected:
+        parser.syslog_msg()
+    with pytest.raises(ParseError) as error:
+        SyslogParser(two_stage=True).parse(line)
+    assert error.value.args[0] == expected.value.args[0]
+
+
+def test_parser_reuse() -> None:
+    """Test that one parser gives the same results for every message."""
+    parser = SyslogParser(options=LENIENT_OPTIONS)
+    lines = [
+        LOG_ALL_PATH.read_text(),
+        "<14>1 - - - - - - tab\there",
+        LOG_NILS_PATH.read_text(),
+    ]
+    expected = [copy.deepcopy(parser.parse(line)) for line in lines]
+    for _ in range(3):
+        assert expected == [copy.deepcopy(parser.parse(line)) for line in lines]
+
+
+def test_parser_pool() -> None:
+    """Test that the pool hands out one parser per thread."""
+    pool = SyslogParserPool()
+    assert pool.get() is pool.get()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        other = executor.submit(pool.get).result()
+    assert other is not pool.get()
+    assert pool.parse(LOG_ALL_PATH.read_text()).data["syslog.message"] == (
+        "Removing instance"
+    )
+
+
+def test_parser_pool_options() -> None:
+    """Test that the parsers of a pool share its options."""
+    pool = SyslogParserPool(
+        options=BuilderOptions(fields=[SyslogFieldKey.MESSAGE]), two_stage=True
+    )
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        other = executor.submit(pool.parse, LOG_ALL_PATH.read_text()).result()
+    assert other.data == {"syslog.message": "Removing instance"}
+
+
+def test_parse_many() -> None:
+    """Test that batch results are kept and errors are collected."""
+    lines = [
+        LOG_ALL_PATH.read_text(),
+        LOG_MISSING_PRI_PATH.read_text(),
+        LOG_MIX_PATH.read_text(),
+        LOG_NILS_PATH.read_text(),
+    ]
+    parser = SyslogParser(
+        options=BuilderOptions(allowed_deviations=[AllowableDeviation.VERSION])
+    )
+    expected = [copy.deepcopy(parser.parse(lines[i])) for i in (0, 2, 3)]
+    errors: List[Tuple[int, Exception]] = []
+    results = list(
+        parse_many(
+            lines,
+            options=BuilderOptions(allowed_deviations=[AllowableDeviation.VERSION]),
+            errors=errors,
+        )
+    )
+    assert expected == results
+    assert len(errors) == 1
+    assert errors[0][0] == 1
+    assert isinstance(errors[0][1], DeviationError)
+    assert (
+        list(parse_many(lines, allowed_deviations=[AllowableDeviation.VERSION]))
+        == results
+    )
+    nils = list(parse_many(lines[3:], nil_policy=NilPolicy.DASH))
+    assert nils == list(
+        parse_many(lines[3:], options=BuilderOptions(nil_policy=NilPolicy.DASH))
+    )
+    assert nils != results[2:]
+
+
+@pytest.mark.parametrize("two_stage", [False, True])
+def test_parse_many_syntax_errors(two_stage: bool) -> None:
+    """Test that messages with syntax errors are collected, not recovered.
+
+    Args:
+        two_stage: parse with SLL first
+
+    """
+    lines = [LOG_ALL_PATH.read_text(), "<14>1 bogus", LOG_NILS_PATH.read_text()]
+    errors: List[Tuple[int, Exception]] = []
+    results = list(parse_many(lines, errors=errors, two_stage=two_stage))
+    assert [r.data.get("syslog.header.version") for r in results] == ["1", "1"]
+    assert [index for index, _ in errors] == [1]
+    assert isinstance(errors[0][1], ParseError)
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        LOG_ALL_PATH,
+        LOG_MISSING_PRIVERSION_PATH,
+        LOG_MIX_PATH,
+        LOG_NILS_PATH,
+        LOG_UTF8_UMLAUTS_PATH,
+        LOG_WITH_BOM_PATH,
+    ],
+)
+def test_parse_bytes_same_as_text(file_name: Path) -> None:
+    """Test that parsing bytes gives the same data as parsing text.
+
+    Args:
+        file_name: Path to the log file
+
+    """
+    parser = SyslogParser(options=LENIENT_OPTIONS)
+    expected = copy.deepcopy(parser.parse(file_name.read_text(encoding="utf-8")))
+    assert expected == parser.parse_bytes(file_name.read_bytes())
+    assert expected == parser.parse_bytes(memoryview(file_name.read_bytes()))
+
+
+def test_3164_parse_bytes_same_as_text() -> None:
+    """Test that parsing RFC 3164 bytes gives the same data as parsing text."""
+    parser = SyslogParser(
+        specification=SyslogSpecification.RFC_3164, options=LENIENT_OPTIONS
+    )
+    expected = copy.deepcopy(parser.parse(SINGLE_ISE_PATH.read_text()))
+    assert expected == parser.parse_bytes(SINGLE_ISE_PATH.read_bytes())
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"<14>1 - host - - - - \xef\xbb\xbfgr\xc3\xbc\xc3\x9fe ", b"<14>1 - host - - - -"],
+)
+def test_parse_bytes_raw_message(data: bytes) -> None:
+    """Test that only the message is left as bytes with raw_message.
+
+    Args:
+        data: the message, also parsed with a TAB to take the ANTLR path
+
+    """
+    parser = SyslogParser(options=LENIENT_OPTIONS)
+    for message in (data, data + b"\t"):
+        syslog_data = parser.parse_bytes(message, raw_message=True)
+        assert syslog_data.data["syslog.header.hostName"] == "host"
+        raw = syslog_data.data.get("syslog.message")
+        if raw is not None:
+            assert isinstance(raw, memoryview)
+            assert str(raw, "utf-8") == "grüße"
+            assert raw.obj is message
+
+
+def test_parse_bytes_wide_characters() -> None:
+    """Test that characters above U+00FF are parsed from bytes."""
+    parser = SyslogParser()
+    syslog_data = parser.parse_bytes("<14>1 - host - - - - € 5".encode())
+    assert syslog_data.data["syslog.message"] == "€ 5"
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        LOG_ALL_PATH,
+        LOG_MISSING_PRIVERSION_PATH,
+        LOG_NILS_PATH,
+        LOG_UTF8_UMLAUTS_PATH,
+        LOG_WITH_BOM_PATH,
+    ],
+)
+@pytest.mark.parametrize("structured_data", [False, True])
+def test_parse_header_same_as_parse(file_name: Path, structured_data: bool) -> None:
+    """Test that parsing the header gives the header of a full parse.
+
+    Args:
+        file_name: Path to the log file
+        structured_data: parse the structured data as well
+
+    """
+    parser = SyslogParser(options=LENIENT_OPTIONS)
+    text = file_name.read_text(encoding="utf-8").rstrip("\r\n")
+    expected = copy.deepcopy(parser.parse(text))
+    message = expected.data.pop("syslog.message", "")
+    if not structured_data:
+        expected.structured_data.clear()
+    for data in (text, text + "\t", text.encode(), text.encode() + b"\t"):
+        if isinstance(data, str):
+            syslog_data, body = parser.parse_header(data, structured_data)
+        else:
+            syslog_data, body = parser.parse_header_bytes(data, structured_data)
+        assert expected == syslog_data
+        rest = data[body:] if isinstance(data, str) else data[body:].decode()
+        if structured_data:
+            assert rest.lstrip("\ufeff").strip() == message
+        else:
+            assert rest.startswith(("-", "["))
+
+
+def test_parse_header_antlr() -> None:
+    """Test the offsets of headers parsed with the ANTLR parser."""
+    parser = SyslogParser()
+    text = '<14>1 - host app - - [a b="\t"] msg'
+    expected = copy.deepcopy(parser.parse(text))
+    del expected.data["syslog.message"]
+    syslog_data, body = parser.parse_header(text, structured_data=True)
+    assert syslog_data == expected
+    assert text[body:] == "msg"
+    assert parser.parse_header(text)[1] == text.index("[")
+    assert parser.parse_header_bytes(text.encode(), structured_data=True)[1] == body
+
+    heroku = SyslogParser(specification=SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN)
+    text = "83 <40>1 2012-11-30T06:45:29+00:00 host app web.3 - State changed"
+    syslog_data, body = heroku.parse_header(text)
+    assert syslog_data.data["syslog.header.procId"] == "web.3"
+    assert text[body:] == "State changed"
+
+
+def test_parse_header_syntax_error() -> None:
+    """Test that errors in the header raise a ParseError."""
+    text = "<14>1 -"
+    with pytest.raises(ParseError):
+        SyslogParser().parse_header(text)
+    with pytest.raises(ParseError):
+        SyslogParser(two_stage=True).parse_header(text)
+
+
+def test_parse_header_then_parse() -> None:
+    """Test that parse reports errors the same after parse_header."""
+    text = '<14>1 \u20ac 12 app proc msgid [a b="c"] msg body'
+    with pytest.raises(ParseError) as expected:
+        SyslogParser().parse(text)
+    parser = SyslogParser()
+    parser.parse_header('<14>1 - host app - - [a b="\t"] msg', structured_data=True)
+    with pytest.raises(ParseError) as error:
+        parser.parse(text)
+    assert error.value.args[0] == expected.value.args[0]
+
+
+def test_3164_parse_header() -> None:
+    """Test that the RFC 3164 body starts at the MSG."""
+    parser = SyslogParser(
+        specification=SyslogSpecification.RFC_3164, options=LENIENT_OPTIONS
+    )
+    text = SINGLE_ISE_PATH.read_text()
+    expected = copy.deepcopy(parser.parse(text))
+    message = expected.data.pop("syslog.message")
+    syslog_data, body = parser.parse_header(text)
+    assert syslog_data == expected
+    assert text[body:].strip() == message
+    assert parser.parse_header_bytes(text.encode()) == (syslog_data, body)
+
+
+class _RecordingBuilder(DefaultBuilder):
+    """DefaultBuilder that records the fields it is given values for."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.consumed: List[SyslogFieldKey] = []
+
+    def consume_value(self, field_key: SyslogFieldKey, value: FieldValue) -> None:
+        self.consumed.append(field_key)
+        super().consume_value(field_key, value)
+
+    def consume_priority(self, priority: FieldValue) -> None:
+        self.consumed.append(SyslogFieldKey.HEADER_PRI)
+        super().consume_priority(priority)
+
+    def consume_structured(self, identifier: str, raw_parameters) -> None:
+        self.consumed.append(SyslogFieldKey.STRUCTURED_BASE)
+        super().consume_structured(identifier, raw_parameters)
+
+
+PROJECTED_LINES = [
+    '<14>1 2014-06-20T09:14:07+00:00 host app 1234 ID47 [a b="c"] the message',
+    # LF is skipped by the lexer, the message takes the ANTLR path
+    '<14>1 2014-06-20T09:14:07+00:00 host app 1234 ID47 [a b="c"] the\nmessage',
+]
+
+
+@pytest.mark.parametrize("text", PROJECTED_LINES)
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {SyslogFieldKey.HEADER_TIMESTAMP, SyslogFieldKey.MESSAGE},
+        {SyslogFieldKey.HEADER_PRI_SEVERITY, SyslogFieldKey.STRUCTURED_BASE},
+        set(),
+    ],
+)
+def test_projection(text: str, fields: Set[SyslogFieldKey]) -> None:
+    """Test that only the projected fields are parsed.
+
+    Args:
+        text: the message
+        fields: the projection
+
+    """
+    expected = copy.deepcopy(
+        SyslogParser(options=BuilderOptions(nil_policy=NilPolicy.DASH)).parse(text)
+    )
+    names = {DefaultKeyProvider().get(field_key) for field_key in fields}
+    expected.data = {k: v for k, v in expected.data.items() if k in names}
+    if SyslogFieldKey.STRUCTURED_BASE not in fields:
+        expected.structured_data = {}
+    builder = _RecordingBuilder(nil_policy=NilPolicy.DASH, fields=fields)
+    reader = SyslogStreamReader(builder)
+    for data in (text, text.encode()):
+        builder.consumed.clear()
+        if isinstance(data, str):
+            reader.read_message(data)
+        else:
+            reader.read_bytes(data)
+        assert builder.produce() == expected
+        wanted = fields | {SyslogFieldKey.HEADER_PRI, SyslogFieldKey.HEADER_VERSION}
+        assert set(builder.consumed) <= wanted
+
+
+def test_projection_deviations() -> None:
+    """Test that deviations are found in fields that are not projected."""
+    parser = SyslogParser(options=BuilderOptions(fields=[SyslogFieldKey.MESSAGE]))
+    assert parser.parse(LOG_PATH.read_text()).data.keys() == {"syslog.message"}
+    with pytest.raises(DeviationError):
+        parser.parse(LOG_MISSING_PRI_PATH.read_text())
+    with pytest.raises(DeviationError):
+        parser.parse(LOG_MISSING_VERSION_PATH.read_text())
+
+
+def test_3164_projection() -> None:
+    """Test that only the projected fields of RFC 3164 messages are parsed."""
+    parser = SyslogParser(
+        specification=SyslogSpecification.RFC_3164,
+        options=BuilderOptions(fields=[SyslogFieldKey.HEADER_HOSTNAME]),
+    )
+    for data in (SINGLE_ISE_PATH.read_text(), SINGLE_ISE_PATH.read_bytes()):
+        if isinstance(data, str):
+            syslog_data = parser.parse(data)
+        else:
+            syslog_data = parser.parse_bytes(data)
+        assert syslog_data.data == {
+            "syslog.header.hostName": "lzpqrst-admin.in.mycompany.com.lg"
+        }
+
+
+@pytest.mark.parametrize("text", PROJECTED_LINES)
+def test_filters(text: str) -> None:
+    """Test that rejected messages are not parsed past the rejected field.
+
+    Args:
+        text: the message
+
+    """
+    expected = copy.deepcopy(SyslogParser().parse(text))
+    builder = _RecordingBuilder(
+        filters={SyslogFieldKey.HEADER_PRI_SEVERITY: lambda value: int(value) <= 4}
+    )
+    reader = SyslogStreamReader(builder)
+    for data in (text, text.encode()):
+        builder.consumed.clear()
+        with pytest.raises(FilteredError):
+            if isinstance(data, str):
+                reader.read_message(data)
+            else:
+                reader.read_bytes(data)
+        assert builder.consumed[-1] == SyslogFieldKey.HEADER_PRI
+        assert SyslogFieldKey.MESSAGE not in builder.consumed
+        assert SyslogFieldKey.STRUCTURED_BASE not in builder.consumed
+
+    parser = SyslogParser(
+        options=BuilderOptions(
+            filters={SyslogFieldKey.HEADER_APPNAME: lambda value: value in {"app"}}
+        )
+    )
+    assert parser.parse(text) == expected
+    assert parser.parse_bytes(text.encode()) == expected
+
+
+def test_filters_not_projected() -> None:
+    """Test that filters apply to fields that are not projected, and nils."""
+    text = LOG_NILS_PATH.read_text()
+    parser = SyslogParser(
+        options=BuilderOptions(
+            fields=[SyslogFieldKey.MESSAGE],
+            filters={SyslogFieldKey.HEADER_MSGID: lambda value: value is None},
+        )
+    )
+    assert parser.parse(text).data.keys() == {"syslog.message"}
+    parser = SyslogParser(
+        options=BuilderOptions(
+            fields=[SyslogFieldKey.MESSAGE],
+            filters={SyslogFieldKey.HEADER_MSGID: lambda value: value is not None},
+        )
+    )
+    with pytest.raises(FilteredError):
+        parser.parse(text)
+
+
+def test_filters_parse_many() -> None:
+    """Test that rejected messages are skipped without errors."""
+    text = LOG_ALL_PATH.read_text()
+    lines = [
+        text,
+        LOG_MISSING_PRI_PATH.read_text(),
+        text.replace(" loggregator ", " otherhost "),
+    ]
+    errors: List[Tuple[int, Exception]] = []
+    results = list(
+        parse_many(
+            lines,
+            errors=errors,
+            options=BuilderOptions(
+                filters={
+                    SyslogFieldKey.HEADER_HOSTNAME: lambda value: value != "loggregator"
+                }
+            ),
+        )
+    )
+    assert [data.data["syslog.header.hostName"] for data in results] == ["otherhost"]
+    assert not errors
+
+
+@pytest.mark.parametrize("text", PROJECTED_LINES)
+def test_lazy_structured_data(text: str) -> None:
+    """Test that structured data kept as text parses the same.
+
+    Args:
+        text: the message
+
+    """
+    expected = copy.deepcopy(SyslogParser().parse(text))
+    parser = SyslogParser(options=BuilderOptions(lazy_structured_data=True))
+    for data in (text, text.encode()):
+        if isinstance(data, str):
+            syslog_data = parser.parse(data)
+        else:
+            syslog_data = parser.parse_bytes(data)
+        if "\n" not in text:
+            assert syslog_data.structured_text == '[a b="c"]'
+        assert syslog_data == expected
+        assert syslog_data.structured_text is None
+
+    header, _ = parser.parse_header(text, structured_data=True)
+    assert header.structured_data == expected.structured_data
+    released = list(parser.parse_many([text, LOG_NILS_PATH.read_text()]))
+    assert released[0] == expected
+    assert not released[1].structured_data
+
+
+@pytest.mark.parametrize("text", PROJECTED_LINES)
+def test_typed_values(text: str) -> None:
+    """Test that the PRI and VERSION may be kept as ints, with names.
+
+    Args:
+        text: the message
+
+    """
+    expected = copy.deepcopy(SyslogParser().parse(text))
+    expected.data.update(
+        {
+            "syslog.header.pri": 14,
+            "syslog.header.severity": 6,
+            "syslog.header.facility": 1,
+            "syslog.header.version": 1,
+            "syslog.header.severityName": "info",
+            "syslog.header.facilityName": "user",
+        }
+    )
+    parser = SyslogParser(
+        options=BuilderOptions(
+            typed_values=True,
+            priority_names=True,
+            filters={SyslogFieldKey.HEADER_PRI_SEVERITY: lambda value: value == "6"},
+        )
+    )
+    assert parser.parse(text) == expected
+    assert parser.parse_bytes(text.encode()) == expected
+
+    parser = SyslogParser(
+        options=BuilderOptions(
+            fields=[SyslogFieldKey.HEADER_PRI_FACILITY_NAME], priority_names=True
+        )
+    )
+    assert parser.parse(text).data == {"syslog.header.facilityName": "user"}
+
+
+def test_typed_priority_zero() -> None:
+    """Test that a PRI of 0 is not taken for a missing one."""
+    parser = SyslogParser(options=BuilderOptions(typed_values=True))
+    syslog_data = parser.parse("<0>1 - - - - - -")
+    assert syslog_data.data["syslog.header.pri"] == 0
+
+
+def test_decode_timestamps() -> None:
+    """Test that TIMESTAMPs may be kept decoded, from both parsers."""
+    text = LOG_ALL_PATH.read_text().splitlines()[0]
+    timestamp = SyslogParser().parse(text).data["syslog.header.timestamp"]
+    assert isinstance(timestamp, str)
+    expected = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    utcoffset = expected.utcoffset()
+    assert utcoffset is not None
+    parser = SyslogParser(options=BuilderOptions(decode_timestamps=True))
+    for data in (text, text.replace(" ", "\n", 1)):
+        syslog_data = parser.parse(data)
+        assert syslog_data.data["syslog.header.timestamp"] == timestamp
+        nanos = syslog_data.data["syslog.header.timestampNanos"]
+        assert nanos == round(expected.timestamp() * 10**6) * 1000
+        offset = syslog_data.data["syslog.header.timestampOffset"]
+        assert offset == utcoffset.total_seconds()
+
+    parser = SyslogParser(
+        options=BuilderOptions(
+            fields=[SyslogFieldKey.HEADER_TIMESTAMP_OFFSET], decode_timestamps=True
+        )
+    )
+    assert parser.parse(text).data == {"syslog.header.timestampOffset": offset}
+    syslog_data = parser.parse("<14>1 - host app - - - message")
+    assert "syslog.header.timestampOffset" not in syslog_data.data
+
+
+def test_decode_invalid_timestamps() -> None:
+    """Test that RFC 5424 TIMESTAMPs that do not exist are only kept as text."""
+    parser = SyslogParser(
+        options=BuilderOptions(
+            decode_timestamps=True, host_timezones={"host": timezone.utc}
+        )
+    )
+    syslog_data = parser.parse("<14>1 2022-06-01T10:00:60Z host app - - - message")
+    assert syslog_data.data["syslog.header.timestamp"] == "2022-06-01T10:00:60Z"
+    assert "syslog.header.timestampNanos" not in syslog_data.data
+
+
+def test_decode_bsd_timestamps() -> None:
+    """Test that RFC 3164 timestamps are decoded in the zone of their host."""
+    text = "<34>Oct 11 22:14:15 mymachine su: 'su root' failed"
+    zone = timezone(timedelta(hours=-5))
+    parser = SyslogParser(
+        specification=SyslogSpecification.RFC_3164,
+        options=BuilderOptions(
+            decode_timestamps=True,
+            default_timezone=timezone.utc,
+            host_timezones={"mymachine": zone},
+        ),
+    )
+    for data in (text, text.replace(" root", "\troot")):
+        decoded = parser.parse(data).data
+        nanos = decoded["syslog.header.timestampNanos"]
+        assert isinstance(nanos, int)
+        local = datetime.fromtimestamp(nanos / 10**9, zone)
+        assert local.strftime("%b %d %H:%M:%S") == "Oct 11 22:14:15"
+        assert decoded["syslog.header.timestampOffset"] == -5 * 3600
+        assert abs(local - datetime.now(zone)) < timedelta(days=183)
+
+    decoded = parser.parse_bytes(text.replace("mymachine", "other").encode()).data
+    assert decoded["syslog.header.timestampOffset"] == 0
+
+    parser = SyslogParser(
+        specification=SyslogSpecification.RFC_3164,
+        options=BuilderOptions(
+            fields=[SyslogFieldKey.HEADER_TIMESTAMP_OFFSET],
+            decode_timestamps=True,
+            host_timezones={"mymachine": zone},
+        ),
+    )
+    assert parser.parse(text).data == {"syslog.header.timestampOffset": -18000}
@@ -0,0 +1,67 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+from simple_syslog.priority import PRIORITIES, decode_priority, decode_version
+
+
+def test_priority_table() -> None:
+    """Test that the table holds the severity and facility of every PRI."""
+    assert len(PRIORITIES) == 192
+    for value in range(192):
+        priority = decode_priority(str(value))
+        assert priority is not None
+        assert priority.value == value
+        assert priority.severity == value % 8
+        assert priority.facility == value // 8
+        assert priority.severity_text == str(value % 8)
+        assert priority.facility_text == str(value // 8)
+
+
+@pytest.mark.parametrize(
+    "text,severity_name,facility_name",
+    [("0", "emerg", "kern"), ("11", "err", "user"), ("191", "debug", "local7")],
+)
+def test_priority_names(text: str, severity_name: str, facility_name: str) -> None:
+    """Test the keywords of severities and facilities.
+
+    Args:
+        text: the PRI
+        severity_name: the keyword of its severity
+        facility_name: the keyword of its facility
+
+    """
+    priority = decode_priority(text)
+    assert priority is not None
+    assert priority.severity_name == severity_name
+    assert priority.facility_name == facility_name
+
+
+def test_priority_outside_table() -> None:
+    """Test PRIs the table does not hold."""
+    assert decode_priority("014") == PRIORITIES["14"]
+    assert decode_priority(memoryview(b"14")) == PRIORITIES["14"]
+    priority = decode_priority("999")
+    assert priority is not None
+    assert (priority.severity, priority.facility) == (7, 124)
+    assert priority.facility_name is None
+    assert decode_priority(">1") is None
+    assert decode_priority("") is None
+
+
+def test_decode_version() -> None:
+    """Test that versions are numbers, unless they are not."""
+    assert decode_version("1") == 1
+    assert decode_version("999") == 999
+    assert decode_version("x") == "x"
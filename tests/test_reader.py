@@ -0,0 +1,149 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+from typing import List, Optional
+
+import pytest
+
+from simple_syslog.builder import BuilderOptions, DefaultBuilder
+from simple_syslog.data import SyslogDataSet
+from simple_syslog.exceptions import ParseError
+from simple_syslog.parser import SyslogParser
+from simple_syslog.policy import AllowableDeviation
+from simple_syslog.reader import SyslogStreamReader
+from simple_syslog.specification import SyslogSpecification
+from tests.conftest import (
+    LOG_ALL_PATH,
+    LOG_MISSING_PRIVERSION_PATH,
+    LOG_NILS_PATH,
+    LOG_UTF8_UMLAUTS_PATH,
+    SINGLE_ISE_OLD_DATE_PATH,
+    SINGLE_ISE_PATH,
+)
+
+ALL_DEVIATIONS = [AllowableDeviation.PRIORITY, AllowableDeviation.VERSION]
+
+LINES_5424 = [
+    LOG_ALL_PATH.read_text().rstrip("\n"),
+    LOG_MISSING_PRIVERSION_PATH.read_text().rstrip("\n"),
+    LOG_NILS_PATH.read_text().rstrip("\n"),
+    LOG_UTF8_UMLAUTS_PATH.read_text(encoding="utf-8").rstrip("\n"),
+    "<14>1 2014-06-20T09:14:07+00:00 host app - - - tab\there",
+]
+
+HEROKU_LINES = [
+    "<40>1 2012-11-30T06:45:29+00:00 host app web.3 - State changed\n",
+    "<40>1 2012-11-30T06:45:26+00:00 host app web.3 - Starting process",
+]
+
+
+class CollectingBuilder(DefaultBuilder):
+    """DefaultBuilder keeping the data of every message."""
+
+    def __init__(
+        self,
+        specification: Optional[SyslogSpecification] = None,
+    ) -> None:
+        """Create new CollectingBuilder.
+
+        Args:
+            specification: SyslogSpecification or None.
+        """
+        super().__init__(specification=specification, allowed_deviations=ALL_DEVIATIONS)
+        self.messages: List[SyslogDataSet] = []
+
+    def complete(self) -> None:
+        """Called when a message is complete."""
+        self.messages.append(self.release())
+
+
+def parse_each(
+    lines: List[str], specification: Optional[SyslogSpecification] = None
+) -> List[SyslogDataSet]:
+    """Utility function to parse every line on its own."""
+    parser = SyslogParser(
+        specification=specification,
+        options=BuilderOptions(allowed_deviations=ALL_DEVIATIONS),
+    )
+    return [copy.deepcopy(parser.parse(line)) for line in lines]
+
+
+def test_read_lines() -> None:
+    """Test that LF separated messages are parsed like single messages."""
+    builder = CollectingBuilder()
+    text = "\n".join(LINES_5424) + "\r\n\n"
+    assert SyslogStreamReader(builder).read(text) == len(text)
+    assert parse_each(LINES_5424) == builder.messages
+
+
+def test_read_3164_lines() -> None:
+    """Test that LF separated RFC 3164 messages are parsed."""
+    lines = [
+        SINGLE_ISE_PATH.read_text().rstrip("\n"),
+        SINGLE_ISE_OLD_DATE_PATH.read_text().rstrip("\n"),
+    ]
+    specification = SyslogSpecification.RFC_3164
+    builder = CollectingBuilder(specification)
+    SyslogStreamReader(builder, specification).read("\n".join(lines))
+    assert parse_each(lines, specification) == builder.messages
+
+
+def test_read_octet_counted() -> None:
+    """Test that octet counted messages are parsed up to an incomplete one."""
+    specification = SyslogSpecification.RFC_6587_5424
+    builder = CollectingBuilder(specification)
+    text = "".join(f"{len(line.encode())} {line}" for line in LINES_5424)
+    end = SyslogStreamReader(builder, specification).read(text + "12 <14>1 - -")
+    assert end == len(text)
+    assert parse_each(LINES_5424) == builder.messages
+
+
+def test_read_octet_counted_utf8() -> None:
+    """Test that the octet count of a message is taken in UTF-8 octets."""
+    specification = SyslogSpecification.RFC_6587_5424
+    builder = CollectingBuilder(specification)
+    line = "<14>1 - host app proc msgid - h\u00e9llo w\u00f6rld"
+    text = f"{len(line.encode())} {line}" * 2
+    reader = SyslogStreamReader(builder, specification)
+    assert reader.read(text + "9 h\u00e9llo") == len(text)
+    assert [data.data["syslog.message"] for data in builder.messages] == [
+        "h\u00e9llo w\u00f6rld"
+    ] * 2
+
+
+def test_read_heroku() -> None:
+    """Test that Heroku messages are parsed with their octet count."""
+    specification = SyslogSpecification.HEROKU_HTTPS_LOG_DRAIN
+    builder = CollectingBuilder(specification)
+    lines = [f"{len(line)} {line}" for line in HEROKU_LINES]
+    SyslogStreamReader(builder, specification).read("".join(lines))
+    assert parse_each(lines, specification) == builder.messages
+    assert builder.messages[1].data["syslog.message"] == "Starting process"
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["x <14>1 - - - - - -", "012 <14>1 - - - - - -", "8 <14>1 - \u00e9"],
+)
+def test_read_invalid_octet_count(text: str) -> None:
+    """Test that an invalid octet count raises a ParseError.
+
+    Args:
+        text: the buffer
+
+    """
+    specification = SyslogSpecification.RFC_6587_5424
+    reader = SyslogStreamReader(CollectingBuilder(specification), specification)
+    with pytest.raises(ParseError):
+        reader.read(text)
@@ -0,0 +1,77 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import socket
+from typing import List, Tuple
+
+import pytest
+
+from simple_syslog.builder import BuilderOptions
+from simple_syslog.data import SyslogDataSet
+from simple_syslog.policy import AllowableDeviation
+from simple_syslog.receiver import SyslogDatagramReceiver
+from tests.conftest import LOG_ALL_PATH, LOG_MISSING_PRI_PATH
+
+MESSAGE = LOG_ALL_PATH.read_bytes().rstrip(b"\n")
+MISSING_PRI = LOG_MISSING_PRI_PATH.read_bytes().rstrip(b"\n")
+
+
+def send(address: Tuple[str, int], datagrams: List[bytes]) -> None:
+    """Utility function to send datagrams to address."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for datagram in datagrams:
+            sock.sendto(datagram, address)
+
+
+def test_receive() -> None:
+    """Test that waiting datagrams are read as slices of the ring."""
+    with SyslogDatagramReceiver(port=0, batch_size=4, max_datagram_size=512) as rx:
+        assert rx.receive(0) == []
+        send(rx.address, [b"a", b"bb", b"ccc", b"dddd", b"eeeee"])
+        datagrams = [bytes(d) for d in rx.receive(5)]
+        while len(datagrams) < 4:
+            datagrams.extend(bytes(d) for d in rx.receive(5))
+        assert datagrams == [b"a", b"bb", b"ccc", b"dddd"]
+        assert [bytes(d) for d in rx.receive(5)] == [b"eeeee"]
+
+
+def test_receive_batch() -> None:
+    """Test that datagrams are parsed and invalid ones are skipped."""
+    errors: List[Tuple[int, Exception]] = []
+    with SyslogDatagramReceiver(port=0) as receiver:
+        send(receiver.address, [MESSAGE, MISSING_PRI, MESSAGE])
+        messages: List[SyslogDataSet] = []
+        while len(messages) + len(errors) < 3:
+            messages.extend(receiver.receive_batch(5, errors))
+    assert [m.data["syslog.message"] for m in messages] == ["Removing instance"] * 2
+    assert [index for index, _ in errors] == [1]
+
+
+def test_receive_batch_options() -> None:
+    """Test that the options and two_stage reach the decoder."""
+    options = BuilderOptions(allowed_deviations=[AllowableDeviation.PRIORITY])
+    with SyslogDatagramReceiver(port=0, options=options, two_stage=True) as receiver:
+        send(receiver.address, [MESSAGE, MISSING_PRI])
+        messages: List[SyslogDataSet] = []
+        while len(messages) < 2:
+            messages.extend(receiver.receive_batch(5))
+    assert [m.data["syslog.message"] for m in messages] == ["Removing instance"] * 2
+
+
+@pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT"), reason="no SO_REUSEPORT")
+def test_reuse_port() -> None:
+    """Test that receivers with reuse_port share the port."""
+    with SyslogDatagramReceiver(port=0, reuse_port=True) as first:
+        port = first.address[1]
+        with SyslogDatagramReceiver(port=port, reuse_port=True) as second:
+            assert second.address == first.address
@@ -0,0 +1,130 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import socket
+from typing import List
+
+from simple_syslog.builder import BuilderOptions
+from simple_syslog.data import SyslogDataSet
+from simple_syslog.keys import SyslogFieldKey
+from simple_syslog.server import start_tcp_server, start_udp_server
+from simple_syslog.specification import SyslogSpecification
+from tests.conftest import LOG_ALL_PATH, SINGLE_ISE_PATH
+
+MESSAGE = LOG_ALL_PATH.read_bytes().rstrip(b"\n")
+
+
+def test_udp_server() -> None:
+    """Test that datagrams are delivered to a queue."""
+
+    async def run() -> List[SyslogDataSet]:
+        queue: "asyncio.Queue[List[SyslogDataSet]]" = asyncio.Queue()
+        transport, _ = await start_udp_server(queue, port=0)
+        port = transport.get_extra_info("sockname")[1]
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for _ in range(3):
+                sock.sendto(MESSAGE, ("127.0.0.1", port))
+        messages: List[SyslogDataSet] = []
+        while len(messages) < 3:
+            messages.extend(await asyncio.wait_for(queue.get(), 5))
+        transport.close()
+        return messages
+
+    messages = asyncio.run(run())
+    assert [m.data["syslog.message"] for m in messages] == ["Removing instance"] * 3
+
+
+def test_udp_server_options() -> None:
+    """Test that the options and two_stage reach the protocol."""
+
+    async def run() -> List[SyslogDataSet]:
+        queue: "asyncio.Queue[List[SyslogDataSet]]" = asyncio.Queue()
+        transport, _ = await start_udp_server(
+            queue,
+            port=0,
+            options=BuilderOptions(fields=[SyslogFieldKey.MESSAGE]),
+            two_stage=True,
+        )
+        port = transport.get_extra_info("sockname")[1]
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(MESSAGE, ("127.0.0.1", port))
+        messages = await asyncio.wait_for(queue.get(), 5)
+        transport.close()
+        return messages
+
+    messages = asyncio.run(run())
+    assert [m.data for m in messages] == [{"syslog.message": "Removing instance"}]
+
+
+def test_tcp_server() -> None:
+    """Test that octet counted messages are delivered to a callback."""
+
+    async def run() -> List[SyslogDataSet]:
+        messages: List[SyslogDataSet] = []
+        done = asyncio.Event()
+
+        async def handle(batch: List[SyslogDataSet]) -> None:
+            messages.extend(batch)
+            if len(messages) == 100:
+                done.set()
+
+        server = await start_tcp_server(
+            handle, port=0, specification=SyslogSpecification.RFC_6587_5424
+        )
+        port = server.sockets[0].getsockname()[1]
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        frame = b"%d %s" % (len(MESSAGE), MESSAGE)
+        for _ in range(10):
+            writer.write(frame * 9 + frame[:10])
+            writer.write(frame[10:])
+            await writer.drain()
+        writer.close()
+        await asyncio.wait_for(done.wait(), 5)
+        server.close()
+        await server.wait_closed()
+        return messages
+
+    messages = asyncio.run(run())
+    assert len(messages) == 100
+    assert all(m.data["syslog.message"] == "Removing instance" for m in messages)
+
+
+def test_tcp_server_3164() -> None:
+    """Test that a last message without LF is delivered at the end."""
+
+    async def run() -> List[SyslogDataSet]:
+        queue: "asyncio.Queue[List[SyslogDataSet]]" = asyncio.Queue()
+        server = await start_tcp_server(
+            queue, port=0, specification=SyslogSpecification.RFC_3164
+        )
+        port = server.sockets[0].getsockname()[1]
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        line = SINGLE_ISE_PATH.read_bytes().rstrip(b"\n")
+        writer.write(line + b"\n" + line)
+        await writer.drain()
+        writer.write_eof()
+        messages: List[SyslogDataSet] = []
+        while len(messages) < 2:
+            messages.extend(await asyncio.wait_for(queue.get(), 5))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return messages
+
+    messages = asyncio.run(run())
+    assert messages[0] == messages[1]
+    assert (
+        messages[0].data["syslog.header.hostName"]
+        == "lzpqrst-admin.in.mycompany.com.lg"
+    )
@@ -0,0 +1,107 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from pathlib import Path
+from typing import Dict, cast
+
+import pytest
+from antlr4 import CommonTokenStream, InputStream
+
+from simple_syslog.builder import DefaultBuilder
+from simple_syslog.data import SyslogDataSet
+from simple_syslog.generated.grammars.Rfc5424Lexer import Rfc5424Lexer
+from simple_syslog.generated.grammars.Rfc5424Parser import Rfc5424Parser
+from simple_syslog.listener import Syslog5424Listener
+from simple_syslog.policy import AllowableDeviation
+from simple_syslog.streams import BytesInputStream
+from tests.conftest import (
+    LOG_ALL_PATH,
+    LOG_MISSING_PRIVERSION_PATH,
+    LOG_MIX_PATH,
+    LOG_NILS_PATH,
+    LOG_UTF8_UMLAUTS_PATH,
+    LOG_WITH_BOM_PATH,
+)
+
+ALL_DEVIATIONS = [AllowableDeviation.PRIORITY, AllowableDeviation.VERSION]
+
+
+def parse_5424(stream: InputStream) -> SyslogDataSet:
+    """Utility function to parse a stream without building a parse tree."""
+    parser = Rfc5424Parser(CommonTokenStream(Rfc5424Lexer(stream)))
+    parser.buildParseTrees = False
+    builder = DefaultBuilder(allowed_deviations=ALL_DEVIATIONS)
+    parser.addParseListener(Syslog5424Listener(builder))
+    parser.syslog_msg()
+    return builder.produce()
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        LOG_ALL_PATH,
+        LOG_MISSING_PRIVERSION_PATH,
+        LOG_MIX_PATH,
+        LOG_NILS_PATH,
+        LOG_UTF8_UMLAUTS_PATH,
+    ],
+)
+def test_bytes_same_as_text(file_name: Path) -> None:
+    """Test that parsing bytes gives the same data as parsing text.
+
+    Args:
+        file_name: Path to the log file
+
+    """
+    expected = parse_5424(InputStream(file_name.read_text(encoding="utf-8")))
+    assert expected == parse_5424(BytesInputStream(file_name.read_bytes()))
+
+
+def test_bytes_bom() -> None:
+    """Test that the UTF-8 BOM is not part of the message."""
+    syslog_data = parse_5424(BytesInputStream(LOG_WITH_BOM_PATH.read_bytes()))
+    assert syslog_data.data["syslog.message"] == "Removing instance"
+
+
+def test_spans() -> None:
+    """Test that values are memoryview slices of the input."""
+    data = b'<14>1 - host - - - [a b="c"] gr\xc3\xbc\xc3\x9fe\n fr\xc3\xbch \n'
+    syslog_data = parse_5424(BytesInputStream(data, spans=True))
+    hostname = syslog_data.data["syslog.header.hostName"]
+    assert isinstance(hostname, memoryview)
+    assert hostname.obj is data
+    assert bytes(hostname) == b"host"
+    message = syslog_data.data["syslog.message"]
+    assert isinstance(message, memoryview)
+    assert str(message, "utf-8") == "grüße früh"
+    # typed as text, but spans of the input as well
+    structured = cast(
+        Dict[memoryview, Dict[memoryview, memoryview]], syslog_data.structured_data
+    )
+    assert {
+        bytes(sd_id): {bytes(k): bytes(v) for k, v in params.items()}
+        for sd_id, params in structured.items()
+    } == {b"a": {b"b": b"c"}}
+
+
+def test_spans_typed_version() -> None:
+    """Test that a VERSION span is decoded with typed_values set."""
+    stream = BytesInputStream(b"<14>1 - host - - - - msg", spans=True)
+    parser = Rfc5424Parser(CommonTokenStream(Rfc5424Lexer(stream)))
+    parser.buildParseTrees = False
+    builder = DefaultBuilder(typed_values=True)
+    parser.addParseListener(Syslog5424Listener(builder))
+    parser.syslog_msg()
+    syslog_data = builder.produce()
+    assert syslog_data.data["syslog.header.version"] == 1
+    assert syslog_data.data["syslog.header.pri"] == 14
@@ -0,0 +1,66 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+from simple_syslog.data import SyslogDataSet
+from simple_syslog.structured import parse_structured
+
+
+def test_parse_structured_escapes() -> None:
+    """Test that escaped characters are kept in PARAM-VALUEs as written."""
+    text = r'[a b="x\"y" c="x\\" d="x\]y"][e@1 f=""]'
+    assert parse_structured(text) == {
+        "a": {"b": r"x\"y", "c": "x\\\\", "d": r"x\]y"},
+        "e@1": {"f": ""},
+    }
+
+
+def test_parse_structured_repeated_id() -> None:
+    """Test that the last element wins for repeated SD-IDs."""
+    assert parse_structured('[a b="1"][a c="2"]') == {"a": {"c": "2"}}
+
+
+def test_parse_structured_nil() -> None:
+    """Test that the NILVALUE is no structured data."""
+    assert parse_structured("-") == {}
+
+
+@pytest.mark.parametrize("text", ["", "[a", '[a b="c]', '[a b="c"] [d]'])
+def test_parse_structured_invalid(text: str) -> None:
+    """Test that text that is not structured data is refused.
+
+    Args:
+        text: the text
+
+    """
+    with pytest.raises(ValueError):
+        parse_structured(text)
+
+
+def test_structured_text() -> None:
+    """Test that structured_text is parsed on first access, once."""
+    syslog_data = SyslogDataSet(dict(), dict(), structured_text='[a b="c"]')
+    assert syslog_data == SyslogDataSet(dict(), {"a": {"b": "c"}})
+    assert syslog_data.structured_text is None
+    syslog_data.structured_text = '[d e="f"]'
+    syslog_data.structured_data = {"g": {}}
+    assert syslog_data.structured_data == {"g": {}}
+
+
+def test_structured_text_repr() -> None:
+    """Test that the repr shows the parsed structured data."""
+    syslog_data = SyslogDataSet({"a": "b"}, dict(), structured_text='[c d="e"]')
+    assert repr(syslog_data) == (
+        "SyslogDataSet(data={'a': 'b'}, structured_data={'c': {'d': 'e'}})"
+    )
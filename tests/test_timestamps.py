@@ -0,0 +1,174 @@
+# Copyright 2022 simple-syslog authors
+# All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License")
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from simple_syslog.timestamps import BsdTimestampDecoder, Timestamp, TimestampDecoder
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("1970-01-01T00:00:00Z", Timestamp(0, 0)),
+        ("1970-01-01T00:00:01.5Z", Timestamp(1_500_000_000, 0)),
+        ("1970-01-01T01:00:00.000001+01:00", Timestamp(1_000, 3600)),
+        ("1969-12-31T23:59:59.9-00:30", Timestamp(1_799_900_000_000, -1800)),
+    ],
+)
+def test_decode(text: str, expected: Timestamp) -> None:
+    """Test that TIMESTAMPs are decoded to nanoseconds and an offset.
+
+    Args:
+        text: the TIMESTAMP
+        expected: the decoded TIMESTAMP
+
+    """
+    decoder = TimestampDecoder()
+    assert decoder.decode(text) == expected
+    # the second time the seconds come from the cache
+    assert decoder.decode(text) == expected
+    assert decoder.decode(memoryview(text.encode())) == expected
+
+
+def test_decode_same_second() -> None:
+    """Test that the fraction is decoded for every timestamp of a second."""
+    decoder = TimestampDecoder(cache_size=2)
+    seconds = datetime(2003, 10, 11, 22, 14, 15, tzinfo=timezone.utc).timestamp()
+    for fraction in ("", ".003", ".123456", ".1"):
+        decoded = decoder.decode(f"2003-10-11T22:14:15{fraction}Z")
+        assert decoded is not None
+        assert decoded.nanos == int(seconds) * 10**9 + round(
+            float("0" + (fraction or ".0")) * 10**9
+        )
+    for day in range(1, 10):
+        assert decoder.decode(f"2003-10-0{day}T22:14:15Z") is not None
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "-",
+        "Oct 11 22:14:15",
+        "2003-13-11T22:14:15Z",
+        "2003-10-11T22:14:60Z",
+        "2003-10-11T22:14:15+25:00",
+        "2003-10-11T22:14:15.Z",
+        "2003-10-11T22:14:15,1Z",
+        "2003-10-11T22:14:15.1234567890Z",
+        "2003-10-11 22:14:15Z",
+    ],
+)
+def test_decode_invalid(text: str) -> None:
+    """Test that what is not a valid TIMESTAMP is not decoded.
+
+    Args:
+        text: the text
+
+    """
+    decoder = TimestampDecoder()
+    assert decoder.decode(text) is None
+    assert decoder.decode(text) is None
+
+
+def _clock(
+    year: int, month: int, day: int, hour: int = 0, minute: int = 0, second: int = 0
+) -> float:
+    return datetime(
+        year, month, day, hour, minute, second, tzinfo=timezone.utc
+    ).timestamp()
+
+
+def _nanos(*args: int) -> int:
+    return int(_clock(*args)) * 10**9
+
+
+@pytest.mark.parametrize(
+    "now,text,expected",
+    [
+        ((2022, 6, 1), "Aug  6 17:26:31", (2022, 8, 6, 17, 26, 31)),
+        ((2022, 6, 1), "Aug 6 17:26:31", (2022, 8, 6, 17, 26, 31)),
+        ((2023, 1, 1, 0, 0, 5), "Dec 31 23:59:59", (2022, 12, 31, 23, 59, 59)),
+        ((2022, 12, 31, 23, 59, 59), "Jan  1 00:00:01", (2023, 1, 1, 0, 0, 1)),
+        ((2023, 1, 15), "Feb 29 12:00:00", (2024, 2, 29, 12)),
+    ],
+)
+def test_decode_bsd_year(now: tuple, text: str, expected: tuple) -> None:
+    """Test that the year closest to the clock is taken.
+
+    Args:
+        now: the time of the clock
+        text: the timestamp
+        expected: the time of the timestamp
+
+    """
+    decoder = BsdTimestampDecoder(clock=lambda: _clock(*now))
+    assert decoder.decode(text) == Timestamp(_nanos(*expected), 0)
+    assert decoder.decode(text + ".25") == Timestamp(
+        _nanos(*expected) + 25 * 10**7, 0
+    )
+
+
+def test_decode_bsd_timezones() -> None:
+    """Test that the zone of the host, or the default zone, is taken."""
+    east, west = timezone(timedelta(hours=2)), timezone(timedelta(hours=-5))
+    decoder = BsdTimestampDecoder(
+        default_timezone=east,
+        host_timezones={"west": west},
+        clock=lambda: _clock(2022, 6, 1),
+    )
+    text = "Jun  1 12:00:00"
+    assert decoder.decode(text) == Timestamp(_nanos(2022, 6, 1, 10), 7200)
+    assert decoder.decode(text, "east") == Timestamp(_nanos(2022, 6, 1, 10), 7200)
+    assert decoder.decode(text, "west") == Timestamp(_nanos(2022, 6, 1, 17), -18000)
+
+
+def test_decode_bsd_cache() -> None:
+    """Test that cached seconds follow the clock and the least recent go."""
+    now = [_clock(2022, 6, 1)]
+    decoder = BsdTimestampDecoder(clock=lambda: now[0], cache_size=2)
+    for text in ("Jun  1 12:00:00", "Jun  1 12:00:01", "Jun  1 12:00:00"):
+        decoder.decode(text)
+    decoder.decode("Jun  1 12:00:02")
+    assert list(decoder._cache) == [
+        ("Jun  1 12:00:00", timezone.utc),
+        ("Jun  1 12:00:02", timezone.utc),
+    ]
+    now[0] = _clock(2023, 5, 1)
+    assert decoder.decode("Jun  1 12:00:00") == Timestamp(_nanos(2023, 6, 1, 12), 0)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "2003-10-11T22:14:15Z",
+        "Foo  1 12:00:00",
+        "Jun 31 12:00:00",
+        "Jun  1 24:00:00",
+        "Jun  1 12-00-00",
+        "Jun   1 12:00:00",
+        "Jun  1 12:00:00.",
+        "Jun  1 12:00:00.x",
+    ],
+)
+def test_decode_bsd_invalid(text: str) -> None:
+    """Test that what is not a valid RFC 3164 timestamp is not decoded.
+
+    Args:
+        text: the text
+
+    """
+    decoder = BsdTimestampDecoder(clock=lambda: _clock(2022, 6, 1))
+    assert decoder.decode(text) is None
+    assert decoder.decode(text) is None